@@ -0,0 +1,50 @@
+import argparse
+import sys
+from utils.settings import Settings
+from core.sts_processor import STSProcessor
+from core.batch_converter import BatchConverter
+
+def main():
+    settings = Settings()
+
+    parser = argparse.ArgumentParser(description="Convert recorded WAV/PCM files into the target voice.")
+    parser.add_argument("inputs", nargs="+", help="Files or folders of .wav/.pcm audio")
+    parser.add_argument("-o", "--output", required=True, help="Output folder for converted WAV files")
+    parser.add_argument("--voice", default=settings.voice_id, help="Target voice_id (default: saved voice)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Max requests in flight")
+    parser.add_argument("--retries", type=int, default=4, help="Retries per segment")
+    parser.add_argument("--vad-threshold", type=int, default=500)
+    parser.add_argument("--vad-pause", type=float, default=settings.vad_pause)
+    parser.add_argument("--max-duration", type=float, default=settings.max_duration)
+    args = parser.parse_args()
+
+    if not settings.api_key:
+        print("Error: No API Key (set ELEVENLABS_API_KEY or save one in the app)")
+        return 1
+    if not args.voice:
+        print("Error: No voice selected (use --voice)")
+        return 1
+
+    processor = STSProcessor(settings.api_key)
+    processor.set_voice(args.voice)
+    processor.vad_threshold = args.vad_threshold
+    processor.vad_pause = args.vad_pause
+    processor.max_duration = args.max_duration
+    processor.latency = settings.latency
+    processor.stability = settings.stability
+    processor.similarity = settings.similarity
+    processor.remove_background_noise = settings.remove_background_noise
+    processor.noise_suppression = settings.local_noise_suppression
+
+    if args.concurrency > STSProcessor.MAX_WORKERS:
+        print(f"Warning: --concurrency {args.concurrency} is above the maximum, using {STSProcessor.MAX_WORKERS}")
+    converter = BatchConverter(processor, concurrency=args.concurrency, max_retries=args.retries)
+    try:
+        ok = converter.run(args.inputs, args.output)
+    except KeyboardInterrupt:
+        print("\nInterrupted - rerun the same command to resume.")
+        return 130
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Replay captured audio through the phrase path with and without the PCM arena.
+
+    python -m bench.arena_replay --seconds 300 --sessions 4 --max-duration 30
+    python -m bench.arena_replay --wav recording.wav --sessions 2
+
+Each mode runs in its own subprocess so RSS is comparable. Every
+session feeds 1024-sample chunks through the VAD and the segmenter,
+queues the phrases, and a consumer reads each phrase the way the
+upload does (64 KiB reads) while keeping `--in-flight` phrases
+outstanding. Reported per mode:
+
+    churn    net new bytes allocated, summed over every chunk step and
+             phrase hand-off (tracemalloc), i.e. the allocator traffic
+             that phrases cause
+    traced   tracemalloc peak
+    rss      peak resident set size during the replay, above the
+             baseline after the source audio was loaded
+    slots    arena slot allocations / reuses
+"""
+import argparse
+import collections
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+import wave
+import numpy as np
+from core.vad import VAD
+from core.segmenter import PhraseSegmenter, BYTES_PER_SECOND
+from core.phrase import Phrase
+from core.arena import PCMArena, PCMReader
+from bench.effects_cpu import synthetic_voice
+
+CHUNK_BYTES = 2048
+CHUNK_SECONDS = 1024 / 16000.0
+
+
+def load_source(args) -> bytes:
+    if args.wav:
+        with wave.open(args.wav, "rb") as w:
+            if w.getframerate() != 16000 or w.getnchannels() != 1 or w.getsampwidth() != 2:
+                sys.exit("expected 16 kHz mono 16-bit WAV")
+            return w.readframes(w.getnframes())
+    # Long phrases (90% of max_duration) separated by pauses; built from a
+    # short tiled clip so that generating it doesn't set the peak RSS
+    clip = synthetic_voice(2.0)
+    speech = clip * int(np.ceil(args.max_duration * 0.9 / 2.0))
+    speech = speech[:int(args.max_duration * 0.9 * 16000) * 2]
+    cycle = speech + bytes(int((args.max_duration * 0.1 + 2.0) * 16000) * 2)
+    return (cycle * int(np.ceil(args.seconds * 32000 / len(cycle))))[:int(args.seconds * 16000) * 2]
+
+
+def rss_mb() -> float:
+    """Current RSS on Linux; elsewhere the peak so far, which is the best available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1048576.0
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1048576.0 if sys.platform == "darwin" else rss / 1024.0
+
+
+def consume(phrase: Phrase) -> int:
+    """Read the phrase like the upload does; returns bytes read."""
+    audio = phrase.audio
+    reader = PCMReader(audio) if isinstance(audio, memoryview) else None
+    total = 0
+    if reader:
+        while True:
+            block = reader.read(65536)
+            if not block:
+                break
+            total += len(block)
+    else:
+        total = len(audio)
+    return total
+
+
+def run_mode(args, use_arena: bool) -> dict:
+    source = load_source(args)
+    vad = VAD(args.vad_threshold)
+    vad.is_speech(source[:CHUNK_BYTES])
+    rss_before = rss_peak = rss_mb()
+
+    tracemalloc.start()
+    arenas = [PCMArena(int(args.max_duration * BYTES_PER_SECOND) + 16384) if use_arena else None
+              for _ in range(args.sessions)]
+    segmenters = [PhraseSegmenter(args.vad_pause, args.max_duration, arena=a) for a in arenas]
+    in_flight = collections.deque()
+
+    # Slot preallocation counts as churn too
+    churn, last, phrases, uploaded = tracemalloc.get_traced_memory()[0], tracemalloc.get_traced_memory()[0], 0, 0
+    now = 0.0
+    for step, offset in enumerate(range(0, len(source) - CHUNK_BYTES + 1, CHUNK_BYTES)):
+        now += CHUNK_SECONDS
+        for segmenter in segmenters:
+            chunk = source[offset:offset + CHUNK_BYTES]  # A fresh bytes object, like PyAudio's
+            is_speech, _ = vad.is_speech(chunk)
+            for event in segmenter.feed(chunk, is_speech, now):
+                if event[0] != "phrase":
+                    continue
+                phrases += 1
+                in_flight.append(Phrase(buffer=event[1]) if use_arena else Phrase(event[1]))
+                while len(in_flight) > args.in_flight:
+                    done = in_flight.popleft()
+                    uploaded += consume(done)
+                    done.release()
+                current = tracemalloc.get_traced_memory()[0]
+                churn += max(0, current - last)
+                last = current
+        current = tracemalloc.get_traced_memory()[0]
+        churn += max(0, current - last)
+        last = current
+        if step % 16 == 0:
+            rss_peak = max(rss_peak, rss_mb())
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    for segmenter in segmenters:
+        if use_arena:
+            segmenter.buffer.release()
+
+    result = {"phrases": phrases, "uploaded_mb": uploaded / 1048576.0, "churn_mb": churn / 1048576.0,
+              "traced_peak_mb": traced_peak / 1048576.0, "rss_growth_mb": max(rss_peak, rss_mb()) - rss_before}
+    if use_arena:
+        result["slot_allocations"] = sum(a.stats["allocations"] for a in arenas)
+        result["slot_reuses"] = sum(a.stats["reuses"] for a in arenas)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=300.0)
+    parser.add_argument("--wav", help="16 kHz mono 16-bit recording to replay instead of synthetic speech")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--max-duration", type=float, default=30.0)
+    parser.add_argument("--vad-pause", type=float, default=1.0)
+    parser.add_argument("--vad-threshold", type=float, default=500.0)
+    parser.add_argument("--in-flight", type=int, default=2, help="Phrases held by the consumer at once")
+    parser.add_argument("--mode", choices=("bytes", "arena"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args, args.mode == "arena")))
+        return
+
+    results = {}
+    for mode in ("bytes", "arena"):
+        out = subprocess.run([sys.executable, "-m", "bench.arena_replay", "--mode", mode] + sys.argv[1:],
+                             capture_output=True, text=True, check=True)
+        results[mode] = json.loads(out.stdout)
+
+    print(f"{args.sessions} sessions, {results['bytes']['phrases']} phrases, "
+          f"{results['bytes']['uploaded_mb']:.1f} MB uploaded")
+    print(f"{'mode':<8}{'churn MB':>10}{'traced MB':>11}{'rss +MB':>9}{'slots':>12}")
+    for mode, r in results.items():
+        slots = f"{r['slot_allocations']}/{r['slot_reuses']}" if mode == "arena" else "-"
+        print(f"{mode:<8}{r['churn_mb']:10.1f}{r['traced_peak_mb']:11.1f}{r['rss_growth_mb']:9.1f}{slots:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare audio backends: negotiated latency, callback timing and CPU cost.
+
+    python -m bench.audio_backends --seconds 10
+    python -m bench.audio_backends --backends pyaudio sounddevice --input-device 1 --output-device 3
+
+Each backend runs the AudioManager with a passthrough loop (captured
+chunks are written straight back to the output) for `--seconds`. Reported
+per backend:
+
+    in/out ms   buffer latency the backend negotiated for each stream
+    jitter      p50 / p95 deviation of callback intervals from the period
+    deliv p95   the same, as seen by the consumer of get_input_chunk
+    overflows   input callbacks flagged with lost audio
+    cpu %       process CPU time over wall time (one core = 100%)
+
+Backends that are not installed are listed as unavailable. Device indices
+default to the backend's default devices (null: silence in, null out).
+"""
+import argparse
+import time
+import numpy as np
+from core.audio_manager import AudioManager
+from core.audio_backends import BACKENDS, create_backend
+from core.metrics import REGISTRY
+
+VIRTUAL_DEVICES = {"null": (0, 2)}
+
+
+def run_backend(name: str, args) -> dict:
+    try:
+        backend = create_backend(name)
+    except ImportError as e:
+        return {"error": f"unavailable ({e})"}
+    in_idx, out_idx = VIRTUAL_DEVICES.get(name, (args.input_device, args.output_device))
+
+    jitter = REGISTRY.get("vc_capture_callback_jitter_seconds")
+    overflows = REGISTRY.get("vc_input_overflows_total")
+    intervals = []
+    mgr = AudioManager(backend=backend)
+    mgr.set_prebuffer(2)
+    try:
+        mgr.start_streams(in_idx, out_idx)
+    except Exception as e:
+        mgr.terminate()
+        return {"error": f"failed to open ({e})"}
+
+    overflows_before = overflows.value
+    jitter.load({"buckets": jitter.buckets, "counts": [0] * len(jitter.counts), "sum": 0.0, "count": 0})
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    last = None
+    while time.perf_counter() - wall_start < args.seconds:
+        chunk = mgr.get_input_chunk(timeout=0.1)
+        if not chunk:
+            continue
+        now = time.perf_counter()
+        if last is not None:
+            intervals.append(now - last)
+        last = now
+        mgr.write_output_chunk(chunk)
+    cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+    latency = dict(mgr.latency)
+    mgr.terminate()
+
+    period = mgr.chunk_size / float(mgr.rate)
+    deviation = np.abs(np.array(intervals) - period) if intervals else np.zeros(1)
+    return {
+        "in_ms": latency["input"] * 1000, "out_ms": latency["output"] * 1000,
+        "callback_p50_ms": jitter.quantile(0.5) * 1000, "callback_p95_ms": jitter.quantile(0.95) * 1000,
+        "delivery_p95_ms": float(np.percentile(deviation, 95)) * 1000,
+        "overflows": overflows.value - overflows_before, "cpu": cpu * 100,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", nargs="+", choices=[b for b in BACKENDS if b != "file"],
+                        default=["pyaudio", "sounddevice", "null"])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--input-device", type=int)
+    parser.add_argument("--output-device", type=int)
+    args = parser.parse_args()
+
+    print(f"{'backend':<13}{'in ms':>7}{'out ms':>8}{'jitter p50':>12}{'p95':>7}{'deliv p95':>11}{'overflows':>11}{'cpu %':>7}")
+    for name in args.backends:
+        r = run_backend(name, args)
+        if "error" in r:
+            print(f"{name:<13}{r['error']}")
+            continue
+        print(f"{name:<13}{r['in_ms']:7.1f}{r['out_ms']:8.1f}{r['callback_p50_ms']:12.2f}{r['callback_p95_ms']:7.2f}"
+              f"{r['delivery_p95_ms']:11.2f}{r['overflows']:11}{r['cpu']:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
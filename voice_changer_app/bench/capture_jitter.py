@@ -0,0 +1,142 @@
+"""
+Measure capture callback lateness with the audio core in-process vs in its own process.
+
+    python -m bench.capture_jitter --seconds 20 --load-threads 2
+    python -m bench.capture_jitter --device 1 --output-device 3 --seconds 30
+
+Simulated mode (default) runs a 64 ms periodic "callback" that does what
+the capture callback does per chunk (a small numpy pass, a queue put)
+while `--load-threads` GIL-bound threads stand in for Tk redraws, log
+flooding and the STS worker threads (HTTP uploads, response streaming,
+segmentation). "inproc" runs the callback next to the
+load; "process" runs it in a spawned child with the load left behind in
+the parent, as AudioCoreProcess does.
+
+`--device` opens real streams through AudioManager and AudioCoreProcess
+in turn, with the same load in this process, and reads the
+vc_capture_callback_jitter_seconds histogram.
+
+Lateness is how long after its due time each callback actually ran.
+"""
+import argparse
+import multiprocessing as mp
+import queue
+import threading
+import time
+import numpy as np
+from core.metrics import REGISTRY
+
+PERIOD = 1024 / 16000.0
+
+
+def gil_load(stop: threading.Event):
+    """Pure-Python busy work that holds the GIL in short bursts, like a UI loop."""
+    while not stop.is_set():
+        lines = [f"[LOG] {i} {i * 0.5:.3f}" for i in range(2000)]
+        "\n".join(lines).count("5")
+
+
+def fake_callback_loop(seconds: float, out=None):
+    """Periodic callback doing capture-callback-sized work; returns lateness samples."""
+    chunk = np.zeros(1024, dtype=np.int16).tobytes()
+    q = queue.Queue()
+    late = []
+    start = time.perf_counter()
+    due = start + PERIOD
+    while due - start < seconds:
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        late.append(max(0.0, time.perf_counter() - due))
+        samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+        float(np.sqrt(np.mean(samples ** 2)))
+        q.put(chunk)
+        if q.qsize() > 64:
+            q.get_nowait()
+        due += PERIOD
+    if out is not None:
+        out.send(late)
+    return late
+
+
+def with_load(threads: int, fn):
+    stop = threading.Event()
+    workers = [threading.Thread(target=gil_load, args=(stop,), daemon=True) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    try:
+        return fn()
+    finally:
+        stop.set()
+        for w in workers:
+            w.join()
+
+
+def run_simulated(args) -> dict:
+    results = {"inproc": with_load(args.load_threads, lambda: fake_callback_loop(args.seconds))}
+
+    def in_child():
+        ctx = mp.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(target=fake_callback_loop, args=(args.seconds, child_conn))
+        proc.start()
+        late = parent_conn.recv()
+        proc.join()
+        return late
+
+    results["process"] = with_load(args.load_threads, in_child)
+    return {mode: summarise(np.array(late)) for mode, late in results.items()}
+
+
+def summarise(late: np.ndarray) -> dict:
+    return {"n": len(late), "p50": float(np.percentile(late, 50)), "p95": float(np.percentile(late, 95)),
+            "p99": float(np.percentile(late, 99)), "max": float(late.max())}
+
+
+def run_device(args) -> dict:
+    from core.audio_manager import AudioManager
+    from core.audio_process import AudioCoreProcess
+
+    results = {}
+    for mode, cls in (("inproc", AudioManager), ("process", AudioCoreProcess)):
+        mgr = cls()
+        try:
+            mgr.start_streams(args.device, args.output_device)
+
+            def drain():
+                end = time.time() + args.seconds
+                while time.time() < end:
+                    chunk = mgr.get_input_chunk(timeout=0.1)
+                    if chunk:
+                        mgr.write_output_chunk(chunk)
+
+            with_load(args.load_threads, drain)
+            mgr.stop_streams()
+            time.sleep(0.5)  # Let the core's last stats arrive
+        finally:
+            mgr.terminate()
+        hist = REGISTRY.get("vc_capture_callback_jitter_seconds")
+        results[mode] = {"n": hist.count, "p50": hist.quantile(0.5), "p95": hist.quantile(0.95),
+                         "p99": hist.quantile(0.99), "max": float("nan")}
+        hist.load({"buckets": hist.buckets, "counts": [0] * len(hist.counts), "sum": 0.0, "count": 0})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--load-threads", type=int, default=2, help="GIL-heavy threads in the UI process")
+    parser.add_argument("--device", type=int, help="Input device index; measure real streams instead")
+    parser.add_argument("--output-device", type=int, help="Output device index (with --device)")
+    args = parser.parse_args()
+
+    results = run_device(args) if args.device is not None else run_simulated(args)
+    print(f"{args.load_threads} load threads, {args.seconds:.0f}s, period {PERIOD * 1000:.0f}ms")
+    print(f"{'mode':<9}{'callbacks':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for mode, r in results.items():
+        print(f"{mode:<9}{r['n']:>10}{r['p50'] * 1000:9.2f}{r['p95'] * 1000:9.2f}"
+              f"{r['p99'] * 1000:9.2f}{r['max'] * 1000:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
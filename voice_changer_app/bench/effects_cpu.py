@@ -0,0 +1,54 @@
+"""
+CPU cost of the local effects engine per audio-second.
+
+    python -m bench.effects_cpu --seconds 30
+
+Feeds a synthetic voiced signal through every preset in 1024-sample chunks
+(the live chunk size) and reports CPU time per audio-second and per chunk.
+"""
+import argparse
+import time
+import numpy as np
+from core.effects import VoiceEffect, PRESETS
+
+RATE = 16000
+CHUNK = 1024
+
+
+def synthetic_voice(seconds: float) -> bytes:
+    t = np.arange(int(RATE * seconds)) / RATE
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)  # gliding pitch
+    phase = 2 * np.pi * np.cumsum(f0) / RATE
+    x = sum(np.sin(h * phase) / h for h in range(1, 25))
+    x *= 0.5 * (1 + np.sin(2 * np.pi * 3 * t))  # syllable-rate envelope
+    x += np.random.default_rng(0).normal(0, 0.02, len(t))
+    return (np.clip(x * 0.2, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    pcm = synthetic_voice(args.seconds)
+    chunks = [pcm[i:i + CHUNK * 2] for i in range(0, len(pcm), CHUNK * 2)]
+    chunk_ms = CHUNK / RATE * 1000
+
+    print(f"{'preset':<12}{'cpu ms / audio-s':>18}{'ms / chunk':>12}{'max ms':>9}{'% of RT':>9}")
+    for preset in PRESETS:
+        effect = VoiceEffect(preset)
+        per_chunk = []
+        cpu_start = time.process_time()
+        for chunk in chunks:
+            t0 = time.perf_counter()
+            effect.process(chunk)
+            per_chunk.append((time.perf_counter() - t0) * 1000)
+        cpu = time.process_time() - cpu_start
+
+        mean_ms = sum(per_chunk) / len(per_chunk)
+        print(f"{preset:<12}{cpu / args.seconds * 1000:18.1f}{mean_ms:12.2f}{max(per_chunk):9.2f}"
+              f"{mean_ms / chunk_ms * 100:8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
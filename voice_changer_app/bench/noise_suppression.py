@@ -0,0 +1,126 @@
+"""
+Local noise suppression: CPU cost, effect on the VAD, and API time saved.
+
+    python -m bench.noise_suppression --seconds 30 --snr 10
+    python -m bench.noise_suppression --api --voice <voice_id> --runs 5
+
+Mixes a synthetic voiced signal (1.5 s on / 1.5 s off) with white noise
+and feeds it through the suppressor in 1024-sample chunks, reporting CPU
+time per chunk, output SNR and how often the VAD is right before and
+after suppression. With --api, the same phrase is converted with the
+server-side `remove_background_noise` flag on and off, and the time to
+first byte and total time of each are compared.
+"""
+import argparse
+import time
+import numpy as np
+from core.denoise import NoiseSuppressor
+from core.vad import VAD
+from bench.effects_cpu import synthetic_voice
+
+RATE = 16000
+CHUNK = 1024
+
+
+def noisy_speech(seconds: float, snr_db: float):
+    clean = np.frombuffer(synthetic_voice(seconds), dtype=np.int16).astype(np.float64)
+    t = np.arange(len(clean)) / RATE
+    clean *= (t % 3.0) >= 1.5
+    speech_power = np.mean(clean[clean != 0] ** 2)
+    noise = np.random.default_rng(1).normal(0, np.sqrt(speech_power / 10 ** (snr_db / 10)), len(clean))
+    mixed = np.clip(clean + noise, -32768, 32767).astype(np.int16).tobytes()
+    return mixed, clean, noise, (t % 3.0) >= 1.5
+
+
+def snr(signal: np.ndarray, error: np.ndarray) -> float:
+    return 10 * np.log10(np.sum(signal ** 2) / max(np.sum(error ** 2), 1e-9))
+
+
+def vad_accuracy(decisions, truth) -> float:
+    per_chunk = truth[:len(decisions) * CHUNK].reshape(-1, CHUNK).mean(axis=1) > 0.5
+    return float(np.mean(np.asarray(decisions) == per_chunk))
+
+
+def bench_local(args):
+    mixed, clean, noise, truth = noisy_speech(args.seconds, args.snr)
+    chunks = [mixed[i:i + CHUNK * 2] for i in range(0, len(mixed) - CHUNK * 2 + 1, CHUNK * 2)]
+    suppressor = NoiseSuppressor()
+    vad = VAD(args.vad_threshold)
+
+    raw_decisions, decisions, per_chunk, out = [], [], [], []
+    speech = False
+    cpu_start = time.process_time()
+    for chunk in chunks:
+        t0 = time.perf_counter()
+        cleaned = suppressor.process(chunk, speech=speech)
+        per_chunk.append((time.perf_counter() - t0) * 1000)
+        speech, _ = vad.is_speech(cleaned)
+        decisions.append(speech)
+        raw_decisions.append(vad.is_speech(chunk)[0])
+        out.append(cleaned)
+    cpu = time.process_time() - cpu_start
+
+    # Score after the first 3 s (noise estimate settling), latency-aligned
+    y = np.frombuffer(b"".join(out), dtype=np.int16).astype(np.float64)[suppressor.latency:]
+    n = len(y)
+    start = 3 * RATE
+    chunk_ms = CHUNK / RATE * 1000
+    mean_ms = sum(per_chunk) / len(per_chunk)
+
+    print(f"chunks: {len(chunks)} x {CHUNK} samples, latency added: {suppressor.latency / RATE * 1000:.0f} ms")
+    print(f"cpu: {cpu / args.seconds * 1000:.1f} ms / audio-s, {mean_ms:.2f} ms / chunk "
+          f"(max {max(per_chunk):.2f}), {mean_ms / chunk_ms * 100:.1f}% of real time")
+    print(f"snr: {snr(clean[start:n], noise[start:n]):.1f} dB in -> "
+          f"{snr(clean[start:n], y[start:] - clean[start:n]):.1f} dB out")
+    print(f"noise floor estimate: {suppressor.noise_floor:.0f} (actual {np.std(noise):.0f}) RMS")
+    print(f"vad accuracy: {vad_accuracy(raw_decisions, truth) * 100:.0f}% raw -> "
+          f"{vad_accuracy(decisions, truth) * 100:.0f}% suppressed (threshold {args.vad_threshold})")
+
+
+def bench_api(args):
+    from utils.settings import Settings
+    from core.sts_processor import STSProcessor
+
+    settings = Settings()
+    if not settings.api_key:
+        print("No API key (set ELEVENLABS_API_KEY or save one in the app)")
+        return
+    processor = STSProcessor(settings.api_key)
+    processor.set_voice(args.voice or settings.voice_id)
+
+    mixed, _, _, _ = noisy_speech(3.0, args.snr)
+    phrase = mixed[int(1.4 * RATE) * 2:int(3.0 * RATE) * 2] * 2  # ~3 s of speech-bearing audio
+
+    print(f"{'server flag':<14}{'ttfb p50':>10}{'total p50':>11}")
+    for flag in (True, False):
+        processor.remove_background_noise = flag
+        ttfbs, totals = [], []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            ttfb = None
+            for chunk in processor.convert_stream(phrase):
+                if ttfb is None and chunk:
+                    ttfb = time.perf_counter() - t0
+            totals.append(time.perf_counter() - t0)
+            ttfbs.append(ttfb or totals[-1])
+        print(f"{str(flag):<14}{np.median(ttfbs):10.2f}{np.median(totals):11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--snr", type=float, default=10.0, help="Speech-to-noise ratio of the mix (dB)")
+    parser.add_argument("--vad-threshold", type=float, default=500.0)
+    parser.add_argument("--api", action="store_true", help="Also time real conversions with the flag on/off")
+    parser.add_argument("--voice", default=None)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    bench_local(args)
+    if args.api:
+        print()
+        bench_api(args)
+
+
+if __name__ == "__main__":
+    main()
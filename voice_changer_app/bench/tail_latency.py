@@ -0,0 +1,99 @@
+"""
+Tail-latency benchmark for STSProcessor against a mock backend with injected stalls.
+
+    python -m bench.tail_latency --phrases 200 --stall-rate 0.05
+
+Runs the same phrase sequence with hedging disabled and enabled and reports
+time-to-first-audio percentiles for each.
+"""
+import argparse
+import random
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from core.sts_processor import STSProcessor
+from core.phrase import Phrase
+
+
+class MockBackend:
+    """Stands in for client.speech_to_speech: lognormal TTFB, occasional stalls."""
+    def __init__(self, ttfb_median: float, stall_rate: float, stall_seconds: float, seed: int):
+        self.ttfb_median = ttfb_median
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.rng = random.Random(seed)
+        self.speech_to_speech = self
+        self.with_raw_response = SimpleNamespace(convert=self.raw_convert)
+
+    def convert(self, voice_id, audio, **kwargs):
+        if not isinstance(audio, bytes):
+            audio = audio.read()
+        ttfb = self.ttfb_median * self.rng.lognormvariate(0.0, 0.35)
+        if self.rng.random() < self.stall_rate:
+            ttfb += self.stall_seconds
+
+        def stream():
+            time.sleep(ttfb)
+            for i in range(0, len(audio), 4096):
+                time.sleep(0.005)
+                yield audio[i:i + 4096]
+        return stream()
+
+    @contextmanager
+    def raw_convert(self, voice_id, audio, **kwargs):
+        """with_raw_response.convert: the same stream, plus the headers the limiter reads."""
+        yield SimpleNamespace(data=self.convert(voice_id, audio, **kwargs),
+                              headers={"maximum-concurrent-requests": "4"})
+
+
+class TimingSink:
+    """Records when the first converted chunk of each phrase reaches the output."""
+    def __init__(self):
+        self.first_chunk_at = None
+
+    def write_output_chunk(self, data: bytes):
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.time()
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+
+def run(hedge: bool, args) -> list:
+    processor = STSProcessor("mock-key")
+    processor.client = MockBackend(args.ttfb, args.stall_rate, args.stall_seconds, args.seed)
+    processor.set_voice("mock-voice")
+    processor.hedge_enabled = hedge
+    processor.fallback_mode = "silence"
+
+    phrase = bytes(32000)  # 1s of audio
+    latencies = []
+    for _ in range(args.phrases):
+        sink = TimingSink()
+        started = time.time()
+        processor._process_single_chunk(Phrase(phrase), sink)
+        end = sink.first_chunk_at or time.time()
+        latencies.append(end - started)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--phrases", type=int, default=200)
+    parser.add_argument("--ttfb", type=float, default=0.3, help="Median time-to-first-byte (s)")
+    parser.add_argument("--stall-rate", type=float, default=0.05)
+    parser.add_argument("--stall-seconds", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'p50':>8}{'p90':>8}{'p99':>8}{'max':>8}")
+    for hedge in (False, True):
+        lat = run(hedge, args)
+        label = "hedged" if hedge else "baseline"
+        print(f"{label:<10}" + "".join(f"{percentile(lat, p):8.2f}" for p in (50, 90, 99)) + f"{max(lat):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
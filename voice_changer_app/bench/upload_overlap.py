@@ -0,0 +1,122 @@
+"""
+Verify that streamed request bodies overlap the upload with speech.
+
+    python -m bench.upload_overlap --speech 4 --uplink-kbps 384
+
+Starts a local HTTP stand-in for the speech-to-speech endpoint that reads
+the request body at a throttled "uplink" rate and records when each piece
+arrives. The same phrase is then sent as a complete body after
+end-of-speech and as a live body fed in real time; for each, the report
+shows how long after end-of-speech the upload finished and the response
+started.
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core.streaming_upload import LiveAudioBody, StreamingTransport
+
+CHUNK_BYTES = 2048      # 1024 samples of 16-bit audio
+CHUNK_SECONDS = 1024 / 16000.0
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        arrivals = self.server.arrivals
+        arrivals.clear()
+
+        def read(n):
+            # Throttle to the simulated uplink
+            data = self.rfile.read(n)
+            time.sleep(len(data) / self.server.uplink_bytes_per_sec)
+            arrivals.append((time.time(), len(data)))
+            return data
+
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            self.server.chunked = True
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                remaining = size
+                while remaining:
+                    remaining -= len(read(min(remaining, 1024)))
+                self.rfile.readline()
+        else:
+            self.server.chunked = False
+            remaining = int(self.headers.get("Content-Length", 0))
+            while remaining:
+                remaining -= len(read(min(remaining, 1024)))
+
+        body = bytes(32000)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_mode(mode: str, transport: StreamingTransport, server, speech_seconds: float) -> dict:
+    n_chunks = int(speech_seconds / CHUNK_SECONDS)
+    chunks = [bytes(CHUNK_BYTES) for _ in range(n_chunks)]
+    result = {}
+
+    def consume(audio):
+        for _ in transport.convert("voice", audio, fields={"model_id": "stand-in"}, params={}):
+            if "first_response" not in result:
+                result["first_response"] = time.time()
+
+    if mode == "live":
+        body = LiveAudioBody()
+        worker = threading.Thread(target=consume, args=(body,))
+        worker.start()
+        for chunk in chunks:
+            body.feed(chunk)
+            time.sleep(CHUNK_SECONDS)   # Real-time capture
+        end_of_speech = time.time()
+        body.close()
+    else:
+        time.sleep(n_chunks * CHUNK_SECONDS)
+        end_of_speech = time.time()
+        worker = threading.Thread(target=consume, args=([b"".join(chunks)],))
+        worker.start()
+    worker.join()
+
+    first_arrival = server.arrivals[0][0]
+    last_arrival = server.arrivals[-1][0]
+    return {
+        "chunked": server.chunked,
+        "upload_started": first_arrival - end_of_speech,
+        "upload_done": last_arrival - end_of_speech,
+        "first_response": result["first_response"] - end_of_speech,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--speech", type=float, default=4.0, help="Phrase length (s)")
+    parser.add_argument("--uplink-kbps", type=float, default=384.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.uplink_bytes_per_sec = args.uplink_kbps * 1000 / 8
+    server.arrivals = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    transport = StreamingTransport("stand-in", base_url=f"http://127.0.0.1:{server.server_port}")
+
+    print("Times relative to end-of-speech (negative = before the user stopped talking)")
+    print(f"{'mode':<8}{'chunked':>9}{'upload start':>14}{'upload done':>13}{'first audio':>13}")
+    for mode in ("bytes", "live"):
+        r = run_mode(mode, transport, server, args.speech)
+        print(f"{mode:<8}{str(r['chunked']):>9}{r['upload_started']:14.2f}{r['upload_done']:13.2f}{r['first_response']:13.2f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
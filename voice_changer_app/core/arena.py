@@ -0,0 +1,130 @@
+import io
+import threading
+from typing import Dict, List
+
+
+class PCMBuffer:
+    """
+    A fixed-capacity slot from a PCMArena. Audio is appended in place and
+    read back as read-only memoryviews, so nothing is copied on the way
+    downstream. The slot goes back to the pool when the last holder
+    releases it.
+    """
+    def __init__(self, arena: "PCMArena", capacity: int):
+        self.arena = arena
+        self.slot = bytearray(capacity)
+        self.length = 0
+        self.refs = 1
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def capacity(self) -> int:
+        return len(self.slot)
+
+    @property
+    def free(self) -> int:
+        return len(self.slot) - self.length
+
+    def extend(self, chunk: bytes):
+        end = self.length + len(chunk)
+        if end > len(self.slot):
+            raise BufferError(f"PCM slot full ({len(self.slot)} bytes)")
+        self.slot[self.length:end] = chunk
+        self.length = end
+
+    def clear(self):
+        self.length = 0
+
+    def view(self) -> memoryview:
+        """Everything written so far. Later writes never touch this range."""
+        return memoryview(self.slot)[:self.length].toreadonly()
+
+    def retain(self) -> "PCMBuffer":
+        with self.arena._lock:
+            self.refs += 1
+        return self
+
+    def release(self):
+        self.arena._release(self)
+
+
+class PCMArena:
+    """
+    Pool of preallocated PCM slots for phrase audio. Slots are sized for
+    the longest phrase, reused across phrases, and only allocated when
+    every pooled slot is in use (or the phrase limit grew).
+    """
+    def __init__(self, slot_bytes: int, preallocate: int = 2, max_free: int = 4):
+        self.slot_bytes = slot_bytes
+        self.max_free = max_free
+        self._free: List[PCMBuffer] = []
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"allocations": 0, "reuses": 0, "in_use": 0, "peak_in_use": 0}
+        for _ in range(preallocate):
+            self._free.append(self._allocate())
+
+    def _allocate(self) -> PCMBuffer:
+        self.stats["allocations"] += 1
+        buf = PCMBuffer(self, self.slot_bytes)
+        buf.refs = 0
+        return buf
+
+    def acquire(self) -> PCMBuffer:
+        with self._lock:
+            while self._free:
+                buf = self._free.pop()
+                if buf.capacity >= self.slot_bytes:
+                    self.stats["reuses"] += 1
+                    break
+            else:
+                buf = self._allocate()
+            buf.length = 0
+            buf.refs = 1
+            self.stats["in_use"] += 1
+            self.stats["peak_in_use"] = max(self.stats["peak_in_use"], self.stats["in_use"])
+            return buf
+
+    def _release(self, buf: PCMBuffer):
+        with self._lock:
+            if buf.refs <= 0:
+                return
+            buf.refs -= 1
+            if buf.refs:
+                return
+            self.stats["in_use"] -= 1
+            # Undersized slots (the phrase limit grew) are left to the GC
+            if len(self._free) < self.max_free and buf.capacity >= self.slot_bytes:
+                self._free.append(buf)
+
+
+class PCMReader(io.RawIOBase):
+    """Seekable file object over a memoryview, for uploads that want a file."""
+    name = "audio.pcm"
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, b) -> int:
+        n = min(len(b), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
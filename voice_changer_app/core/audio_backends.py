@@ -0,0 +1,365 @@
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# callback(pcm, frames, overflowed) runs on the backend's audio thread
+InputCallback = Callable[[bytes, int, bool], None]
+
+
+class AudioBackend:
+    """
+    Audio I/O behind AudioManager: device listing plus 16-bit mono input
+    (callback) and output (blocking write) streams. Streams expose
+    start/stop/close/is_active/write and `latency`, the buffer latency in
+    seconds that the backend actually negotiated.
+    """
+    name = "base"
+
+    def get_devices(self) -> List[Dict]:
+        raise NotImplementedError
+
+    def open_input(self, device: int, rate: int, chunk: int, callback: InputCallback):
+        raise NotImplementedError
+
+    def open_output(self, device: int, rate: int, chunk: int):
+        raise NotImplementedError
+
+    def terminate(self):
+        pass
+
+
+# --- PortAudio via PyAudio ---
+
+class _PyAudioStream:
+    def __init__(self, stream, is_input: bool):
+        self._stream = stream
+        self._input = is_input
+
+    @property
+    def latency(self) -> float:
+        if self._input:
+            return self._stream.get_input_latency()
+        return self._stream.get_output_latency()
+
+    def start(self):
+        self._stream.start_stream()
+
+    def stop(self):
+        if self._stream.is_active():
+            self._stream.stop_stream()
+
+    def close(self):
+        self._stream.close()
+
+    def is_active(self) -> bool:
+        return self._stream.is_active()
+
+    def write(self, data: bytes):
+        self._stream.write(data)
+
+
+class PyAudioBackend(AudioBackend):
+    name = "pyaudio"
+
+    def __init__(self):
+        import pyaudio
+        self._pa = pyaudio
+        self.p = pyaudio.PyAudio()
+
+    def get_devices(self) -> List[Dict]:
+        devices = []
+        for i in range(self.p.get_device_count()):
+            dev = self.p.get_device_info_by_index(i)
+            if dev['maxInputChannels'] > 0:
+                devices.append({"index": i, "name": dev['name'], "type": "input"})
+            elif dev['maxOutputChannels'] > 0:
+                devices.append({"index": i, "name": dev['name'], "type": "output"})
+        return devices
+
+    def open_input(self, device: int, rate: int, chunk: int, callback: InputCallback):
+        pa = self._pa
+
+        def pa_callback(in_data, frame_count, time_info, status):
+            callback(in_data, frame_count, bool(status & pa.paInputOverflow))
+            return (None, pa.paContinue)
+
+        stream = self.p.open(format=pa.paInt16, channels=1, rate=rate, input=True, input_device_index=device,
+                             frames_per_buffer=chunk, stream_callback=pa_callback, start=False)
+        return _PyAudioStream(stream, is_input=True)
+
+    def open_output(self, device: int, rate: int, chunk: int):
+        stream = self.p.open(format=self._pa.paInt16, channels=1, rate=rate, output=True,
+                             output_device_index=device, frames_per_buffer=chunk, start=False)
+        return _PyAudioStream(stream, is_input=False)
+
+    def terminate(self):
+        self.p.terminate()
+
+
+# --- PortAudio via sounddevice ---
+
+class _SoundDeviceStream:
+    def __init__(self, stream, error_cls):
+        self._stream = stream
+        self._error_cls = error_cls
+
+    @property
+    def latency(self) -> float:
+        return float(self._stream.latency)
+
+    def start(self):
+        self._stream.start()
+
+    def stop(self):
+        if self._stream.active:
+            self._stream.stop()
+
+    def close(self):
+        self._stream.close()
+
+    def is_active(self) -> bool:
+        return self._stream.active
+
+    def write(self, data: bytes):
+        try:
+            self._stream.write(data)
+        except self._error_cls as e:
+            raise OSError(str(e)) from e  # Same failure type as PyAudio's
+
+
+class SoundDeviceBackend(AudioBackend):
+    name = "sounddevice"
+
+    def __init__(self, latency="low"):
+        import sounddevice
+        self.sd = sounddevice
+        self.latency = latency
+
+    def get_devices(self) -> List[Dict]:
+        devices = []
+        for i, dev in enumerate(self.sd.query_devices()):
+            if dev['max_input_channels'] > 0:
+                devices.append({"index": i, "name": dev['name'], "type": "input"})
+            elif dev['max_output_channels'] > 0:
+                devices.append({"index": i, "name": dev['name'], "type": "output"})
+        return devices
+
+    def open_input(self, device: int, rate: int, chunk: int, callback: InputCallback):
+        def sd_callback(indata, frames, time_info, status):
+            callback(bytes(indata), frames, bool(status.input_overflow))
+
+        stream = self.sd.RawInputStream(samplerate=rate, blocksize=chunk, device=device, channels=1,
+                                        dtype="int16", latency=self.latency, callback=sd_callback)
+        return _SoundDeviceStream(stream, self.sd.PortAudioError)
+
+    def open_output(self, device: int, rate: int, chunk: int):
+        stream = self.sd.RawOutputStream(samplerate=rate, blocksize=chunk, device=device, channels=1,
+                                         dtype="int16", latency=self.latency)
+        return _SoundDeviceStream(stream, self.sd.PortAudioError)
+
+
+# --- Virtual devices (no sound card) ---
+
+class _PacedInput:
+    """Calls back with one chunk per chunk-period of wall time, like a sound card."""
+    def __init__(self, rate: int, chunk: int, callback: InputCallback, source: Callable[[int], bytes],
+                 realtime: bool = True):
+        self.rate = rate
+        self.chunk = chunk
+        self.callback = callback
+        self.source = source
+        self.realtime = realtime
+        self.latency = chunk / float(rate)
+        self._active = False
+        self._thread = None
+
+    def start(self):
+        self._active = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        due = time.perf_counter()
+        while self._active:
+            if self.realtime:
+                due += self.latency
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            data = self.source(self.chunk)
+            if data is None:
+                self._active = False  # Source ran out
+                return
+            self.callback(data, self.chunk, False)
+
+    def stop(self):
+        self._active = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def close(self):
+        self.stop()
+
+    def is_active(self) -> bool:
+        return self._active
+
+    def write(self, data: bytes):
+        raise IOError("input stream")
+
+
+class _PacedOutput:
+    """Consumes audio at the sample rate, blocking once `buffer_chunks` are queued."""
+    def __init__(self, rate: int, chunk: int, sink: Callable[[bytes], None], buffer_chunks: int = 2,
+                 realtime: bool = True, on_close: Optional[Callable[[], None]] = None, fill_gaps: bool = False):
+        self.rate = rate
+        self.sink = sink
+        self.on_close = on_close
+        self.fill_gaps = fill_gaps      # Record the silence while nothing was written
+        self.realtime = realtime
+        self.latency = buffer_chunks * chunk / float(rate)
+        self._clock = None
+        self._active = False
+
+    def start(self):
+        self._active = True
+        self._clock = None
+
+    def write(self, data: bytes):
+        now = time.perf_counter()
+        if self._clock is None or self._clock < now:
+            if self.fill_gaps and self._clock is not None:
+                self.sink(bytes(int((now - self._clock) * self.rate) * 2))
+            self._clock = now  # Ran dry: playback restarts from here
+        self._clock += len(data) / (2.0 * self.rate)
+        self.sink(data)
+        if self.realtime:
+            ahead = self._clock - now - self.latency
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def stop(self):
+        self._active = False
+
+    def close(self):
+        self.stop()
+        if self.on_close:
+            self.on_close()
+            self.on_close = None
+
+    def is_active(self) -> bool:
+        return self._active
+
+
+class NullBackend(AudioBackend):
+    """
+    Virtual devices: input 0 is silence, input 1 plays back whatever was
+    written to the outputs (loopback); output 2 discards. Paced in real
+    time unless `realtime` is False.
+    """
+    name = "null"
+
+    def __init__(self, realtime: bool = True):
+        self.realtime = realtime
+        self._loop = bytearray()
+        self._loop_lock = threading.Lock()
+
+    def get_devices(self) -> List[Dict]:
+        return [
+            {"index": 0, "name": "Silence", "type": "input"},
+            {"index": 1, "name": "Loopback", "type": "input"},
+            {"index": 2, "name": "Null Output", "type": "output"},
+        ]
+
+    def _loopback(self, frames: int) -> bytes:
+        n = frames * 2
+        with self._loop_lock:
+            data = bytes(self._loop[:n])
+            del self._loop[:n]
+        return data + bytes(n - len(data))
+
+    def _sink(self, data: bytes):
+        with self._loop_lock:
+            self._loop.extend(data)
+            # Nobody reading the loopback: keep only the last few seconds
+            excess = len(self._loop) - 32000 * 5
+            if excess > 0:
+                del self._loop[:excess]
+
+    def open_input(self, device: int, rate: int, chunk: int, callback: InputCallback):
+        source = self._loopback if device == 1 else (lambda frames: bytes(frames * 2))
+        return _PacedInput(rate, chunk, callback, source, self.realtime)
+
+    def open_output(self, device: int, rate: int, chunk: int):
+        return _PacedOutput(rate, chunk, self._sink, realtime=self.realtime)
+
+
+class FileBackend(AudioBackend):
+    """
+    Input 0 reads a WAV or raw PCM file (looping if asked, then silence);
+    output 1 records everything played into a 16 kHz WAV file.
+    """
+    name = "file"
+
+    def __init__(self, input_path: Optional[str] = None, output_path: Optional[str] = None,
+                 loop: bool = False, realtime: bool = True):
+        self.input_path = Path(input_path) if input_path else None
+        self.output_path = Path(output_path) if output_path else None
+        self.loop = loop
+        self.realtime = realtime
+        self.finished = threading.Event()   # Set once the input file has been played
+
+    def get_devices(self) -> List[Dict]:
+        devices = []
+        if self.input_path:
+            devices.append({"index": 0, "name": f"File: {self.input_path.name}", "type": "input"})
+        if self.output_path:
+            devices.append({"index": 1, "name": f"File: {self.output_path.name}", "type": "output"})
+        return devices
+
+    def open_input(self, device: int, rate: int, chunk: int, callback: InputCallback):
+        from core.batch_converter import read_pcm_chunks
+        if not self.input_path:
+            raise IOError("file backend has no input file")
+        self.finished.clear()
+        chunks = read_pcm_chunks(self.input_path, chunk)
+
+        def source(frames: int) -> bytes:
+            nonlocal chunks
+            data = next(chunks, None) if chunks else None
+            if data is None and self.loop:
+                chunks = read_pcm_chunks(self.input_path, frames)
+                data = next(chunks, None)
+            if data is None:
+                # Played out: keep the clock running on silence
+                chunks = None
+                self.finished.set()
+                return bytes(frames * 2)
+            return data + bytes(frames * 2 - len(data))
+
+        return _PacedInput(rate, chunk, callback, source, self.realtime)
+
+    def open_output(self, device: int, rate: int, chunk: int):
+        if not self.output_path:
+            raise IOError("file backend has no output file")
+        wav_file = wave.open(str(self.output_path), "wb")
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        return _PacedOutput(rate, chunk, wav_file.writeframes, realtime=self.realtime, on_close=wav_file.close,
+                            fill_gaps=self.realtime)
+
+
+BACKENDS = {
+    "pyaudio": PyAudioBackend,
+    "sounddevice": SoundDeviceBackend,
+    "file": FileBackend,
+    "null": NullBackend,
+}
+
+
+def create_backend(name: str = "pyaudio", **kwargs) -> AudioBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"unknown audio backend '{name}' (have: {', '.join(BACKENDS)})")
+    return BACKENDS[name](**kwargs)
@@ -1,7 +1,24 @@
-import pyaudio
 import threading
 import queue
+import time
+import numpy as np
 from typing import Optional, List, Dict
+from core.drift import DriftEstimator, FractionalResampler
+from core.catchup import CatchUp
+from core.output_bus import OutputChannel, apply_gain
+from core.audio_backends import AudioBackend, create_backend
+from core.metrics import REGISTRY
+from core.profiler import PROFILER
+
+FRAMES_CAPTURED = REGISTRY.counter("vc_input_frames_total", "Audio frames delivered by the input callback")
+FRAMES_DROPPED = REGISTRY.counter("vc_input_frames_dropped_total", "Input frames discarded because streaming was stopping")
+INPUT_OVERFLOWS = REGISTRY.counter("vc_input_overflows_total", "Input callbacks flagged with a device overflow (audio lost)")
+JITTER_OVERFLOWS = REGISTRY.counter("vc_jitter_overflow_drops_total", "Output chunks dropped because the jitter buffer was full")
+UNDERRUNS = REGISTRY.counter("vc_playback_underruns_total", "Playback ran dry for under 0.5 s before more audio arrived")
+WRITE_ERRORS = REGISTRY.counter("vc_output_write_errors_total", "Failed writes to the output device")
+CALLBACK_JITTER = REGISTRY.histogram("vc_capture_callback_jitter_seconds",
+                                     "Deviation of input callback intervals from the buffer period",
+                                     buckets=(0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2))
 
 class JitterBuffer:
     """
@@ -12,6 +29,7 @@ class JitterBuffer:
         self.buffer = queue.Queue(maxsize=max_size)
         self.target_size = target_size  # Number of chunks to pre-buffer
         self.is_primed = False
+        self.queued_bytes = 0
         self._lock = threading.Lock()
     
     def add_chunk(self, data: bytes):
@@ -19,11 +37,12 @@ class JitterBuffer:
         try:
             self.buffer.put(data, block=False)
             with self._lock:
+                self.queued_bytes += len(data)
                 if not self.is_primed and self.buffer.qsize() >= self.target_size:
                     self.is_primed = True
         except queue.Full:
             # Buffer full, drop oldest or skip (we skip here)
-            pass
+            JITTER_OVERFLOWS.inc()
     
     def get_chunk(self, timeout=0.1) -> Optional[bytes]:
         """Get chunk for playback (only after primed)"""
@@ -31,9 +50,12 @@ class JitterBuffer:
             if not self.is_primed:
                 return None
         try:
-            return self.buffer.get(timeout=timeout)
+            chunk = self.buffer.get(timeout=timeout)
         except queue.Empty:
             return None
+        with self._lock:
+            self.queued_bytes -= len(chunk)
+        return chunk
     
     def reset(self):
         """Clear buffer and reset priming"""
@@ -44,78 +66,123 @@ class JitterBuffer:
                 except queue.Empty:
                     break
             self.is_primed = False
+            self.queued_bytes = 0
 
 class AudioManager:
-    def __init__(self, max_buffer_size=2048):
-        self.p = pyaudio.PyAudio()
+    CHUNK_SIZE = 1024
+
+    def __init__(self, max_buffer_size=2048, backend="pyaudio", backend_options: Optional[Dict] = None,
+                 gauges: bool = True):
+        # A backend name ("pyaudio", "sounddevice", "file", "null") or an AudioBackend
+        if isinstance(backend, AudioBackend):
+            self.backend = backend
+        else:
+            self.backend = create_backend(backend, **(backend_options or {}))
         self.input_stream = None
         self.output_stream = None
         self.is_running = False
         
         self.input_queue = queue.Queue()
-        self.jitter_buffer = JitterBuffer(target_size=5, max_size=max_buffer_size)
+        self.prebuffer_chunks = 5
+        self.jitter_buffer = JitterBuffer(target_size=self.prebuffer_chunks, max_size=max_buffer_size)
         self._output_thread = None
         
-        self.chunk_size = 1024
-        self.format = pyaudio.paInt16
+        self.chunk_size = self.CHUNK_SIZE
         self.channels = 1
         self.rate = 16000
+        # Buffer latency the backend negotiated for each stream, in seconds
+        self.latency = {"input": 0.0, "output": 0.0}
+
+        # Input/output device clock drift compensation
+        self.drift_compensation = True
+        self.drift = DriftEstimator(rate=self.rate)
+        self._resampler = FractionalResampler()
+
+        # Output bus: gain of the main output, plus extra devices that play the same audio
+        self.output_gain = 1.0
+        self.extra_outputs = []
+        self.bus: List[OutputChannel] = []
+
+        # Playback latency cap (0 disables)
+        self.catchup = CatchUp(rate=self.rate)
+        self.catchup.on_log = self._log
+        self.on_log = None
+        self._last_callback = None
+
+        if gauges:
+            self._register_gauges()
+
+    def _register_gauges(self):
+        REGISTRY.gauge("vc_jitter_buffer_seconds", "Audio waiting in the playback buffer",
+                       fn=lambda: self.jitter_buffer.queued_bytes / (self.rate * 2.0))
+        REGISTRY.gauge("vc_input_queue_chunks", "Captured chunks waiting for the processing loop",
+                       fn=lambda: self.input_queue.qsize())
+        REGISTRY.gauge("vc_input_device_latency_seconds", "Input buffer latency negotiated with the audio backend",
+                       fn=lambda: self.latency["input"])
+        REGISTRY.gauge("vc_output_device_latency_seconds", "Output buffer latency negotiated with the audio backend",
+                       fn=lambda: self.latency["output"])
+
+    def _log(self, msg: str):
+        if self.on_log: self.on_log(msg)
 
     def set_buffer_size(self, max_size):
         """Update JitterBuffer size (only call when stopped)"""
         if not self.is_running:
-            self.jitter_buffer = JitterBuffer(target_size=5, max_size=max_size)
+            self.jitter_buffer = JitterBuffer(target_size=self.prebuffer_chunks, max_size=max_size)
+
+    def set_prebuffer(self, chunks: int):
+        """Number of chunks to collect before playback starts."""
+        self.prebuffer_chunks = max(1, int(chunks))
+        self.jitter_buffer.target_size = self.prebuffer_chunks
 
     def get_devices(self) -> List[Dict]:
         """List all available audio inputs and outputs."""
-        devices = []
-        for i in range(self.p.get_device_count()):
-            dev = self.p.get_device_info_by_index(i)
-            if dev['maxInputChannels'] > 0:
-                devices.append({"index": i, "name": dev['name'], "type": "input"})
-            elif dev['maxOutputChannels'] > 0:
-                devices.append({"index": i, "name": dev['name'], "type": "output"})
-        return devices
-
-    def start_streams(self, input_idx: int, output_idx: int):
-        """Start input and output streams."""
+        return self.backend.get_devices()
+
+    def start_streams(self, input_idx: Optional[int], output_idx: int):
+        """Start input and output streams (output only if input_idx is None)."""
         if self.is_running:
             self.stop_streams()
 
         try:
-            def input_callback(in_data, frame_count, time_info, status):
+            period = self.chunk_size / float(self.rate)
+            self._last_callback = None
+
+            def input_callback(in_data, frame_count, overflowed):
+                started = PROFILER.clock()
+                now = time.perf_counter()
+                if self._last_callback is not None:
+                    CALLBACK_JITTER.observe(abs(now - self._last_callback - period))
+                self._last_callback = now
+                FRAMES_CAPTURED.inc(frame_count)
+                if overflowed:
+                    INPUT_OVERFLOWS.inc()
                 if self.is_running:
                     self.input_queue.put(in_data)
                     # print(".", end="", flush=True) # Debug visualizer
-                return (None, pyaudio.paContinue)
-
-            self.input_stream = self.p.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.rate,
-                input=True,
-                input_device_index=input_idx,
-                frames_per_buffer=self.chunk_size,
-                stream_callback=input_callback
-            )
-            
-            self.output_stream = self.p.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.rate,
-                output=True,
-                output_device_index=output_idx,
-                frames_per_buffer=self.chunk_size
-            )
+                else:
+                    FRAMES_DROPPED.inc(frame_count)
+                PROFILER.record("input_callback", started)
+
+            if input_idx is not None:
+                self.input_stream = self.backend.open_input(input_idx, self.rate, self.chunk_size, input_callback)
+            self.output_stream = self.backend.open_output(output_idx, self.rate, self.chunk_size)
             
             self.is_running = True
-            self.input_stream.start_stream()
-            self.output_stream.start_stream()
+            if self.input_stream:
+                self.input_stream.start()
+            self.output_stream.start()
+            self.latency = {"input": self.input_stream.latency if self.input_stream else 0.0,
+                            "output": self.output_stream.latency}
             
+            self._open_bus()
             self._output_thread = threading.Thread(target=self._output_loop, daemon=True)
             self._output_thread.start()
             
-            print(f"Audio streams started on In:{input_idx} Out:{output_idx}")
+            msg = (f"[AUDIO] {self.backend.name} streams started on In:{input_idx} Out:{output_idx} "
+                   f"(latency in {self.latency['input'] * 1000:.0f}ms, out {self.latency['output'] * 1000:.0f}ms)")
+            print(msg)
+            self._log(msg)
             
         except Exception as e:
             print(f"Error starting streams: {e}")
@@ -124,13 +191,137 @@ class AudioManager:
     
     def _output_loop(self):
         """Background thread that continuously drains jitter buffer to output"""
+        dry_since = None
+        write_errors = 0
         while self.is_running:
             chunk = self.jitter_buffer.get_chunk(timeout=0.05)
+            if not chunk:
+                # Playback gap: the fill trend restarts from here
+                self.drift.reset_segment()
+                if dry_since is None and self.jitter_buffer.is_primed:
+                    dry_since = time.time()
+                continue
+            if dry_since is not None:
+                # A short gap is a stall inside a phrase, not the pause between phrases
+                if time.time() - dry_since < 0.5:
+                    UNDERRUNS.inc()
+                dry_since = None
+            if self.catchup.max_latency > 0:
+                started = PROFILER.clock()
+                chunk = self._catch_up(chunk)
+                PROFILER.record("output_catchup", started)
+            if self.drift_compensation:
+                started = PROFILER.clock()
+                chunk = self._compensate_drift(chunk)
+                PROFILER.record("output_drift", started)
+            if chunk and self.bus:
+                started = PROFILER.clock()
+                for channel in self.bus:
+                    channel.feed(chunk)
+                PROFILER.record("output_bus", started)
+            chunk = apply_gain(chunk, self.output_gain)
             if chunk and self.output_stream and self.is_running:
+                started = PROFILER.clock()
                 try:
                     self.output_stream.write(chunk)
-                except OSError:
-                    pass
+                    PROFILER.record("output_write", started)
+                except OSError as e:
+                    WRITE_ERRORS.inc()
+                    write_errors += 1
+                    if write_errors == 1:
+                        msg = f"[AUDIO] Output write failed: {e}"
+                        print(msg)
+                        if self.on_log: self.on_log(msg)
+
+    def _catch_up(self, chunk: bytes) -> bytes:
+        """Shorten the audio when the playback backlog exceeds the latency cap."""
+        bytes_per_sec = self.rate * 2
+        backlog = (self.jitter_buffer.queued_bytes + len(chunk)) / float(bytes_per_sec)
+        if backlog <= self.catchup.max_latency:
+            self.catchup.end_episode()
+            return chunk
+
+        # API chunks are small; work on ~250 ms so WSOLA has room to search
+        block = bytearray(chunk)
+        while len(block) < bytes_per_sec // 4:
+            more = self.jitter_buffer.get_chunk(timeout=0)
+            if not more:
+                break
+            block.extend(more)
+        return self.catchup.process(bytes(block), backlog)
+
+    def set_max_latency(self, seconds: float):
+        """Cap on how far playback may fall behind (0 disables catch-up)."""
+        self.catchup.max_latency = max(0.0, float(seconds))
+
+    def _compensate_drift(self, chunk: bytes) -> bytes:
+        """Resample slightly so the playback buffer neither fills nor drains."""
+        fill = self.jitter_buffer.queued_bytes // 2
+        target = self.jitter_buffer.target_size * self.chunk_size
+        self.drift.update(fill, target)
+
+        samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+        out = self._resampler.process(samples, self.drift.ratio())
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16).tobytes()
+
+    def set_output_gain(self, gain: float, device: Optional[int] = None):
+        """Gain of the main output, or of the extra output on `device`."""
+        if device is None:
+            self.output_gain = max(0.0, float(gain))
+            return
+        for spec in self.extra_outputs:
+            if spec["device"] == device:
+                spec["gain"] = max(0.0, float(gain))
+        for channel in self.bus:
+            if channel.device == device:
+                channel.gain = max(0.0, float(gain))
+
+    def set_extra_outputs(self, outputs: List[Dict]):
+        """
+        Devices that play the same output as the main one, e.g.
+        [{"device": 5, "gain": 0.8, "name": "Monitor"}]. Reopened at once if running.
+        """
+        self.extra_outputs = [dict(spec) for spec in outputs]
+        if self.is_running:
+            self._close_bus()
+            self._open_bus()
+
+    def _open_bus(self):
+        channels = []
+        for spec in self.extra_outputs:
+            channel = OutputChannel(self.backend, int(spec["device"]), gain=spec.get("gain", 1.0),
+                                    name=spec.get("name"), rate=self.rate, chunk_size=self.chunk_size)
+            try:
+                channel.start()
+            except Exception as e:
+                # The main output still works without it
+                self._log(f"[BUS] Could not open {channel.name}: {e}")
+                continue
+            self._log(f"[BUS] Also playing on {channel.name} (gain {channel.gain:.2f})")
+            channels.append(channel)
+        self.bus = channels
+
+    def _close_bus(self):
+        # Closed channels stay listed so their stats can still be read
+        for channel in self.bus:
+            channel.stop()
+
+    def playback_backlog(self) -> float:
+        """Seconds of converted audio waiting to be played."""
+        return self.jitter_buffer.queued_bytes / (self.rate * 2.0)
+
+    @property
+    def drift_ppm(self) -> float:
+        """Estimated capture-vs-playback clock drift (positive: input runs fast)."""
+        return self.drift.ppm
+
+    def drift_stats(self) -> Dict:
+        return {
+            "drift_ppm": round(self.drift.ppm, 1),
+            "correction_ppm": round(self.drift.correction_ppm, 1),
+            "buffer_ms": round(self.drift.fill_frames / self.rate * 1000.0, 1),
+            "bus": [channel.summary() for channel in self.bus],
+        }
 
     def stop_streams(self):
         """Stop and close streams."""
@@ -140,18 +331,19 @@ class AudioManager:
             self._output_thread.join(timeout=0.5)
         
         if self.input_stream:
-            if self.input_stream.is_active():
-                self.input_stream.stop_stream()
+            self.input_stream.stop()
             self.input_stream.close()
             self.input_stream = None
             
         if self.output_stream:
-            if self.output_stream.is_active():
-                self.output_stream.stop_stream()
+            self.output_stream.stop()
             self.output_stream.close()
             self.output_stream = None
+        self._close_bus()
 
         self.jitter_buffer.reset()
+        self._resampler.reset()
+        self.drift.reset_segment()
         with self.input_queue.mutex:
             self.input_queue.queue.clear()
 
@@ -168,6 +360,6 @@ class AudioManager:
             self.jitter_buffer.add_chunk(data)
 
     def terminate(self):
-        """Cleanup PyAudio."""
+        """Stop streaming and release the backend."""
         self.stop_streams()
-        self.p.terminate()
+        self.backend.terminate()
@@ -0,0 +1,319 @@
+import itertools
+import multiprocessing as mp
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from core.shm_ring import SharedRing
+from core.metrics import REGISTRY
+from core.profiler import PROFILER
+
+FLAG_ANALYSED = 1
+FLAG_SPEECH = 2
+
+OUTPUT_RING_DROPS = REGISTRY.counter("vc_core_output_ring_drops_total",
+                                     "Converted chunks dropped because the audio core's output ring was full")
+# Metrics only the audio core process updates. Only these are sent to the UI
+# process: the rest also exist there (same modules) and are updated there.
+CORE_METRICS = (
+    "vc_input_", "vc_jitter_", "vc_playback_", "vc_output_", "vc_capture_", "vc_bus_",
+    "vc_core_input_", "vc_stage_core_", "vc_stage_input_callback", "vc_stage_output_",
+)
+
+
+def _core_main(conn, in_name: str, out_name: str, max_buffer_size: int, backend: str, backend_options: Dict):
+    """Entry point of the audio core process."""
+    from core.audio_manager import AudioManager
+    mgr = AudioManager(max_buffer_size, backend=backend, backend_options=backend_options)
+    core = _AudioCore(conn, SharedRing(in_name), SharedRing(out_name), mgr)
+    core.run()
+
+
+class _AudioCore:
+    """
+    Runs in the audio core process: owns PyAudio, the capture callback,
+    the playback buffer and output loop, and (when asked) the denoise and
+    VAD pass over captured audio. None of it shares a GIL with the UI.
+    """
+    def __init__(self, conn, in_ring: SharedRing, out_ring: SharedRing, mgr):
+        from core.denoise import NoiseSuppressor
+        from core.vad import VAD
+
+        self.conn = conn
+        self.in_ring = in_ring
+        self.out_ring = out_ring
+        self.mgr = mgr
+        self.mgr.on_log = lambda msg: self._send("log", msg)
+        self.vad = VAD()
+        self.suppressor = NoiseSuppressor()
+        self.analyse = False
+        self.denoise = False
+        self._speech = False
+        self._stopping = False
+        self._send_lock = threading.Lock()
+        self._drained = threading.Event()
+        self._ring_drops = REGISTRY.counter("vc_core_input_ring_drops_total",
+                                            "Captured chunks dropped because the UI process fell behind")
+
+    def _send(self, *msg):
+        with self._send_lock:
+            try:
+                self.conn.send(msg)
+            except (OSError, EOFError):
+                pass
+
+    def run(self):
+        pump = threading.Thread(target=self._pump, daemon=True)
+        pump.start()
+        last_stats = 0.0
+        running = True
+        while running:
+            if self.conn.poll(0.05):
+                try:
+                    msg = self.conn.recv()
+                except EOFError:
+                    break  # UI process went away
+                running = self._handle(*msg)
+            if time.time() - last_stats >= 0.25:
+                last_stats = time.time()
+                self._send("stats", self._stats())
+        self._stopping = True
+        pump.join(timeout=1.0)
+        self.mgr.terminate()
+        self.in_ring.close()
+        self.out_ring.close()
+
+    def _handle(self, call_id, cmd, *args) -> bool:
+        result, error = None, None
+        try:
+            if cmd == "devices":
+                result = self.mgr.get_devices()
+            elif cmd == "start":
+                self.suppressor.reset()
+                self.analyse = False
+                self.mgr.start_streams(*args)
+            elif cmd == "stop":
+                self._drained.clear()
+                self.mgr.stop_streams()
+                # The pump drops what is left in out_ring; wait so a quick restart can't play it
+                self._drained.wait(0.5)
+            elif cmd == "input":
+                self.analyse, self.denoise, self.vad.threshold = args
+            elif cmd == "set":
+                setattr(self.mgr, args[0], args[1])
+            elif cmd == "profile":
+                PROFILER.enabled = args[0]
+            elif cmd == "call":
+                result = getattr(self.mgr, args[0])(*args[1])
+            elif cmd == "quit":
+                self.mgr.stop_streams()
+        except Exception as e:
+            error = str(e)
+        if call_id is not None:
+            self._send("reply", call_id, result, error)
+        return cmd != "quit"
+
+    def _pump(self):
+        """Move audio between the rings and the AudioManager."""
+        while not self._stopping:
+            if not self.mgr.is_running:
+                # Stopped: queued playback is stale. Drained here, as the ring's only reader
+                while self.out_ring.get():
+                    pass
+                self._drained.set()
+                time.sleep(0.01)
+                continue
+            record = self.out_ring.get()
+            while record:
+                self.mgr.write_output_chunk(record[0])
+                record = self.out_ring.get()
+
+            chunk = self.mgr.get_input_chunk(timeout=0.005)
+            if not chunk:
+                continue
+            rms, flags = 0.0, 0
+            if self.analyse:
+                if self.denoise:
+                    started = PROFILER.clock()
+                    chunk = self.suppressor.process(chunk, speech=self._speech)
+                    PROFILER.record("core_denoise", started)
+                started = PROFILER.clock()
+                self._speech, rms = self.vad.is_speech(chunk)
+                PROFILER.record("core_vad", started)
+                flags = FLAG_ANALYSED | (FLAG_SPEECH if self._speech else 0)
+            if not self.in_ring.put(chunk, rms, flags):
+                self._ring_drops.inc()
+
+    def _stats(self) -> Dict:
+        return {
+            "queued_bytes": self.mgr.jitter_buffer.queued_bytes,
+            "drift": self.mgr.drift_stats(),
+            "latency": self.mgr.latency,
+            "metrics": REGISTRY.export(CORE_METRICS),
+        }
+
+
+class AudioCoreProcess:
+    """
+    Drop-in for AudioManager that runs the real-time audio core in its own
+    process. PCM crosses in shared-memory rings; commands, logs and stats
+    use a Pipe. Captured chunks can arrive already denoised and VAD-tagged
+    (see configure_input), so the UI process only segments and uploads.
+    """
+    analyses_input = True
+
+    def __init__(self, max_buffer_size=2048, backend: str = "pyaudio", backend_options: Optional[Dict] = None):
+        ctx = mp.get_context("spawn")
+        self.rate = 16000
+        self.in_ring = SharedRing(capacity=2 << 20)    # ~60 s of capture
+        self.out_ring = SharedRing(capacity=4 << 20)
+        self._conn, child_conn = ctx.Pipe()
+        self._proc = ctx.Process(target=_core_main, name="audio-core", daemon=True,
+                                 args=(child_conn, self.in_ring.name, self.out_ring.name, max_buffer_size,
+                                       backend, backend_options or {}))
+        self._proc.start()
+
+        self.on_log = None
+        self.is_running = False
+        self._drift_compensation = True
+        self._input_config = None
+        self._stats = {"queued_bytes": 0, "drift": {"drift_ppm": 0.0, "correction_ppm": 0.0, "buffer_ms": 0.0},
+                       "latency": {"input": 0.0, "output": 0.0}}
+        self._ids = itertools.count(1)
+        self._waiting: Dict[int, list] = {}
+        self._send_lock = threading.Lock()
+        threading.Thread(target=self._reader, daemon=True).start()
+
+    # --- Channel ---
+
+    def _post(self, cmd: str, *args):
+        with self._send_lock:
+            self._conn.send((None, cmd) + args)
+
+    def _call(self, cmd: str, *args, timeout: float = 5.0):
+        call_id = next(self._ids)
+        slot = [threading.Event(), None, None]
+        self._waiting[call_id] = slot
+        with self._send_lock:
+            self._conn.send((call_id, cmd) + args)
+        if not slot[0].wait(timeout):
+            self._waiting.pop(call_id, None)
+            raise RuntimeError(f"audio core did not answer '{cmd}'")
+        if slot[2]:
+            raise RuntimeError(slot[2])
+        return slot[1]
+
+    def _reader(self):
+        while True:
+            try:
+                msg = self._conn.recv()
+            except (EOFError, OSError):
+                return
+            kind = msg[0]
+            if kind == "reply":
+                slot = self._waiting.pop(msg[1], None)
+                if slot:
+                    slot[1], slot[2] = msg[2], msg[3]
+                    slot[0].set()
+            elif kind == "stats":
+                self._stats = msg[1]
+                REGISTRY.absorb(msg[1]["metrics"])
+            elif kind == "log" and self.on_log:
+                self.on_log(msg[1])
+
+    # --- AudioManager interface ---
+
+    def get_devices(self) -> List[Dict]:
+        return self._call("devices")
+
+    def start_streams(self, input_idx: int, output_idx: int):
+        self._input_config = None
+        self._call("start", input_idx, output_idx)
+        self.is_running = True
+
+    def stop_streams(self):
+        self.is_running = False
+        self._call("stop")
+        while self.in_ring.get():
+            pass
+
+    def set_buffer_size(self, max_size):
+        if not self.is_running:
+            self._post("call", "set_buffer_size", (max_size,))
+
+    def set_prebuffer(self, chunks: int):
+        self._post("call", "set_prebuffer", (chunks,))
+
+    def set_max_latency(self, seconds: float):
+        self._post("call", "set_max_latency", (seconds,))
+
+    def set_output_gain(self, gain: float, device: Optional[int] = None):
+        self._post("call", "set_output_gain", (gain, device))
+
+    def set_extra_outputs(self, outputs: List[Dict]):
+        self._post("call", "set_extra_outputs", (outputs,))
+
+    @property
+    def drift_compensation(self) -> bool:
+        return self._drift_compensation
+
+    @drift_compensation.setter
+    def drift_compensation(self, value: bool):
+        self._drift_compensation = bool(value)
+        self._post("set", "drift_compensation", self._drift_compensation)
+
+    def set_profiling(self, enabled: bool):
+        """Stage timers in the core process; they arrive here with its metrics."""
+        self._post("profile", bool(enabled))
+
+    def configure_input(self, denoise: bool, vad_threshold: float):
+        """Have the core denoise and VAD-tag captured chunks. Cheap to call repeatedly."""
+        config = (True, bool(denoise), float(vad_threshold))
+        if config != self._input_config:
+            self._input_config = config
+            self._post("input", *config)
+
+    def get_input_frame(self, timeout: float = 0.5) -> Optional[Tuple[bytes, bool, float, bool]]:
+        """Next captured chunk as (pcm, is_speech, rms, analysed)."""
+        end = time.time() + timeout
+        while True:
+            record = self.in_ring.get()
+            if record:
+                chunk, rms, flags = record
+                return chunk, bool(flags & FLAG_SPEECH), rms, bool(flags & FLAG_ANALYSED)
+            if time.time() >= end:
+                return None
+            time.sleep(0.002)
+
+    def get_input_chunk(self, timeout: float = 0.5) -> Optional[bytes]:
+        frame = self.get_input_frame(timeout)
+        return frame[0] if frame else None
+
+    def write_output_chunk(self, data: bytes):
+        if self.is_running and not self.out_ring.put(data):
+            OUTPUT_RING_DROPS.inc()
+
+    def playback_backlog(self) -> float:
+        return (self._stats["queued_bytes"] + self.out_ring.pending) / (self.rate * 2.0)
+
+    @property
+    def latency(self) -> Dict:
+        return dict(self._stats["latency"])
+
+    @property
+    def drift_ppm(self) -> float:
+        return self._stats["drift"]["drift_ppm"]
+
+    def drift_stats(self) -> Dict:
+        return dict(self._stats["drift"])
+
+    def terminate(self):
+        if self._proc.is_alive():
+            try:
+                self._post("quit")
+            except (OSError, EOFError):
+                pass
+            self._proc.join(timeout=2.0)
+            if self._proc.is_alive():
+                self._proc.terminate()
+        self.in_ring.close()
+        self.out_ring.close()
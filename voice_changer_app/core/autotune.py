@@ -0,0 +1,230 @@
+import threading
+from typing import Callable, Dict, Optional
+from core.metrics import REGISTRY
+
+TUNE_ADJUSTMENTS = REGISTRY.counter("vc_autotune_adjustments_total", "Parameter changes made by the auto-tuner")
+
+# (low, high, step) for every tuned parameter; a step of None doubles or halves
+BOUNDS = {
+    "vad_pause": (0.4, 2.0, 0.1),
+    "latency": (1, 4, 1),
+    "prebuffer": (1, 12, 1),
+    "playback_buffer_size": (512, 8192, None),
+    "chunk_size": (512, 2048, None),
+}
+# Only read when the streams open: changes wait for the next start
+RESTART_ONLY = ("playback_buffer_size", "chunk_size")
+
+_COUNTERS = {
+    "phrases": "vc_vad_phrases_total",
+    "false_splits": "vc_vad_false_splits_total",
+    "underruns": "vc_playback_underruns_total",
+    "bytes_down": "vc_api_bytes_received_total",
+    "input_overflows": "vc_input_overflows_total",
+    "jitter_drops": "vc_jitter_overflow_drops_total",
+}
+_HISTOGRAMS = {
+    "ttfb": "vc_api_ttfb_seconds",
+    "speech_to_playback": "vc_speech_to_playback_seconds",
+}
+
+
+def profile_key(input_device: str, output_device: str, voice_id: Optional[str]) -> str:
+    """Tuned values are kept per input device, output device and voice."""
+    return f"{input_device} | {output_device} | {voice_id or '-'}"
+
+
+class AutoTuner:
+    """
+    Closed-loop tuning of the latency knobs while the pipeline runs.
+
+    Every `interval` seconds it looks at what happened since the last look
+    (underruns per minute of playback, the share of phrases split while the
+    speaker was only pausing, API time to first byte, end of speech to
+    playback) and moves at most one parameter one step, so each change is
+    seen before the next:
+
+    - underruns above `glitch_target` per minute: more prebuffer
+    - false splits above `split_target` of phrases: longer VAD pause
+    - TTFB p50 above `ttfb_target`: a more aggressive streaming latency level
+    - speech-to-playback p50 above `e2e_target`: a shorter VAD pause, or
+      failing that a more aggressive latency level
+    - otherwise, once a window was clean: a shorter VAD pause, then less
+      prebuffer, then (with TTFB and speech-to-playback well inside their
+      targets) a less aggressive latency level, which sounds better
+
+    A parameter raised because of a glitch isn't lowered again for
+    `hold_windows` windows. Input overflows raise chunk_size and jitter
+    buffer drops raise playback_buffer_size; both apply from the next start.
+    on_change(values) follows every adjustment, so they can be stored.
+    """
+    def __init__(self, processor, audio_manager, values: Dict, interval: float = 15.0,
+                 glitch_target: float = 0.5, split_target: float = 0.1, ttfb_target: float = 1.0,
+                 e2e_target: float = 2.0, min_phrases: int = 3, min_played: float = 10.0,
+                 hold_windows: int = 20):
+        self.processor = processor
+        self.audio_manager = audio_manager
+        self.values = {}
+        self.interval = interval
+        self.glitch_target = glitch_target
+        self.split_target = split_target
+        self.ttfb_target = ttfb_target
+        self.e2e_target = e2e_target
+        self.min_phrases = min_phrases
+        self.min_played = min_played
+        self.hold_windows = hold_windows
+
+        self.on_log = None
+        self.on_change: Optional[Callable[[Dict], None]] = None
+        self.adjustments = 0
+        self._hold = {}
+        self._clean_windows = 0
+        self._last = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.load(values)
+
+    def load(self, values: Dict):
+        """Take over stored values (clamped to the safe range) and apply them."""
+        for name, value in values.items():
+            if name in BOUNDS:
+                lo, hi, _ = BOUNDS[name]
+                self.values[name] = type(hi)(min(max(value, lo), hi))
+        for name in self.values:
+            self._apply(name)
+
+    def _apply(self, name: str):
+        value = self.values[name]
+        mgr = self.audio_manager
+        if name == "vad_pause":
+            self.processor.vad_pause = value
+        elif name == "latency":
+            self.processor.latency = value
+        elif name == "prebuffer":
+            mgr.set_prebuffer(value)
+        elif name == "playback_buffer_size":
+            mgr.set_buffer_size(value)  # Ignored while running
+        elif name == "chunk_size" and hasattr(mgr, "chunk_size") and not mgr.is_running:
+            mgr.chunk_size = value
+
+    def start(self):
+        """Call once processing has started (it resets the prebuffer)."""
+        if "prebuffer" in self.values:
+            self._apply("prebuffer")
+        self._last = self._snapshot()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.step()
+            except Exception as e:
+                if self.on_log: self.on_log(f"[TUNE] Error: {e}")
+
+    @staticmethod
+    def _snapshot() -> Dict:
+        snap = {}
+        for key, name in _COUNTERS.items():
+            metric = REGISTRY.get(name)
+            snap[key] = metric.value if metric else 0
+        for key, name in _HISTOGRAMS.items():
+            metric = REGISTRY.get(name)
+            snap[key] = metric.state() if metric else None
+        return snap
+
+    def _window_quantile(self, key: str, now: Dict, prev: Dict) -> Optional[float]:
+        if now[key] is None or prev[key] is None:
+            return None
+        if now[key]["count"] - prev[key]["count"] < self.min_phrases:
+            return None
+        return REGISTRY.get(_HISTOGRAMS[key]).quantile(0.5, since=prev[key])
+
+    def step(self):
+        """Judge the window since the last step and adjust at most one live parameter."""
+        now = self._snapshot()
+        prev, self._last = self._last or now, now
+        d = {key: now[key] - prev[key] for key in _COUNTERS}
+        played = d["bytes_down"] / 32000.0
+        glitches = d["underruns"] * 60.0 / played if played >= self.min_played else None
+        splits = d["false_splits"] / float(d["phrases"]) if d["phrases"] >= self.min_phrases else None
+        ttfb = self._window_quantile("ttfb", now, prev)
+        e2e = self._window_quantile("speech_to_playback", now, prev)
+        context = f"speech-to-playback p50 {e2e:.2f}s" if e2e is not None else "no latency samples"
+        for name in list(self._hold):
+            self._hold[name] -= 1
+            if self._hold[name] <= 0:
+                del self._hold[name]
+
+        if d["input_overflows"]:
+            self._adjust("chunk_size", +1, f"{d['input_overflows']} input overflows")
+        if d["jitter_drops"]:
+            self._adjust("playback_buffer_size", +1, f"{d['jitter_drops']} chunks dropped by a full jitter buffer")
+
+        clean = glitches == 0 and splits == 0
+        self._clean_windows = self._clean_windows + 1 if clean else 0
+        proposals = []
+        if glitches is not None and glitches > self.glitch_target:
+            proposals.append(("prebuffer", +1, f"{d['underruns']} underruns in {played:.0f}s of playback"))
+        if splits is not None and splits > self.split_target:
+            proposals.append(("vad_pause", +1, f"{d['false_splits']} of {d['phrases']} phrases split mid-speech"))
+        if ttfb is not None and ttfb > self.ttfb_target:
+            proposals.append(("latency", +1, f"TTFB p50 {ttfb:.2f}s"))
+        if not proposals and e2e is not None and e2e > self.e2e_target:
+            proposals.append(("vad_pause", -1, f"over the {self.e2e_target:.1f}s target"))
+            proposals.append(("latency", +1, f"over the {self.e2e_target:.1f}s target"))
+        if not proposals and self._clean_windows:
+            proposals.append(("vad_pause", -1, f"no false splits in {d['phrases']} phrases"))
+            if self._clean_windows >= 2:
+                proposals.append(("prebuffer", -1, f"no underruns in {self._clean_windows} windows"))
+                # Quality back once the API is quick and speech plays well in time
+                if ttfb is not None and ttfb < self.ttfb_target / 2 and e2e is not None \
+                        and e2e < self.e2e_target * 0.75:
+                    proposals.append(("latency", -1, f"TTFB p50 {ttfb:.2f}s"))
+        for name, direction, reason in proposals:
+            if direction < 0 and name in self._hold:
+                continue
+            if self._adjust(name, direction, f"{reason}; {context}"):
+                break
+
+    def _adjust(self, name: str, direction: int, reason: str) -> bool:
+        if name not in self.values:
+            return False
+        lo, hi, step = BOUNDS[name]
+        old = self.values[name]
+        if step is None:
+            new = old * 2 if direction > 0 else old // 2
+        else:
+            new = round(old + direction * step, 2)
+        new = type(hi)(min(max(new, lo), hi))
+        if new == old:
+            return False
+        self.values[name] = new
+        if direction > 0:
+            self._hold[name] = self.hold_windows
+        self._apply(name)
+        self.adjustments += 1
+        TUNE_ADJUSTMENTS.inc()
+        if self.on_log:
+            when = " (from next start)" if name in RESTART_ONLY else ""
+            self.on_log(f"[TUNE] {name} {old} -> {new}{when}: {reason}")
+        if self.on_change:
+            self.on_change(dict(self.values))
+        return True
+
+    def describe(self) -> str:
+        v = self.values
+        return (
+            f"pause {v.get('vad_pause')}s, latency {v.get('latency')}, prebuffer {v.get('prebuffer')}, "
+            f"buffer {v.get('playback_buffer_size')}, chunk {v.get('chunk_size')}"
+        )
+
+    def summary(self) -> str:
+        return f"[TUNE] {self.adjustments} adjustments; {self.describe()}"
@@ -0,0 +1,330 @@
+import os
+import json
+import time
+import wave
+import shutil
+import threading
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
+from core.vad import VAD
+from core.denoise import NoiseSuppressor
+from core.segmenter import PhraseSegmenter, BYTES_PER_SECOND
+from core.resilience import backoff_delay, RETRYABLE_STATUS
+
+SAMPLE_RATE = 16000
+AUDIO_EXTENSIONS = (".wav", ".pcm", ".raw")
+
+
+def read_pcm_chunks(path: Path, chunk_frames: int = 1024) -> Iterator[bytes]:
+    """
+    Stream a WAV or raw PCM file as 16kHz mono int16 chunks.
+    Raw .pcm/.raw files are assumed to already be pcm_s16le_16.
+    """
+    if path.suffix.lower() != ".wav":
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(chunk_frames * 2)
+                if not data:
+                    break
+                yield data
+        return
+
+    with wave.open(str(path), "rb") as wav_file:
+        channels = wav_file.getnchannels()
+        width = wav_file.getsampwidth()
+        rate = wav_file.getframerate()
+
+        if (channels, width, rate) == (1, 2, SAMPLE_RATE):
+            while True:
+                data = wav_file.readframes(chunk_frames)
+                if not data:
+                    break
+                yield data
+            return
+
+        if width != 2:
+            raise ValueError(f"{width * 8}-bit WAV is not supported (16-bit only)")
+
+        # Non-native format: downmix and resample once, then chunk
+        audio = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+        audio = audio.reshape(-1, channels).mean(axis=1)
+        if rate != SAMPLE_RATE:
+            n_out = int(len(audio) * SAMPLE_RATE / rate)
+            audio = np.interp(np.arange(n_out) * (rate / SAMPLE_RATE), np.arange(len(audio)), audio)
+        pcm = np.clip(audio, -32768, 32767).astype(np.int16).tobytes()
+        step = chunk_frames * 2
+        for i in range(0, len(pcm), step):
+            yield pcm[i:i + step]
+
+
+class _FileJob:
+    """Segments of one input file and where their converted audio lives."""
+    def __init__(self, src: Path, dst: Path):
+        self.src = src
+        self.dst = dst
+        self.parts_dir = dst.with_name(dst.name + ".parts")
+        self.segments = []  # (index, offset_bytes, length_bytes)
+        self.futures = []
+        self.total_bytes = 0
+
+    def part_path(self, index: int) -> Path:
+        return self.parts_dir / f"seg_{index:05d}.pcm"
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.parts_dir / "manifest.json"
+
+
+class BatchConverter:
+    """
+    Offline conversion of recorded audio files through an STSProcessor.
+    Files are segmented with the live VAD settings, segments are converted
+    with bounded concurrency and retries, and the results are reassembled
+    in order on the original timeline. Converted segments are kept next to
+    the output until the file is complete, so re-running an interrupted
+    batch only converts what is missing.
+    """
+    def __init__(self, processor, concurrency: int = 4, max_retries: int = 4):
+        self.processor = processor
+        # The processor's limiter decides how many requests really run at once
+        processor.api_concurrency = concurrency
+        self.concurrency = processor.api_concurrency
+        self.max_retries = max(0, int(max_retries))
+
+        self.vad = VAD(threshold=processor.vad_threshold)
+        self.on_log = None
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self._slots = threading.BoundedSemaphore(self.concurrency * 2)
+        self._lock = threading.Lock()
+
+        # Progress
+        self._started_at = None
+        self.audio_seconds_done = 0.0
+        self.segments_done = 0
+        self.segments_skipped = 0
+        self.segments_failed = 0
+        self.files_failed = 0
+
+    def _log(self, msg: str):
+        print(msg)
+        if self.on_log: self.on_log(msg)
+
+    @staticmethod
+    def collect_inputs(paths: List[str]) -> List[Tuple[Path, Path]]:
+        """(source, output path relative to the output dir); folders keep their layout."""
+        files = []
+        for p in map(Path, paths):
+            if p.is_dir():
+                found = sorted(f for f in p.rglob("*") if f.suffix.lower() in AUDIO_EXTENSIONS)
+                files.extend((f, f.relative_to(p).with_suffix(".wav")) for f in found)
+            elif p.suffix.lower() in AUDIO_EXTENSIONS:
+                files.append((p, Path(p.stem + ".wav")))
+        return files
+
+    def run(self, inputs: List[str], output_dir: str) -> bool:
+        """Convert every input file into output_dir. Returns True if all succeeded."""
+        out_root = Path(output_dir)
+        out_root.mkdir(parents=True, exist_ok=True)
+        files = self.collect_inputs(inputs)
+        if not files:
+            self._log("[BATCH] No WAV/PCM files found.")
+            return True
+
+        self._started_at = time.time()
+        pending: List[_FileJob] = []
+        claimed = {}
+        ok = True
+
+        try:
+            for n, (src, rel) in enumerate(files, 1):
+                job = _FileJob(src, out_root / rel)
+                if job.dst in claimed:
+                    # e.g. x.wav and x.pcm: they would share the output and its parts
+                    self._log(f"[BATCH ERROR] {src}: same output as {claimed[job.dst]} - skipping")
+                    self.files_failed += 1
+                    ok = False
+                    continue
+                claimed[job.dst] = src
+                if job.dst.exists():
+                    self._log(f"[BATCH] ({n}/{len(files)}) {src.name} already converted - skipping")
+                    continue
+
+                self._log(f"[BATCH] ({n}/{len(files)}) Segmenting {src.name}...")
+                try:
+                    self._submit_file(job)
+                except (ValueError, EOFError, wave.Error) as e:
+                    # Unreadable or unsupported file: skip it, keep the batch going
+                    self._log(f"[BATCH ERROR] {src.name}: {e}")
+                    self.files_failed += 1
+                    ok = False
+                    if not job.futures:
+                        shutil.rmtree(job.parts_dir, ignore_errors=True)
+                    # Segments already submitted still finish, but the file is incomplete: never assemble it
+                    continue
+                pending.append(job)
+
+                # Assemble whatever has fully finished while later files are queued
+                still_running = []
+                for j in pending:
+                    if self._is_done(j):
+                        ok = self._finish(j) and ok
+                    else:
+                        still_running.append(j)
+                pending = still_running
+
+            for job in pending:
+                for future in job.futures:
+                    future.result()
+                ok = self._finish(job) and ok
+        finally:
+            self._executor.shutdown(wait=True)
+
+        elapsed = time.time() - self._started_at
+        self._log(
+            f"[BATCH] Done: {self.segments_done} converted, {self.segments_skipped} resumed, "
+            f"{self.segments_failed} failed, {self.files_failed} files skipped in {elapsed:.1f}s"
+        )
+        return ok
+
+    @staticmethod
+    def _is_done(job: _FileJob) -> bool:
+        return all(f.done() for f in job.futures)
+
+    def _manifest(self, job: _FileJob) -> dict:
+        """Everything that decides what the converted parts contain."""
+        stat = job.src.stat()
+        p = self.processor
+        return {
+            "source": str(job.src.resolve()), "size": stat.st_size, "mtime": int(stat.st_mtime),
+            "voice_id": p.current_voice_id, "vad_threshold": p.vad_threshold, "vad_pause": p.vad_pause,
+            "max_duration": p.max_duration, "latency": p.latency, "stability": p.stability,
+            "similarity": p.similarity, "noise_suppression": p.noise_suppression,
+            "remove_background_noise": p.remove_background_noise,
+        }
+
+    def _prepare_parts(self, job: _FileJob):
+        """Keep parts from an earlier run only if they were made from the same file with the same settings."""
+        manifest = self._manifest(job)
+        if job.parts_dir.exists():
+            try:
+                previous = json.loads(job.manifest_path.read_text())
+            except (OSError, ValueError):
+                previous = None
+            if previous != manifest:
+                self._log(f"[BATCH] {job.src.name}: input or settings changed - discarding earlier parts")
+                shutil.rmtree(job.parts_dir, ignore_errors=True)
+        job.parts_dir.mkdir(parents=True, exist_ok=True)
+        job.manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    def _submit_file(self, job: _FileJob):
+        self._prepare_parts(job)
+        segmenter = PhraseSegmenter(self.processor.vad_pause, self.processor.max_duration)
+        # Same local denoising as the live path, which replaces the server-side flag by default
+        suppressor = NoiseSuppressor() if self.processor.noise_suppression else None
+        is_speech_frame = False
+
+        def submit(events):
+            for event in events:
+                if event[0] != "phrase":
+                    continue
+                pcm = event[1]
+                index = len(job.segments)
+                job.segments.append((index, segmenter.phrase_offset, len(pcm)))
+
+                if job.part_path(index).exists():
+                    self.segments_skipped += 1
+                    continue
+
+                # Bound the number of segments held in memory
+                self._slots.acquire()
+                job.futures.append(self._executor.submit(self._convert_segment, job, index, pcm))
+
+        for chunk in read_pcm_chunks(job.src):
+            if suppressor is not None:
+                chunk = suppressor.process(chunk, speech=is_speech_frame)
+            is_speech_frame, _ = self.vad.is_speech(chunk)
+            # Audio time, not wall time, drives the silence timer
+            now = job.total_bytes / float(BYTES_PER_SECOND)
+            job.total_bytes += len(chunk)
+            submit(segmenter.feed(chunk, is_speech_frame, now))
+        submit(segmenter.flush())
+
+    def _convert_segment(self, job: _FileJob, index: int, pcm: bytes):
+        try:
+            part = job.part_path(index)
+            tmp = part.with_suffix(".tmp")
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    with open(tmp, "wb") as f:
+                        for stream_chunk in self.processor.convert_stream(pcm):
+                            if stream_chunk:
+                                f.write(stream_chunk)
+                    os.replace(tmp, part)
+                    break
+                except Exception as e:
+                    status = getattr(e, "status_code", None)
+                    retryable = status is None or status in RETRYABLE_STATUS
+                    if not retryable or attempt == self.max_retries:
+                        self._log(f"[BATCH ERROR] {job.src.name} seg {index}: {e}")
+                        with self._lock:
+                            self.segments_failed += 1
+                        return
+
+                    if status == 429:
+                        # The key's limiter already holds back every request, live ones included
+                        self._log("[BATCH] Rate limited - backing off")
+                    else:
+                        time.sleep(backoff_delay(attempt, base=0.5, cap=30.0))
+
+            with self._lock:
+                self.segments_done += 1
+                self.audio_seconds_done += len(pcm) / float(BYTES_PER_SECOND)
+                elapsed = max(time.time() - self._started_at, 1e-6)
+                rate = self.audio_seconds_done / elapsed
+            self._log(
+                f"[BATCH] {job.src.name} seg {index} done | "
+                f"{self.audio_seconds_done:.1f} audio-s in {elapsed:.1f}s ({rate:.2f} audio-s/s)"
+            )
+        finally:
+            self._slots.release()
+
+    def _finish(self, job: _FileJob) -> bool:
+        """Stream the converted segments into the final WAV, in order."""
+        missing = [i for i, _, _ in job.segments if not job.part_path(i).exists()]
+        if missing:
+            self._log(f"[BATCH] {job.src.name}: {len(missing)} segment(s) failed - rerun to resume")
+            return False
+
+        tmp = job.dst.with_suffix(".wav.tmp")
+        silence = bytes(BYTES_PER_SECOND)
+        with wave.open(str(tmp), "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(SAMPLE_RATE)
+
+            position = 0
+            for index, offset, _ in job.segments:
+                # Keep the original pauses between phrases
+                gap = offset - position
+                while gap > 0:
+                    n = min(gap, len(silence))
+                    wav_file.writeframes(silence[:n])
+                    gap -= n
+                    position += n
+
+                with open(job.part_path(index), "rb") as part:
+                    while True:
+                        data = part.read(65536)
+                        if not data:
+                            break
+                        wav_file.writeframes(data)
+                        position += len(data)
+
+        os.replace(tmp, job.dst)
+        shutil.rmtree(job.parts_dir, ignore_errors=True)
+        self._log(f"[BATCH] Wrote {job.dst}")
+        return True
@@ -0,0 +1,121 @@
+import numpy as np
+
+
+def wsola(x: np.ndarray, speed: float, hop: int = 160, tolerance: int = 80) -> np.ndarray:
+    """
+    Waveform-similarity overlap-add time compression (speed > 1 shortens).
+    Each 2*hop frame is taken from near its nominal input position, shifted
+    by up to `tolerance` samples to best continue the previous frame, so
+    pitch is preserved and no phase jumps are introduced. The first and
+    last half-frames are copied unwindowed, so blocks join seamlessly.
+    """
+    width = 2 * hop
+    step = hop * speed
+    n_frames = int((len(x) - width - hop - tolerance) / step)
+    if n_frames < 2:
+        return x
+
+    positions = [0]
+    for k in range(1, n_frames):
+        # Pick the frame most similar to what would naturally follow the last one
+        natural = x[positions[-1] + hop:positions[-1] + hop + width]
+        nominal = int(k * step)
+        lo = max(0, nominal - tolerance)
+        hi = min(len(x) - width, nominal + tolerance)
+        corr = np.correlate(x[lo:hi + width], natural, mode="valid")
+        positions.append(lo + int(np.argmax(corr)))
+
+    window = np.hanning(width + 1)[:-1].astype(np.float32)
+    idx = np.asarray(positions)[:, None] + np.arange(width)[None, :]
+    frames = x[idx] * window
+
+    # Each output hop is the first half of frame k plus the second half of frame k-1
+    segs = frames[:, :hop].copy()
+    segs[1:] += frames[:-1, hop:]
+    segs[0] = x[:hop]
+    return np.concatenate((segs.reshape(-1), x[positions[-1] + hop:]))
+
+
+class CatchUp:
+    """
+    Caps playback latency. When the backlog waiting to be played exceeds
+    `max_latency` seconds, blocks are shortened first by dropping silent
+    10 ms frames (keeping a short natural pause), then, if that isn't
+    enough, by mild WSOLA time compression. Speech is never cut.
+    """
+    def __init__(self, max_latency: float = 3.0, rate: int = 16000,
+                 silence_rms: float = 300.0, keep_silence: float = 0.12, max_speed: float = 1.25):
+        self.max_latency = max_latency
+        self.rate = rate
+        self.frame = rate // 100
+        self.silence_rms = silence_rms
+        self.keep_frames = int(keep_silence * 100)
+        self.max_speed = max_speed
+
+        self.on_log = None
+        self.active = False
+        self._silent_run = 0
+        self._episode = {"silence": 0.0, "compressed": 0.0}
+        self.stats = {"events": 0, "silence_trimmed": 0.0, "compression_saved": 0.0}
+
+    def process(self, block: bytes, backlog: float) -> bytes:
+        excess = int((backlog - self.max_latency) * self.rate)
+        if excess <= 0:
+            self.end_episode()
+            return block
+
+        if not self.active:
+            self.active = True
+            self.stats["events"] += 1
+            if self.on_log: self.on_log(f"[CATCH-UP] Playback {backlog:.1f}s behind (cap {self.max_latency:.1f}s)")
+
+        x = np.frombuffer(block, dtype=np.int16).astype(np.float32)
+        x, trimmed = self._trim_silence(x, excess)
+        saved = 0
+        if trimmed < excess and len(x) > self.frame * 8:
+            speed = min(self.max_speed, 1.0 + (excess - trimmed) / float(len(x)))
+            speed = max(speed, 1.05)
+            before = len(x)
+            x = wsola(x, speed)
+            saved = before - len(x)
+
+        self._episode["silence"] += trimmed / self.rate
+        self._episode["compressed"] += saved / self.rate
+        self.stats["silence_trimmed"] += trimmed / self.rate
+        self.stats["compression_saved"] += saved / self.rate
+        return np.clip(np.round(x), -32768, 32767).astype(np.int16).tobytes()
+
+    def end_episode(self):
+        if not self.active:
+            return
+        self.active = False
+        if self.on_log:
+            self.on_log(
+                f"[CATCH-UP] Back under cap: trimmed {self._episode['silence']:.2f}s silence, "
+                f"compressed away {self._episode['compressed']:.2f}s"
+            )
+        self._episode = {"silence": 0.0, "compressed": 0.0}
+
+    def _trim_silence(self, x: np.ndarray, budget: int):
+        """Drop silent frames beyond the kept pause length, up to `budget` samples."""
+        n = len(x) // self.frame
+        if n == 0:
+            return x, 0
+        frames = x[:n * self.frame].reshape(n, self.frame)
+        silent = np.sqrt(np.mean(frames ** 2, axis=1)) < self.silence_rms
+
+        # Position of each frame within its run of silence (carried across blocks)
+        idx = np.arange(n)
+        last_voiced = np.maximum.accumulate(np.where(silent, -1, idx))
+        run = np.where(last_voiced < 0, idx + 1 + self._silent_run, idx - last_voiced)
+        self._silent_run = int(run[-1])
+
+        drop = run > self.keep_frames
+        max_drop = budget // self.frame
+        if drop.sum() > max_drop:
+            drop[np.flatnonzero(drop)[max_drop:]] = False
+        if not drop.any():
+            return x, 0
+
+        kept = frames[~drop].reshape(-1)
+        return np.concatenate((kept, x[n * self.frame:])), int(drop.sum()) * self.frame
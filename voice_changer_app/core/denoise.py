@@ -0,0 +1,90 @@
+import numpy as np
+from core.dsp import StreamingSTFT, pcm_to_float, float_to_pcm
+
+
+class NoiseSuppressor:
+    """
+    Streaming spectral noise suppression for the capture path.
+
+    A decision-directed Wiener gain is applied per STFT bin. The noise
+    spectrum is learned from frames the VAD marks as non-speech; a
+    minimum-statistics estimate (the lowest smoothed power over the last
+    ~2 s) backs it up, so the floor is found even when a noisy room keeps
+    the VAD from ever reporting silence.
+    """
+    def __init__(self, rate: int = 16000, gain_floor_db: float = -20.0,
+                 noise_smoothing: float = 0.9, dd_alpha: float = 0.96):
+        self.rate = rate
+        self.gain_floor = 10 ** (gain_floor_db / 20.0)
+        self.noise_smoothing = noise_smoothing
+        self.dd_alpha = dd_alpha
+        self.min_bias = 1.5                       # Minimum of a noisy power estimate sits below its mean
+        self.stft = StreamingSTFT(self._gain_fn)
+        self.latency = self.stft.latency
+
+        # Minimum statistics: 4 sub-windows of ~0.5 s of frames each
+        self._subwindow = int(0.5 * rate / self.stft.hop)
+        self._n_sub = 4
+        self.reset()
+
+    def reset(self):
+        self.stft.reset()
+        bins = self.stft.frame_size // 2 + 1
+        self._noise = None
+        self._smoothed = np.zeros(bins)
+        self._prev_gain2_snr = np.ones(bins)  # |G|^2 * posterior SNR of the last frame
+        self._sub_min = np.full(bins, np.inf)
+        self._sub_count = 0
+        self._mins = []
+        self._speech = False
+
+    @property
+    def noise_floor(self) -> float:
+        """Estimated noise RMS in 16-bit PCM units (0 until learned)."""
+        if self._noise is None:
+            return 0.0
+        return float(np.sqrt(np.mean(self._noise)) * 32768.0 / np.sqrt(self.stft.frame_size / 2.0))
+
+    def process(self, chunk: bytes, speech: bool = False) -> bytes:
+        """
+        Denoise one capture chunk. `speech` is the VAD decision for the
+        previous chunk: the noise estimate only follows the signal while
+        it is False.
+        """
+        self._speech = speech
+        return float_to_pcm(self.stft.process(pcm_to_float(chunk)))
+
+    def _gain_fn(self, spec: np.ndarray) -> np.ndarray:
+        power = spec.real ** 2 + spec.imag ** 2
+        gains = np.empty(power.shape, dtype=np.float32)
+
+        # Frames are few per chunk (8 at 1024 samples); bins are vectorized
+        for i, frame_power in enumerate(power):
+            self._track_noise(frame_power)
+            post = frame_power / self._noise
+            prior = self.dd_alpha * self._prev_gain2_snr + (1 - self.dd_alpha) * np.maximum(post - 1.0, 0.0)
+            gain = np.maximum(prior / (1.0 + prior), self.gain_floor)
+            self._prev_gain2_snr = gain ** 2 * post
+            gains[i] = gain
+        return spec * gains
+
+    def _track_noise(self, power: np.ndarray):
+        self._smoothed = 0.8 * self._smoothed + 0.2 * power if self._noise is not None else power.copy()
+
+        self._sub_min = np.minimum(self._sub_min, self._smoothed)
+        self._sub_count += 1
+        if self._sub_count >= self._subwindow:
+            self._mins = (self._mins + [self._sub_min])[-self._n_sub:]
+            self._sub_min = np.full_like(self._sub_min, np.inf)
+            self._sub_count = 0
+        floor = np.minimum.reduce(self._mins + [self._sub_min]) * self.min_bias
+
+        if self._noise is None:
+            self._noise = np.maximum(power, 1e-12)
+            return
+        if not self._speech:
+            a = self.noise_smoothing
+            self._noise = a * self._noise + (1 - a) * power
+        # Never below the minimum-statistics floor; drop quickly if the room got quieter
+        self._noise = np.maximum(np.minimum(self._noise, floor * 4.0), floor)
+        self._noise = np.maximum(self._noise, 1e-12)
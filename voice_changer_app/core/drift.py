@@ -0,0 +1,117 @@
+import time
+import numpy as np
+from collections import deque
+
+
+class FractionalResampler:
+    """
+    Streaming Kaiser-windowed sinc resampler for small rate corrections.
+
+    `ratio` is input samples consumed per output sample: above 1.0 the
+    output is slightly shorter (drains a filling buffer), below 1.0 it is
+    slightly longer. Every output sample of a block is interpolated in one
+    (samples x taps) array operation.
+    """
+    def __init__(self, taps: int = 32, beta: float = 8.0):
+        self.taps = taps
+        self.half = taps // 2
+        self.beta = beta
+        self._offsets = np.arange(-self.half + 1, self.half + 1, dtype=np.float64)
+        self._i0_beta = np.i0(beta)
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self.taps, dtype=np.float32)
+        self._pos = float(self.half)  # Next output position, in history coordinates
+
+    def process(self, block: np.ndarray, ratio: float) -> np.ndarray:
+        buf = np.concatenate((self._history, block.astype(np.float32, copy=False)))
+
+        # All output positions whose kernel fits inside the buffer
+        last = len(buf) - self.half - 1
+        n = int(np.floor((last - self._pos) / ratio)) + 1 if last >= self._pos else 0
+        if n <= 0:
+            self._history = buf
+            return np.zeros(0, dtype=np.float32)
+
+        pos = self._pos + np.arange(n) * ratio
+        base = np.floor(pos)
+        frac = pos - base
+
+        t = self._offsets[None, :] - frac[:, None]
+        window = np.i0(self.beta * np.sqrt(np.clip(1.0 - (t / self.half) ** 2, 0.0, 1.0))) / self._i0_beta
+        weights = np.sinc(t) * window
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        idx = base.astype(np.int64)[:, None] + self._offsets.astype(np.int64)[None, :]
+        out = np.sum(buf[idx] * weights, axis=1).astype(np.float32)
+
+        # Keep just enough history for the next block's kernels
+        next_pos = self._pos + n * ratio
+        keep_from = int(np.floor(next_pos)) - self.half + 1
+        self._history = buf[keep_from:]
+        self._pos = next_pos - keep_from
+        return out
+
+
+class DriftEstimator:
+    """
+    Estimates the clock drift between capture and playback from the trend
+    of the playback buffer fill level, and turns it into a resampling ratio
+    that holds the fill (and so the output latency) steady.
+
+    Samples are only collected while playback flows continuously; a gap
+    starts a new segment. Slopes implausible for clock drift (API bursts
+    fill the buffer far faster) are rejected.
+    """
+    MAX_PPM = 1000.0
+
+    def __init__(self, rate: int = 16000, window_seconds: float = 60.0, min_span: float = 10.0):
+        self.rate = rate
+        self.window_seconds = window_seconds
+        self.min_span = min_span
+        self.ppm = 0.0
+        self.correction_ppm = 0.0
+        self.fill_frames = 0
+        self.target_frames = 0
+        self._samples = deque()
+        self._last_sample = 0.0
+
+    def reset_segment(self):
+        self._samples.clear()
+
+    def update(self, fill_frames: int, target_frames: int, now: float = None):
+        now = time.time() if now is None else now
+        self.fill_frames = fill_frames
+        self.target_frames = target_frames
+
+        if now - self._last_sample >= 0.25:
+            self._last_sample = now
+            self._samples.append((now, fill_frames, self.correction_ppm))
+            while self._samples and now - self._samples[0][0] > self.window_seconds:
+                self._samples.popleft()
+            self._estimate()
+
+    def _estimate(self):
+        if len(self._samples) < 8:
+            return
+        t = np.array([s[0] for s in self._samples])
+        fill = np.array([s[1] for s in self._samples], dtype=np.float64)
+        if t[-1] - t[0] < self.min_span:
+            return
+
+        slope = np.polyfit(t - t[0], fill, 1)[0]  # frames per second
+        # What's left of the trend after our own correction, plus that correction
+        ppm = slope / self.rate * 1e6 + np.mean([s[2] for s in self._samples])
+        if abs(ppm) > self.MAX_PPM:
+            return
+        # Smooth: clock drift changes slowly (temperature), noise doesn't
+        self.ppm += 0.1 * (ppm - self.ppm)
+
+    def ratio(self) -> float:
+        """Input samples to consume per output sample."""
+        # Feed-forward the estimated drift, plus a gentle pull towards target fill
+        error = (self.fill_frames - self.target_frames) / float(self.rate)  # seconds
+        correction = self.ppm + 200.0 * error
+        self.correction_ppm = float(np.clip(correction, -self.MAX_PPM, self.MAX_PPM))
+        return 1.0 + self.correction_ppm * 1e-6
@@ -0,0 +1,79 @@
+import numpy as np
+from typing import Callable
+
+
+def pcm_to_float(chunk: bytes) -> np.ndarray:
+    return np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def float_to_pcm(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype(np.int16).tobytes()
+
+
+class StreamingSTFT:
+    """
+    Block-streaming STFT analysis/resynthesis with fixed latency.
+
+    Each call to process() takes a block of samples, runs every complete
+    frame in it through `spectral_fn` as one (frames x bins) array and
+    returns exactly as many samples as were passed in, delayed by
+    `latency` samples (plus up to one hop if the block size is not a
+    multiple of it). Uses sqrt-Hann windows at 75% overlap.
+    """
+    def __init__(self, spectral_fn: Callable[[np.ndarray], np.ndarray],
+                 frame_size: int = 512, hop: int = 128):
+        assert frame_size % hop == 0
+        self.spectral_fn = spectral_fn
+        self.frame_size = frame_size
+        self.hop = hop
+        self.overlap = frame_size // hop
+
+        window = np.hanning(frame_size + 1)[:-1].astype(np.float32)  # periodic
+        self.window = np.sqrt(window)
+        # sqrt-Hann analysis * synthesis sums to overlap/2 at this hop
+        self.gain = 2.0 / self.overlap
+
+        self.latency = frame_size - hop
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self.frame_size - self.hop, dtype=np.float32)
+        self._ola = np.zeros(self.frame_size - self.hop, dtype=np.float32)
+        self._out = np.zeros(0, dtype=np.float32)
+        self._primed = False
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        n = len(block)
+        buf = np.concatenate((self._history, block.astype(np.float32, copy=False)))
+        n_frames = (len(buf) - self.frame_size) // self.hop + 1
+
+        if n_frames > 0:
+            # (frames x frame_size) view without copying the input
+            frames = np.lib.stride_tricks.sliding_window_view(buf, self.frame_size)[::self.hop][:n_frames]
+            spec = np.fft.rfft(frames * self.window, axis=1)
+            spec = self.spectral_fn(spec)
+            y = np.fft.irfft(spec, n=self.frame_size, axis=1).astype(np.float32) * self.window
+
+            # Overlap-add, vectorized over frames: one pass per overlap slot
+            done = n_frames * self.hop
+            acc = np.zeros(done + self.frame_size - self.hop, dtype=np.float32)
+            acc[:len(self._ola)] += self._ola
+            y = y.reshape(n_frames, self.overlap, self.hop)
+            for j in range(self.overlap):
+                acc[j * self.hop:j * self.hop + done] += y[:, j, :].reshape(-1)
+
+            self._out = np.concatenate((self._out, acc[:done] * self.gain))
+            self._ola = acc[done:]
+            self._history = buf[done:]
+        else:
+            self._history = buf
+
+        # Emit exactly n samples. On the first block, pad enough that blocks
+        # which are not a multiple of the hop never run short afterwards.
+        if not self._primed or len(self._out) < n:
+            extra = 0 if self._primed else (-n) % self.hop
+            pad = np.zeros(max(0, n - len(self._out)) + extra, dtype=np.float32)
+            self._out = np.concatenate((pad, self._out))
+            self._primed = True
+        out, self._out = self._out[:n], self._out[n:]
+        return out
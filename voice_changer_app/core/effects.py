@@ -0,0 +1,189 @@
+import threading
+import numpy as np
+from core.vad import VAD
+from core.dsp import StreamingSTFT, pcm_to_float, float_to_pcm
+
+PRESETS = {
+    "Deep":      {"pitch": -4.0, "formant": 0.88},
+    "Giant":     {"pitch": -7.0, "formant": 0.80},
+    "High":      {"pitch": 4.0, "formant": 1.12},
+    "Chipmunk":  {"pitch": 9.0, "formant": 1.35},
+    "Masked":    {"pitch": 0.0, "formant": 0.85},
+    "Robot":     {"robot": True},
+    "Telephone": {"telephone": True},
+}
+
+
+class VoiceEffect:
+    """
+    Streaming voice effects on 16kHz int16 PCM: phase-vocoder pitch shift,
+    cepstral formant shift, robot and telephone filters. Every frame of a
+    chunk is processed as one NumPy array, so the only latency added is
+    the STFT's (384 samples at the default frame size).
+    """
+    def __init__(self, preset: str = "Deep", rate: int = 16000):
+        self.rate = rate
+        self._stft = StreamingSTFT(self._spectral)
+        n_bins = self._stft.frame_size // 2 + 1
+        self._bins = np.arange(n_bins, dtype=np.float32)
+        # Expected phase advance per hop for each bin (rad/sample)
+        self._omega = 2.0 * np.pi * self._bins / self._stft.frame_size
+        self._center = np.where(np.arange(n_bins) % 2 == 0, 1.0, -1.0).astype(np.float32)
+        self._band = None
+        self.set_preset(preset)
+
+    @property
+    def latency(self) -> int:
+        return self._stft.latency
+
+    def set_preset(self, preset: str):
+        params = PRESETS.get(preset, PRESETS["Deep"])
+        self.preset = preset if preset in PRESETS else "Deep"
+        self.pitch_ratio = 2.0 ** (params.get("pitch", 0.0) / 12.0)
+        self.formant_ratio = params.get("formant", 1.0)
+        self.robot = params.get("robot", False)
+        self.telephone = params.get("telephone", False)
+
+        freqs = self._bins * self.rate / self._stft.frame_size
+        self._band = ((freqs >= 300) & (freqs <= 3400)).astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        self._stft.reset()
+        self._prev_phase = np.zeros(len(self._bins), dtype=np.float32)
+        self._syn_phase = np.zeros(len(self._bins), dtype=np.float32)
+
+    def process(self, chunk: bytes) -> bytes:
+        y = self._stft.process(pcm_to_float(chunk))
+        if self.telephone:
+            # Narrow-band line with mild saturation
+            y = np.tanh(y * 2.5) * 0.5
+        return float_to_pcm(y)
+
+    def process_phrase(self, pcm: bytes) -> bytes:
+        """Process a complete phrase, compensating for the STFT delay."""
+        self.reset()
+        n = len(pcm) // 2
+        # Flush the STFT tail; keep the block hop-aligned so no priming pad is added
+        pad = self.latency + (-(n + self.latency)) % self._stft.hop
+        out = self.process(b"".join((pcm[:n * 2], bytes(pad * 2))))
+        return out[self.latency * 2:(self.latency + n) * 2]
+
+    # --- Spectral processing (frames x bins) ---
+
+    def _spectral(self, spec: np.ndarray) -> np.ndarray:
+        if self.robot:
+            # Constant phase: every frame restarts in phase -> buzzy monotone.
+            # The alternating sign centres each frame's pulse under the window.
+            return np.abs(spec) * self._center
+
+        if self.pitch_ratio != 1.0 or self.formant_ratio != 1.0:
+            spec = self._shift(spec)
+
+        if self.telephone:
+            spec = spec * self._band
+        return spec
+
+    def _shift(self, spec: np.ndarray) -> np.ndarray:
+        mag = np.abs(spec)
+        hop = self._stft.hop
+        env = self._envelope(mag)
+
+        if self.pitch_ratio != 1.0:
+            phase = np.angle(spec)
+            prev = np.vstack((self._prev_phase[None, :], phase[:-1]))
+            self._prev_phase = phase[-1]
+
+            # Instantaneous frequency of each bin
+            dphi = phase - prev - self._omega * hop
+            dphi = (dphi + np.pi) % (2.0 * np.pi) - np.pi
+            freq = self._omega + dphi / hop
+
+            # Each output bin reads from bin k / ratio
+            src = np.round(self._bins / self.pitch_ratio).astype(np.int64)
+            valid = src < len(self._bins)
+            src = np.minimum(src, len(self._bins) - 1)
+            mag = mag[:, src] * valid
+            freq = freq[:, src] * self.pitch_ratio
+
+            syn = self._syn_phase + np.cumsum(freq * hop, axis=0)
+            self._syn_phase = syn[-1] % (2.0 * np.pi)
+        else:
+            syn = np.angle(spec)
+
+        # Pitch shifting moved the envelope too; put it where the formant
+        # ratio wants it instead
+        shifted_env = self._warp(env, self.pitch_ratio)
+        target_env = self._warp(env, self.formant_ratio)
+        mag = mag * target_env / np.maximum(shifted_env, 1e-6)
+
+        return mag * np.exp(1j * syn)
+
+    def _envelope(self, mag: np.ndarray, lifter: int = 24) -> np.ndarray:
+        """Cepstrally smoothed spectral envelope for every frame."""
+        cep = np.fft.irfft(np.log(mag + 1e-6), axis=1)
+        cep[:, lifter:-lifter] = 0.0
+        return np.exp(np.fft.rfft(cep, axis=1).real)
+
+    def _warp(self, env: np.ndarray, ratio: float) -> np.ndarray:
+        """Stretch an envelope along frequency: out[k] = env[k / ratio]."""
+        if ratio == 1.0:
+            return env
+        pos = np.clip(self._bins / ratio, 0, len(self._bins) - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, len(self._bins) - 1)
+        frac = pos - lo
+        return env[:, lo] * (1.0 - frac) + env[:, hi] * frac
+
+
+class LocalEffectsProcessor:
+    """
+    Zero-network voice changer: runs VoiceEffect on every input chunk and
+    writes it straight back to the AudioManager output path.
+    Mirrors the STSProcessor start/stop interface so the UI can swap them.
+    """
+    def __init__(self, preset: str = "Deep"):
+        self.effect = VoiceEffect(preset)
+        self.is_processing = False
+        self._thread = None
+        self._stop_event = threading.Event()
+
+        self.on_log = None
+        self.on_vad_level = None
+        self.on_audio_data = None
+
+    def set_preset(self, preset: str):
+        self.effect.set_preset(preset)
+
+    def start_processing(self, audio_manager):
+        if self.is_processing:
+            return
+
+        self.is_processing = True
+        self._stop_event.clear()
+        self.effect.reset()
+        # One chunk in, one chunk out: no need to pre-buffer playback
+        audio_manager.set_prebuffer(1)
+
+        self._thread = threading.Thread(target=self._process_loop, args=(audio_manager,))
+        self._thread.daemon = True
+        self._thread.start()
+        if self.on_log: self.on_log(f"[LOCAL] Effects engine started ({self.effect.preset})")
+
+    def stop_processing(self):
+        self.is_processing = False
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    def _process_loop(self, audio_manager):
+        while self.is_processing and not self._stop_event.is_set():
+            chunk = audio_manager.get_input_chunk(timeout=0.1)
+            if not chunk:
+                continue
+
+            if self.on_audio_data:
+                pts = VAD.process_for_visualization(chunk)
+                if pts: self.on_audio_data(pts)
+
+            audio_manager.write_output_chunk(self.effect.process(chunk))
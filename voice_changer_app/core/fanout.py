@@ -0,0 +1,104 @@
+import wave
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class DeviceSink:
+    """Plays one fan-out voice on its own output device (output-only AudioManager)."""
+    per_phrase = False  # One continuous stream: phrases may be coalesced
+
+    def __init__(self, audio_manager, output_idx: int):
+        self.audio_manager = audio_manager
+        self.output_idx = output_idx
+
+    def start(self):
+        self.audio_manager.start_streams(None, self.output_idx)
+
+    def stop(self):
+        self.audio_manager.stop_streams()
+
+    def close(self):
+        self.audio_manager.terminate()
+
+    def write(self, chunk: bytes):
+        self.audio_manager.write_output_chunk(chunk)
+
+    def end_phrase(self, phrase):
+        pass
+
+    def backlog(self) -> float:
+        return self.audio_manager.playback_backlog()
+
+
+class WavFileSink:
+    """
+    Saves each converted phrase of one fan-out voice as its own WAV file,
+    named by capture line so the takes of every voice line up:
+    0007_<name>.wav.
+    """
+    per_phrase = True  # Needs end_phrase() after every phrase, so none are coalesced
+
+    def __init__(self, directory: str, name: str):
+        self.directory = Path(directory)
+        self.name = name
+        self._audio = bytearray()
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def stop(self):
+        self._audio.clear()
+
+    def close(self):
+        pass
+
+    def write(self, chunk: bytes):
+        self._audio.extend(chunk)
+
+    def end_phrase(self, phrase):
+        if self._audio and not phrase.cancelled:
+            path = self.directory / f"{phrase.line or 0:04d}_{self.name}.wav"
+            with wave.open(str(path), "wb") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(16000)
+                wav_file.writeframes(bytes(self._audio))
+        self._audio.clear()
+
+    def backlog(self) -> float:
+        return 0.0
+
+
+class VoiceTarget:
+    """An extra voice every captured phrase is also converted into, and where it goes."""
+    def __init__(self, voice_id: str, sink, name: Optional[str] = None):
+        self.voice_id = voice_id
+        self.sink = sink
+        self.name = name or voice_id
+
+    def __repr__(self):
+        return f"VoiceTarget({self.name})"
+
+
+def build_targets(specs: List[Dict], backend: str = "pyaudio", backend_options: Optional[Dict] = None,
+                  max_buffer_size: int = 2048) -> List[VoiceTarget]:
+    """
+    Targets from settings entries such as
+        {"voice_id": "...", "name": "narrator", "output_device": 5}
+        {"voice_id": "...", "name": "villain", "directory": "takes"}
+    """
+    from core.audio_manager import AudioManager
+
+    targets = []
+    for spec in specs:
+        name = spec.get("name") or spec["voice_id"]
+        if spec.get("output_device") is not None:
+            # Its own gauges would shadow the main output's
+            mgr = AudioManager(max_buffer_size, backend=backend, backend_options=backend_options, gauges=False)
+            sink = DeviceSink(mgr, int(spec["output_device"]))
+        elif spec.get("directory"):
+            sink = WavFileSink(spec["directory"], name)
+        else:
+            raise ValueError(f"fan-out voice '{name}' needs an output_device or a directory")
+        targets.append(VoiceTarget(spec["voice_id"], sink, name))
+    return targets
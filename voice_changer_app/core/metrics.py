@@ -0,0 +1,239 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0)
+
+
+class Counter:
+    """Monotonic count. inc() is a lock and an add, cheap enough for audio callbacks."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        return [(self.name, self.value)]
+
+    def state(self):
+        return self.value
+
+    def load(self, state):
+        self.value = state
+
+
+class Gauge:
+    """Current value; either set explicitly or read from `fn` at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        if self.fn is not None:
+            try:
+                return float(self.fn())
+            except Exception:
+                return 0.0
+        return self._value
+
+    def samples(self):
+        return [(self.name, self.value)]
+
+    def state(self):
+        return self.value
+
+    def load(self, state):
+        self.set(state)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus expects it."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float, since: Optional[dict] = None) -> float:
+        """
+        Estimate from the buckets, interpolating linearly within one.
+        With `since` (an earlier state()), only what was observed after it counts.
+        """
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if since is not None:
+            counts = [c - s for c, s in zip(counts, since["counts"])]
+            total -= since["count"]
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            if seen + c >= rank and c:
+                lo = self.buckets[i - 1] if i > 0 else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+    def samples(self):
+        with self._lock:
+            counts, total, s = list(self.counts), self.count, self.sum
+        out, cumulative = [], 0
+        for bound, c in zip(self.buckets, counts):
+            cumulative += c
+            out.append((f'{self.name}_bucket{{le="{bound}"}}', cumulative))
+        out.append((f'{self.name}_bucket{{le="+Inf"}}', total))
+        out.append((f"{self.name}_sum", s))
+        out.append((f"{self.name}_count", total))
+        return out
+
+    def state(self):
+        with self._lock:
+            return {"buckets": self.buckets, "counts": list(self.counts), "sum": self.sum, "count": self.count}
+
+    def load(self, state):
+        with self._lock:
+            self.buckets = tuple(state["buckets"])
+            self.counts = list(state["counts"])
+            self.sum = state["sum"]
+            self.count = state["count"]
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics. Getters create on first use, so modules
+    can declare their metrics at import time and share them by name.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str, fn: Callable[[], float] = None) -> Gauge:
+        gauge = self._get(Gauge, name, help)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def find(self, prefix: str) -> List[object]:
+        """Metrics whose name starts with `prefix`, sorted by name."""
+        with self._lock:
+            return sorted((m for n, m in self._metrics.items() if n.startswith(prefix)), key=lambda m: m.name)
+
+    def export(self, prefixes: Optional[Sequence[str]] = None) -> Dict[str, tuple]:
+        """
+        Picklable copy of every metric (or only those whose name starts with
+        one of `prefixes`), for sending to another process.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        if prefixes is not None:
+            metrics = [m for m in metrics if m.name.startswith(tuple(prefixes))]
+        return {m.name: (m.kind, m.help, m.state()) for m in metrics}
+
+    def absorb(self, exported: Dict[str, tuple]):
+        """Mirror metrics exported by another process (e.g. the audio core)."""
+        kinds = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}
+        for name, (kind, help, state) in exported.items():
+            self._get(kinds[kind], name, help).load(state)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for name, value in m.samples():
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the console
+
+
+class MetricsServer:
+    """Serves the registry at http://host:port/metrics from a daemon thread."""
+    def __init__(self, port: int = 9464, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.registry = self.registry
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,148 @@
+import threading
+import time
+import numpy as np
+from typing import Dict, Optional
+from core.drift import DriftEstimator, FractionalResampler
+from core.metrics import REGISTRY
+
+BUS_UNDERRUNS = REGISTRY.counter("vc_bus_underruns_total", "Extra outputs running dry for under 0.5 s mid-playback")
+BUS_LATENCY_DROPS = REGISTRY.counter("vc_bus_latency_drops_total",
+                                     "Chunks an extra output skipped to get back under its latency cap")
+BUS_WRITE_ERRORS = REGISTRY.counter("vc_bus_write_errors_total", "Failed writes to an extra output device")
+
+
+def apply_gain(chunk: bytes, gain: float) -> bytes:
+    if gain == 1.0:
+        return chunk
+    samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32) * gain
+    return np.clip(np.round(samples), -32768, 32767).astype(np.int16).tobytes()
+
+
+class OutputChannel:
+    """
+    An extra output device on the playback bus (e.g. headphones to monitor
+    yourself next to the virtual cable). It is fed a copy of every chunk the
+    main output plays, so nothing is converted twice.
+
+    Each channel keeps its own small buffer and writer thread, so a slow or
+    stalled device never holds up the others. The device's clock is held
+    against the main output's the same way capture and playback are: a
+    DriftEstimator watches the buffer fill and a FractionalResampler nudges
+    the rate. Past `max_latency` seconds of backlog (e.g. after the device
+    stalled) the oldest audio is skipped down to the prebuffer. `gain`
+    scales the samples.
+    """
+    def __init__(self, backend, device: int, gain: float = 1.0, name: Optional[str] = None,
+                 rate: int = 16000, chunk_size: int = 1024, prebuffer: float = 0.1, max_latency: float = 0.5):
+        self.backend = backend
+        self.device = device
+        self.gain = gain
+        self.name = name or f"Out:{device}"
+        self.rate = rate
+        self.chunk_size = chunk_size
+        self.target_frames = int(prebuffer * rate)
+        self.max_latency = max_latency
+        self.stream = None
+        self.is_running = False
+        self.drift = DriftEstimator(rate=rate)
+        self._resampler = FractionalResampler()
+        self._chunks = []
+        self._queued = 0
+        self._primed = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self.stats = {"underruns": 0, "dropped": 0, "write_errors": 0}
+
+    def start(self):
+        self.stream = self.backend.open_output(self.device, self.rate, self.chunk_size)
+        self.is_running = True
+        self.stream.start()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.is_running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=0.5)
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+        with self._cond:
+            self._chunks.clear()
+            self._queued = 0
+            self._primed = False
+        self._resampler.reset()
+        self.drift.reset_segment()
+
+    def feed(self, chunk: bytes):
+        """Called from the main output loop with each chunk it plays."""
+        with self._cond:
+            self._chunks.append(chunk)
+            self._queued += len(chunk)
+            if self._queued > self.max_latency * self.rate * 2:
+                # Fell behind: skip to the prebuffer rather than stay late
+                while self._chunks and self._queued - len(self._chunks[0]) >= self.target_frames * 2:
+                    self._queued -= len(self._chunks.pop(0))
+                    self.stats["dropped"] += 1
+                    BUS_LATENCY_DROPS.inc()
+            if self._queued >= self.target_frames * 2:
+                self._primed = True
+            self._cond.notify()
+
+    def _take(self) -> Optional[bytes]:
+        with self._cond:
+            if not (self._primed and self._chunks):
+                self._cond.wait(0.05)
+            if not (self._primed and self._chunks):
+                return None
+            chunk = self._chunks.pop(0)
+            self._queued -= len(chunk)
+            return chunk
+
+    def _loop(self):
+        dry_since = None
+        while self.is_running:
+            chunk = self._take()
+            if chunk is None:
+                if dry_since is None and self._primed:
+                    dry_since = time.time()
+                    self.drift.reset_segment()
+                    with self._cond:
+                        # Build the prebuffer up again before the next phrase plays
+                        if not self._chunks:
+                            self._primed = False
+                continue
+            if dry_since is not None:
+                if time.time() - dry_since < 0.5:
+                    self.stats["underruns"] += 1
+                    BUS_UNDERRUNS.inc()
+                dry_since = None
+            chunk = self._process(chunk)
+            try:
+                self.stream.write(chunk)
+            except (OSError, AttributeError):
+                # AttributeError: closed under us while stopping
+                self.stats["write_errors"] += 1
+                BUS_WRITE_ERRORS.inc()
+
+    def _process(self, chunk: bytes) -> bytes:
+        """Drift-correct against the main output's clock, then apply the gain."""
+        self.drift.update(self._queued // 2, self.target_frames)
+        samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+        out = self._resampler.process(samples, self.drift.ratio()) * self.gain
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16).tobytes()
+
+    def backlog(self) -> float:
+        return self._queued / (self.rate * 2.0)
+
+    def summary(self) -> Dict:
+        return {
+            "name": self.name,
+            "drift_ppm": round(self.drift.ppm, 1),
+            "buffer_ms": round(self.backlog() * 1000.0, 1),
+            "gain": self.gain,
+            **self.stats,
+        }
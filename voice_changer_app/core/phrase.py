@@ -0,0 +1,196 @@
+import time
+import threading
+from typing import Callable, List, Tuple
+
+
+class Phrase:
+    """
+    A captured phrase on its way through the processing queue.
+
+    Speculative phrases are dispatched as soon as silence begins, before the
+    VAD pause confirms end-of-speech. Their converted audio is held back
+    until the capture loop commits them; if speech resumes instead, they are
+    cancelled and whatever was received is discarded.
+
+    Live phrases carry a LiveAudioBody instead of audio: they are queued at
+    speech start and uploaded while the capture loop is still feeding them.
+
+    Arena phrases hold a PCMBuffer and expose it as a memoryview; release()
+    hands the slot back once the phrase has been processed.
+
+    Phrases converted in parallel still play in order: follow() chains a
+    phrase behind the one served before it, and its audio is held back
+    until that one has finished playing (or was cancelled).
+
+    Fan-out phrases carry a VoiceTarget (voice and sink) and share the
+    captured slot with the primary phrase; `line` numbers the capture.
+    """
+    def __init__(self, audio: bytes = b"", speculative: bool = False, body=None, buffer=None,
+                 captured_at: float = None, target=None, line: int = None):
+        self.buffer = buffer
+        self._audio = buffer.view() if buffer is not None else audio
+        self.body = body
+        self.target = target
+        self.line = line
+        self.speculative = speculative
+        self.created_at = time.time()
+        # Capture timeline: speech start, and end of capture (None while live)
+        self.captured_at = captured_at if captured_at is not None else self.created_at
+        self.ended_at = None if body is not None else self.created_at
+        # When the speaker actually stopped (before the VAD pause), if known
+        self.speech_ended_at = None
+        self.queued_at = self.created_at
+        self.cancelled = False
+        self.committed = not speculative
+        self.sent = False
+        self.played = False
+        # Coalesced phrases: restores the pauses between the original parts
+        self.splitter = None
+        self.on_played = None
+        # Called with the phrase just before its first audio is written out
+        self.on_first_audio = None
+        self.first_audio_at = None
+        self._finished = False
+        self._previous = None
+        self._next = None
+        self._write = None
+        self._pending = []
+        self._lock = threading.Lock()
+
+    @property
+    def audio(self) -> bytes:
+        if self.body is not None:
+            return self.body.audio
+        return self._audio
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / 32000.0 # 16000Hz * 2 bytes
+
+    def deadline(self, budget: float) -> float:
+        """Latest time this phrase may start playing and still be worth it."""
+        if self.ended_at is None:
+            return float("inf")
+        return self.ended_at + budget
+
+    @property
+    def voice_id(self):
+        """Fan-out voice, or None for the session's main voice."""
+        return self.target.voice_id if self.target is not None else None
+
+    @property
+    def mergeable(self) -> bool:
+        # An on_played hook has to see this phrase's own audio, not a merged one's
+        return self.body is None and not self.speculative and not self.cancelled and self.on_played is None
+
+    def follow(self, previous: "Phrase"):
+        """Play only after `previous` has played."""
+        with previous._lock:
+            if not previous.played:
+                previous._next = self
+                self._previous = previous
+
+    def _may_write(self) -> bool:
+        return self.committed and (self._previous is None or self._previous.played)
+
+    def deliver(self, chunk: bytes, write: Callable[[bytes], None]) -> bool:
+        """Route converted audio to output. Returns False once cancelled."""
+        if self.splitter is not None:
+            chunk = self.splitter.feed(chunk)
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._write = write
+            if self._may_write() and not self._pending:
+                self._emit(chunk)
+            else:
+                self._pending.append(chunk)
+            return True
+
+    def commit(self, write: Callable[[bytes], None]):
+        """Confirm the phrase ended; release any audio held back so far."""
+        with self._lock:
+            if self.cancelled:
+                return
+            self.committed = True
+            self._write = write
+        self._advance()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            self._pending.clear()
+        self._advance()
+
+    def finish(self):
+        """Called once no more audio will be delivered for this phrase."""
+        with self._lock:
+            self._finished = True
+        self._advance()
+
+    def _emit(self, chunk: bytes):
+        # Lock held
+        if self.first_audio_at is None:
+            self.first_audio_at = time.time()
+            if self.on_first_audio:
+                self.on_first_audio(self)
+        self._write(chunk)
+
+    def _advance(self):
+        # Flush held audio if it's our turn; once played, let the next one go
+        with self._lock:
+            if self.played:
+                return
+            if not self.cancelled:
+                if not self._may_write():
+                    return
+                for chunk in self._pending:
+                    self._emit(chunk)
+                self._pending.clear()
+                if not self._finished:
+                    return
+            # Before `played` lets the next phrase write to the same sink
+            if self.on_played:
+                self.on_played(self)
+            self.played = True
+            self._previous = None
+            nxt = self._next
+        if nxt is not None:
+            nxt._advance()
+
+    def release(self):
+        """Return arena-backed audio to its pool. The phrase is unusable afterwards."""
+        if self.buffer is not None:
+            self._audio = b""
+            self.buffer.release()
+            self.buffer = None
+
+
+class BoundarySplitter:
+    """
+    Splits a coalesced phrase's converted audio back into its parts.
+    Output follows the input's timeline (16 kHz in, 16 kHz out), so each
+    recorded boundary is a byte offset in the response; the original pause
+    between the parts is put back there as silence.
+    """
+    def __init__(self, boundaries: List[Tuple[int, int]]):
+        self.boundaries = sorted(boundaries)   # (byte offset, silence bytes)
+        self.position = 0
+
+    def feed(self, chunk: bytes) -> bytes:
+        if not self.boundaries or self.boundaries[0][0] >= self.position + len(chunk):
+            self.position += len(chunk)
+            return chunk
+        out = []
+        start = self.position
+        end = start + len(chunk)
+        cut = start
+        while self.boundaries and self.boundaries[0][0] < end:
+            offset, silence = self.boundaries.pop(0)
+            offset = max(offset & ~1, cut)  # Whole samples
+            out.append(chunk[cut - start:offset - start])
+            out.append(bytes(silence & ~1))
+            cut = offset
+        out.append(chunk[cut - start:])
+        self.position = end
+        return b"".join(out)
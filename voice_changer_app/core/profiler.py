@@ -0,0 +1,140 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter as Tally
+from typing import Dict, List, Optional, Tuple
+from core.metrics import REGISTRY
+
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+STAGE_PREFIX = "vc_stage_"
+# A stack ending in one of these is a thread blocked waiting, not working
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py", "socket.py", "ssl.py", "connection.py")
+
+
+class StageTimers:
+    """
+    Opt-in timers around the hot-path stages. Each stage gets a histogram,
+    vc_stage_<name>_seconds, so timings reach the stats tab, /metrics and
+    (from the audio core process) the UI process like any other metric.
+
+        started = PROFILER.clock()
+        ...
+        PROFILER.record("vad", started)
+
+    Disabled, clock() returns None and record() returns at once: an
+    attribute check per call, no clock reads.
+    """
+    def __init__(self):
+        self.enabled = False
+        self._hists = {}
+
+    def clock(self) -> Optional[float]:
+        return time.perf_counter() if self.enabled else None
+
+    def record(self, stage: str, started: Optional[float]):
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        hist = self._hists.get(stage)
+        if hist is None:
+            hist = self._hists[stage] = REGISTRY.histogram(f"{STAGE_PREFIX}{stage}_seconds",
+                                                           f"Time spent in the {stage} stage", STAGE_BUCKETS)
+        hist.observe(elapsed)
+
+    @staticmethod
+    def summary() -> List[str]:
+        """One line per stage timed so far, here or in the audio core process."""
+        lines = []
+        for hist in REGISTRY.find(STAGE_PREFIX):
+            if hist.count:
+                stage = hist.name[len(STAGE_PREFIX):-len("_seconds")]
+                lines.append(f"{stage:<18}{hist.count:>8}  p50 {hist.quantile(0.5) * 1000:6.2f}ms  "
+                             f"p99 {hist.quantile(0.99) * 1000:6.2f}ms  total {hist.sum:6.2f}s")
+        return lines
+
+
+PROFILER = StageTimers()
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for a live session: every `interval` seconds it
+    walks the current stack of every other thread (sys._current_frames)
+    and counts each distinct stack. folded() gives the collapsed-stack
+    format that flamegraph.pl, inferno and speedscope read.
+
+    How late the sampler itself wakes up is recorded too: a sleeping
+    thread waits for the GIL like any other, so lateness well above the
+    interval means something is holding it.
+    """
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = Tally()
+        self.samples = 0
+        self.lateness = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def run_for(self, seconds: float):
+        """Sample for `seconds` (blocking)."""
+        self.start()
+        time.sleep(seconds)
+        self.stop()
+
+    def _run(self):
+        me = threading.get_ident()
+        due = time.perf_counter()
+        while not self._stop.is_set():
+            due += self.interval
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.lateness.append(max(0.0, time.perf_counter() - due))
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self.stacks[(names.get(ident, str(ident)),) + self._stack(frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _stack(frame) -> Tuple[str, ...]:
+        out = []
+        while frame is not None:
+            code = frame.f_code
+            out.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return tuple(reversed(out))
+
+    def folded(self) -> str:
+        return "".join(f"{';'.join(stack)} {n}\n" for stack, n in self.stacks.most_common())
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            f.write(self.folded())
+
+    def top(self, n: int = 10, busy_only: bool = True) -> List[Tuple[str, float]]:
+        """Functions seen on top of a stack most often, with their share of the (busy) samples."""
+        leaves = Tally()
+        for stack, count in self.stacks.items():
+            if busy_only and stack[-1].rsplit("(", 1)[-1].split(":")[0] in IDLE_FILES:
+                continue
+            leaves[stack[-1]] += count
+        total = float(sum(leaves.values())) or 1.0
+        return [(frame, count / total) for frame, count in leaves.most_common(n)]
+
+    def summary(self) -> Dict:
+        late = sorted(self.lateness) or [0.0]
+        return {"samples": self.samples, "stacks": len(self.stacks),
+                "lateness_p50": late[len(late) // 2], "lateness_p99": late[int(len(late) * 0.99)]}
@@ -0,0 +1,198 @@
+import hashlib
+import threading
+import time
+from collections import deque
+from typing import Dict, Mapping, Optional
+from core.metrics import REGISTRY
+
+API_IN_FLIGHT = REGISTRY.gauge("vc_api_in_flight", "Speech-to-speech requests currently in flight")
+API_THROTTLE_WAIT = REGISTRY.histogram("vc_api_throttle_wait_seconds", "Time requests waited for the per-key limiter",
+                                       buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0))
+API_RATE_LIMITED = REGISTRY.counter("vc_api_rate_limited_total", "Requests the API rejected with 429")
+
+
+class RateLimited(Exception):
+    """No request slot was free within the wait allowed."""
+
+
+class KeyLimiter:
+    """
+    Client-side view of one API key's limits, shared by everything that
+    sends requests with that key (live workers, hedges, batch conversion).
+
+    - concurrency: at most `limit` requests in flight. It starts at
+      `max_concurrency`, follows the server's maximum-concurrent-requests
+      header when one is seen, halves on a 429 and grows back by one after
+      `recover_after` clean requests.
+    - rate: at most `headroom` of `requests_per_minute` starts in any 60 s
+      window (0 disables), so throttling kicks in before the server's does.
+    - pause: a 429 holds every caller back for Retry-After (or a short
+      default) instead of letting each retry on its own.
+    """
+    def __init__(self, max_concurrency: int = 2, requests_per_minute: int = 0,
+                 headroom: float = 0.9, recover_after: int = 20):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.requests_per_minute = requests_per_minute
+        self.headroom = headroom
+        self.recover_after = recover_after
+        self.limit = self.max_concurrency
+        self.server_limit = None
+        self.in_flight = 0
+        self._starts = deque()
+        self._pause_until = 0.0
+        self._clean = 0
+        self._cond = threading.Condition()
+        self.stats = {"requests": 0, "throttled": 0, "throttled_seconds": 0.0, "rate_limited": 0}
+
+    def configure(self, max_concurrency: int = None, requests_per_minute: int = None):
+        with self._cond:
+            if max_concurrency is not None:
+                self.max_concurrency = max(1, int(max_concurrency))
+                self.limit = self._cap(self.max_concurrency)
+            if requests_per_minute is not None:
+                self.requests_per_minute = max(0, int(requests_per_minute))
+            self._cond.notify_all()
+
+    def _cap(self, limit: int) -> int:
+        limit = min(limit, self.max_concurrency)
+        if self.server_limit:
+            limit = min(limit, self.server_limit)
+        return max(1, limit)
+
+    def _wait_needed(self, now: float) -> float:
+        """Seconds until a request could start (0 = now). Lock held."""
+        wait = max(0.0, self._pause_until - now)
+        if self.requests_per_minute:
+            while self._starts and now - self._starts[0] >= 60.0:
+                self._starts.popleft()
+            allowed = max(1, int(self.requests_per_minute * self.headroom))
+            if len(self._starts) >= allowed:
+                wait = max(wait, self._starts[len(self._starts) - allowed] + 60.0 - now)
+        if self.in_flight >= self.limit:
+            wait = max(wait, 0.05)  # Until a release; notify wakes us sooner
+        return wait
+
+    def available(self) -> int:
+        """Requests that could start right now."""
+        with self._cond:
+            if self._wait_needed(time.time()) > 0:
+                return 0
+            return self.limit - self.in_flight
+
+    def wait_available(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for a slot to free up, without taking it."""
+        end = time.time() + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                wait = self._wait_needed(now)
+                if wait <= 0:
+                    return True
+                if now >= end:
+                    return False
+                self._cond.wait(min(wait, end - now))
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take a request slot, waiting up to `timeout` seconds (None = forever)."""
+        started = time.time()
+        end = None if timeout is None else started + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                wait = self._wait_needed(now)
+                if wait <= 0:
+                    break
+                if end is not None and now >= end:
+                    return False
+                self._cond.wait(wait if end is None else min(wait, end - now))
+            self.in_flight += 1
+            self._starts.append(now)
+            self.stats["requests"] += 1
+            waited = now - started
+            if waited > 0.001:
+                self.stats["throttled"] += 1
+                self.stats["throttled_seconds"] += waited
+        API_THROTTLE_WAIT.observe(waited)
+        API_IN_FLIGHT.set(self.in_flight)
+        return True
+
+    def release(self, ok: bool = True):
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            if ok:
+                self._clean += 1
+                if self._clean >= self.recover_after and self.limit < self._cap(self.max_concurrency):
+                    self.limit += 1
+                    self._clean = 0
+            self._cond.notify_all()
+        API_IN_FLIGHT.set(self.in_flight)
+
+    def rate_limited(self, retry_after: Optional[float] = None):
+        """The server said 429: back off together and shrink the window."""
+        with self._cond:
+            self._pause_until = max(self._pause_until, time.time() + (retry_after or 1.0))
+            self.limit = max(1, self.limit // 2)
+            self._clean = 0
+            self.stats["rate_limited"] += 1
+        API_RATE_LIMITED.inc()
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]):
+        """Learn the key's limits from response headers, where the API sends them."""
+        if not headers:
+            return
+        headers = {k.lower(): v for k, v in headers.items()}
+        with self._cond:
+            maximum = _int(headers.get("maximum-concurrent-requests"))
+            if maximum:
+                self.server_limit = maximum
+                self.limit = self._cap(self.limit)
+            remaining = _int(headers.get("x-ratelimit-remaining-requests", headers.get("x-ratelimit-remaining")))
+            reset = _float(headers.get("x-ratelimit-reset-requests", headers.get("x-ratelimit-reset")))
+            if remaining is not None and remaining <= 0 and reset:
+                self._pause_until = max(self._pause_until, time.time() + reset)
+
+    def observe_error(self, error: Exception):
+        """Feed a failed request's status and headers back in."""
+        headers = getattr(error, "headers", None)
+        self.observe_headers(headers)
+        if getattr(error, "status_code", None) == 429:
+            retry = None
+            if headers:
+                retry = _float({k.lower(): v for k, v in headers.items()}.get("retry-after"))
+            self.rate_limited(retry)
+
+    def summary(self) -> str:
+        st = self.stats
+        server = f", server max {self.server_limit}" if self.server_limit else ""
+        return (
+            f"[LIMIT] {st['requests']} requests, concurrency {self.limit}/{self.max_concurrency}{server}, "
+            f"{st['throttled']} throttled ({st['throttled_seconds']:.1f}s), {st['rate_limited']} rate limited"
+        )
+
+
+def _int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: Dict[str, KeyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(api_key: str) -> KeyLimiter:
+    """The limiter shared by every client using this API key."""
+    key = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = KeyLimiter()
+        return limiter
@@ -0,0 +1,216 @@
+import time
+import random
+import queue
+import threading
+from collections import deque
+from typing import Callable, Iterator, Optional
+
+# Status codes worth retrying: rate limits and transient server errors
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class StreamTimeout(Exception):
+    """A response stream missed one of its phase deadlines."""
+    def __init__(self, phase: str, seconds: float):
+        super().__init__(f"{phase} deadline exceeded ({seconds:.1f}s)")
+        self.phase = phase
+        self.seconds = seconds
+
+
+def backoff_delay(attempt: int, base: float = 0.25, cap: float = 8.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """Rolling window of latency samples with percentile lookup."""
+    def __init__(self, window: int = 100):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds, then lets a single trial call through
+    (half-open). A success closes it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 15.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.time()
+            self._trial_in_flight = False
+
+
+class _StreamReader:
+    """Drains one response iterator on a daemon thread into a shared queue."""
+    def __init__(self, rid: int, factory: Callable[[], Iterator[bytes]], out: queue.Queue):
+        self.rid = rid
+        self.cancelled = False
+        self._factory = factory
+        self._out = out
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            for chunk in self._factory():
+                if self.cancelled:
+                    return
+                if chunk:
+                    self._out.put((self.rid, "data", chunk))
+            self._out.put((self.rid, "end", None))
+        except Exception as e:
+            self._out.put((self.rid, "error", e))
+
+
+class HedgedStream:
+    """
+    Iterates a streaming response under per-phase deadlines.
+
+    - first byte: no audio within `first_byte_timeout` of dispatch
+    - inter-chunk: a gap longer than `chunk_gap_timeout` once audio flows
+
+    If `hedge_after` passes without a first byte, a duplicate request is
+    started and whichever produces audio first is kept; the other is
+    abandoned. A stalled request cannot be interrupted, so readers run on
+    daemon threads and their late output is ignored.
+
+    `ready` delays the first-byte clock until the event is set, for
+    requests whose body is still being uploaded when they are dispatched.
+    """
+    def __init__(self, factory: Callable[[], Iterator[bytes]],
+                 first_byte_timeout: float = 4.0, chunk_gap_timeout: float = 2.0,
+                 hedge_after: Optional[float] = None, ready: Optional[threading.Event] = None):
+        self.factory = factory
+        self.first_byte_timeout = first_byte_timeout
+        self.chunk_gap_timeout = chunk_gap_timeout
+        self.hedge_after = hedge_after
+        self.ready = ready
+
+        self.ttfb = None
+        self.hedged = False
+        self.winner = None
+
+    def __iter__(self) -> Iterator[bytes]:
+        readers = []
+        try:
+            yield from self._iterate(readers)
+        finally:
+            # Consumer stopped early or a deadline fired: drop every reader
+            self._cancel(readers)
+
+    def _iterate(self, readers) -> Iterator[bytes]:
+        events = queue.Queue()
+        started = time.time()
+        readers.append(_StreamReader(0, self.factory, events))
+        alive = {0}
+        last_error = None
+
+        # Phase 1: first byte (possibly hedged)
+        while self.winner is None:
+            now = time.time()
+            waiting = self.ready is not None and not self.ready.is_set()
+            if waiting:
+                started = now  # Body still uploading: the clock hasn't started
+            deadline = started + self.first_byte_timeout
+            wake = deadline
+            if self.hedge_after is not None and not self.hedged:
+                wake = min(wake, started + self.hedge_after)
+            if waiting:
+                wake = min(wake, now + 0.05)
+
+            try:
+                rid, kind, payload = events.get(timeout=max(0.0, wake - now))
+            except queue.Empty:
+                if waiting:
+                    continue
+                if time.time() >= deadline:
+                    raise StreamTimeout("first byte", self.first_byte_timeout)
+                self.hedged = True
+                readers.append(_StreamReader(1, self.factory, events))
+                alive.add(1)
+                continue
+
+            if kind == "data":
+                self.winner = rid
+                self.ttfb = time.time() - started
+                self._cancel(r for r in readers if r.rid != rid)
+                yield payload
+                break
+
+            # Reader finished without audio
+            alive.discard(rid)
+            if kind == "error":
+                last_error = payload
+            if not alive:
+                if last_error is not None:
+                    raise last_error
+                return
+
+        # Phase 2: stream the winner
+        while True:
+            try:
+                rid, kind, payload = events.get(timeout=self.chunk_gap_timeout)
+            except queue.Empty:
+                raise StreamTimeout("inter-chunk", self.chunk_gap_timeout)
+            if rid != self.winner:
+                continue
+            if kind == "data":
+                yield payload
+            elif kind == "end":
+                return
+            else:
+                raise payload
+
+    @staticmethod
+    def _cancel(readers):
+        for r in readers:
+            r.cancelled = True
@@ -0,0 +1,173 @@
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+from core.phrase import Phrase, BoundarySplitter
+from core.metrics import REGISTRY
+
+QUEUE_WAIT = REGISTRY.histogram("vc_queue_wait_seconds", "Time phrases spent queued before the worker took them")
+PHRASES_DROPPED = REGISTRY.counter("vc_phrases_dropped_total", "Phrases dropped because they could no longer play in time")
+PHRASES_MERGED = REGISTRY.counter("vc_phrases_merged_total", "Queued phrases folded into an earlier one's request")
+
+
+class PhraseScheduler:
+    """
+    Deadline-aware replacement for the FIFO processing queue (same
+    put/get/empty/qsize interface).
+
+    Each phrase must start playing within `budget` seconds of the end of
+    its capture. Before handing out work the scheduler projects when every
+    queued phrase would start playing (expected API delay from `delay_fn`,
+    plus everything queued ahead of it, which plays first). The oldest
+    phrases are dropped while the newest would miss its deadline, and
+    then any phrase that is stale on its own.
+
+    Bytes phrases waiting behind each other are coalesced into one request
+    when that is quicker than sending them apart: always when one of the
+    pair is shorter than `coalesce_below` (the per-request overhead
+    dominates), otherwise only when no request slot is free for the
+    second one (`slots_fn`). The boundaries are kept so the response can
+    be split back with the original pauses. Served phrases are chained so
+    they play in order even when converted in parallel.
+
+    Fan-out phrases for other voices play on their own sinks, so all of
+    the above is worked out per target (`Phrase.target`, None being the
+    main output); `delay_fn(target)` gives that output's expected delay.
+    """
+    def __init__(self, budget: float = 8.0, max_merge: float = 30.0, coalesce_below: float = 1.5,
+                 max_gap: float = 1.0):
+        self.budget = budget            # 0 disables dropping
+        self.max_merge = max_merge      # Seconds of audio per merged request (0 disables merging)
+        self.coalesce_below = coalesce_below
+        self.max_gap = max_gap          # Longest pause restored between coalesced parts
+        self.delay_fn: Callable[[object], float] = lambda target: 0.0
+        self.slots_fn: Callable[[], int] = lambda: 0
+        self.on_log = None
+        self._items = deque()
+        self._last_served = {}
+        self._cond = threading.Condition()
+        self.stats = {"served": 0, "dropped": 0, "dropped_seconds": 0.0, "merged": 0}
+
+    def put(self, phrase: Phrase):
+        with self._cond:
+            phrase.queued_at = time.time()
+            self._items.append(phrase)
+            self._cond.notify()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def oldest_age(self) -> float:
+        items = list(self._items)
+        return time.time() - items[0].captured_at if items else 0.0
+
+    def get(self, timeout: Optional[float] = None) -> Phrase:
+        end = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                self._prune(time.time())
+                if self._items:
+                    break
+                remaining = None if end is None else end - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+
+            phrase = self._items.popleft()
+            phrase = self._merge(phrase)
+            previous = self._last_served.get(phrase.target)
+            if previous is not None:
+                phrase.follow(previous)
+            self._last_served[phrase.target] = phrase
+        self.stats["served"] += 1
+        QUEUE_WAIT.observe(time.time() - phrase.queued_at)
+        return phrase
+
+    def _prune(self, now: float):
+        if not self.budget or not self._items:
+            return
+        targets = {p.target for p in self._items}
+        for target in targets:
+            self._prune_target(target, now)
+
+    def _prune_target(self, target, now: float):
+        group = [p for p in self._items if p.target is target]
+        delay = self.delay_fn(target)
+
+        def late_by(index: int) -> float:
+            # When this phrase would start playing, relative to its deadline
+            ahead = sum(p.duration for p in group[:index])
+            return now + delay + ahead - group[index].deadline(self.budget)
+
+        # Newest speech first: shed the oldest while the newest would be late,
+        # as long as it could still make it on its own
+        newest = group[-1]
+        while len(group) > 1 and late_by(len(group) - 1) > 0 \
+                and now + delay <= newest.deadline(self.budget):
+            oldest = group.pop(0)
+            self._items.remove(oldest)
+            self._drop(oldest, "behind newer speech")
+        # Then anything stale on its own
+        for phrase in [p for i, p in enumerate(group) if late_by(i) > 0]:
+            self._items.remove(phrase)
+            self._drop(phrase, "past its deadline")
+
+    def _drop(self, phrase: Phrase, reason: str):
+        phrase.cancel()
+        if phrase.body is not None:
+            phrase.body.abort()
+        self.stats["dropped"] += 1
+        self.stats["dropped_seconds"] += phrase.duration
+        PHRASES_DROPPED.inc()
+        if self.on_log:
+            self.on_log(f"[SCHED] Dropped {phrase.duration:.1f}s phrase, "
+                        f"{time.time() - phrase.captured_at:.1f}s old ({reason})")
+        phrase.release()
+
+    def _merge(self, head: Phrase) -> Phrase:
+        if not self.max_merge or not head.mergeable:
+            return head
+        parts = [head]
+        total = head.duration
+        # Only phrases for the same output follow each other
+        for nxt in [p for p in self._items if p.target is head.target]:
+            if not nxt.mergeable or total + nxt.duration > self.max_merge:
+                break
+            if min(parts[-1].duration, nxt.duration) >= self.coalesce_below and self.slots_fn() > 0:
+                break  # Both long and a slot is free: in parallel is sooner
+            self._items.remove(nxt)
+            parts.append(nxt)
+            total += nxt.duration
+        if len(parts) == 1:
+            return head
+
+        boundaries, offset = [], 0
+        for prev, nxt in zip(parts, parts[1:]):
+            offset += len(prev.audio)
+            pause = min(max(0.0, nxt.captured_at - prev.ended_at), self.max_gap)
+            boundaries.append((offset, int(pause * 16000) * 2))
+        merged = Phrase(b"".join(p.audio for p in parts), captured_at=head.captured_at,
+                        target=head.target, line=head.line)
+        merged.splitter = BoundarySplitter(boundaries)
+        merged.ended_at = parts[-1].ended_at
+        merged.speech_ended_at = head.speech_ended_at  # The head's audio is what plays first
+        merged.queued_at = head.queued_at
+        for p in parts:
+            p.release()
+        self.stats["merged"] += len(parts) - 1
+        PHRASES_MERGED.inc(len(parts) - 1)
+        if self.on_log:
+            self.on_log(f"[SCHED] Merged {len(parts)} queued phrases into one {total:.1f}s request")
+        return merged
+
+    def summary(self) -> str:
+        st = self.stats
+        return (
+            f"[SCHED] {st['served']} served, {st['merged']} merged, "
+            f"{st['dropped']} dropped ({st['dropped_seconds']:.1f}s of speech), "
+            f"wait p50 {QUEUE_WAIT.quantile(0.5):.2f}s p95 {QUEUE_WAIT.quantile(0.95):.2f}s"
+        )
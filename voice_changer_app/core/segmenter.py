@@ -0,0 +1,105 @@
+from typing import List, Tuple
+
+BYTES_PER_SECOND = 32000  # 16000Hz * 2 bytes
+
+
+class PhraseSegmenter:
+    """
+    Phrase buffering state machine shared by live capture and batch conversion.
+    Fed one chunk at a time with its VAD decision and a clock value, it emits
+    events describing where phrases begin and end:
+
+        ("speech_start",)
+        ("silence_start",)   trailing silence began inside a phrase
+        ("speech_resume",)   speech came back before the pause elapsed
+        ("phrase", pcm_bytes, duration, forced)
+        ("discard", duration)
+
+    Given a PCMArena, phrases are written into pooled slots instead of a
+    growing bytearray and the phrase event carries the PCMBuffer itself;
+    whoever receives it owns it and must release() it.
+    """
+    MIN_DURATION = 0.5     # Min phrase length (ignore clicks)
+
+    def __init__(self, vad_pause: float = 1.0, max_duration: float = 30.0, arena=None):
+        self.vad_pause = vad_pause
+        self.max_duration = max_duration
+        self.arena = arena
+        self.buffer = arena.acquire() if arena else bytearray()
+        self.is_speaking = False
+        self.silence_start_time = None
+        # Byte offset (in the fed stream) where the current phrase began
+        self.phrase_offset = 0
+        self.phrase_started_at = None
+        # When the last phrase's speech stopped (None if it was cut while speaking)
+        self.speech_ended_at = None
+        self._fed = 0
+
+    def reset(self):
+        if self.arena and self.buffer.refs > 1:
+            # Someone still reads this slot (a speculative send); write elsewhere
+            self.buffer.release()
+            self.buffer = self.arena.acquire()
+        else:
+            self.buffer.clear()
+        self.is_speaking = False
+        self.silence_start_time = None
+
+    def feed(self, chunk: bytes, is_speech_frame: bool, now: float) -> List[Tuple]:
+        events = []
+
+        if self.arena and self.is_speaking and self.buffer.free < len(chunk):
+            # Slot sized for an older, shorter max_duration
+            events.append(self._end_phrase(forced=True))
+
+        if is_speech_frame:
+            if not self.is_speaking:
+                self.is_speaking = True
+                self.phrase_offset = self._fed
+                self.phrase_started_at = now
+                events.append(("speech_start",))
+            elif self.silence_start_time is not None:
+                events.append(("speech_resume",))
+
+            self.silence_start_time = None # Reset silence timer
+            self.buffer.extend(chunk)
+
+        elif self.is_speaking:
+            self.buffer.extend(chunk) # Keep trailing silence for natural fade
+
+            if self.silence_start_time is None:
+                self.silence_start_time = now
+                events.append(("silence_start",))
+
+            # Check if silence exceeded threshold
+            if (now - self.silence_start_time) > self.vad_pause:
+                events.append(self._end_phrase(forced=False))
+
+        self._fed += len(chunk)
+
+        # Safety: Force send if buffer gets too big
+        if len(self.buffer) > (self.max_duration * BYTES_PER_SECOND):
+            events.append(self._end_phrase(forced=True))
+
+        return events
+
+    def flush(self) -> List[Tuple]:
+        """End any phrase in progress (e.g. at end of file)."""
+        if not self.is_speaking:
+            return []
+        return [self._end_phrase(forced=False)]
+
+    def _end_phrase(self, forced: bool) -> Tuple:
+        duration = len(self.buffer) / float(BYTES_PER_SECOND)
+        self.speech_ended_at = self.silence_start_time
+        if forced or duration >= self.MIN_DURATION:
+            if self.arena:
+                # Hand the slot over as is; keep writing into a fresh one
+                event = ("phrase", self.buffer, duration, forced)
+                self.buffer = self.arena.acquire()
+            else:
+                event = ("phrase", bytes(self.buffer), duration, forced)
+        else:
+            event = ("discard", duration)
+        self.reset()
+        return event
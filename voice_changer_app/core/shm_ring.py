@@ -0,0 +1,86 @@
+import struct
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+_HEADER = 16                       # write_pos, read_pos (uint64, ever-increasing)
+_RECORD = struct.Struct("<Ifi")    # payload length, value, flags
+
+
+class SharedRing:
+    """
+    Single-producer / single-consumer ring of framed records in shared
+    memory, for passing PCM between processes without pickling.
+
+    Each record is a payload plus a float and an int of metadata (e.g.
+    RMS and the VAD decision). Positions only ever grow and each side
+    writes only its own, so no lock is needed: the producer publishes a
+    record by advancing write_pos after the bytes are in place.
+    """
+    def __init__(self, name: Optional[str] = None, capacity: int = 1 << 20):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=_HEADER + capacity)
+            self.owner = True
+        else:
+            try:
+                # Only the creator should unlink it (Python 3.13+)
+                self.shm = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        self.capacity = self.shm.size - _HEADER
+        self._pos = np.ndarray((2,), dtype=np.uint64, buffer=self.shm.buf[:_HEADER])
+        self._data = self.shm.buf[_HEADER:_HEADER + self.capacity]
+        if self.owner:
+            self._pos[:] = 0
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        """Bytes written but not yet read (framing included)."""
+        return int(self._pos[0] - self._pos[1])
+
+    def put(self, payload: bytes, value: float = 0.0, flags: int = 0) -> bool:
+        """Append a record. Returns False (and counts a drop) if it doesn't fit."""
+        size = _RECORD.size + len(payload)
+        write = int(self._pos[0])
+        if size > self.capacity - (write - int(self._pos[1])):
+            self.dropped += 1
+            return False
+        self._copy_in(write, _RECORD.pack(len(payload), value, flags))
+        self._copy_in(write + _RECORD.size, payload)
+        self._pos[0] = write + size  # Publish
+        return True
+
+    def get(self) -> Optional[Tuple[bytes, float, int]]:
+        """Pop the oldest record, or None if the ring is empty."""
+        read = int(self._pos[1])
+        if int(self._pos[0]) == read:
+            return None
+        length, value, flags = _RECORD.unpack(self._copy_out(read, _RECORD.size))
+        payload = self._copy_out(read + _RECORD.size, length)
+        self._pos[1] = read + _RECORD.size + length  # Release the space
+        return payload, value, flags
+
+    def _copy_in(self, pos: int, data: bytes):
+        start = pos % self.capacity
+        first = min(len(data), self.capacity - start)
+        self._data[start:start + first] = data[:first]
+        if first < len(data):
+            self._data[:len(data) - first] = data[first:]
+
+    def _copy_out(self, pos: int, length: int) -> bytes:
+        start = pos % self.capacity
+        first = min(length, self.capacity - start)
+        if first == length:
+            return bytes(self._data[start:start + length])
+        return bytes(self._data[start:]) + bytes(self._data[:length - first])
+
+    def close(self):
+        # Views into the mapping must go before it can be closed
+        self._pos = None
+        self._data.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,116 @@
+import uuid
+import queue
+import threading
+import requests
+from typing import Callable, Dict, Iterator, Optional
+
+API_BASE_URL = "https://api.elevenlabs.io"
+
+
+class TransportError(Exception):
+    """Non-2xx response from the streaming transport."""
+    def __init__(self, status_code: int, body: str, headers: Dict[str, str] = None):
+        super().__init__(f"HTTP {status_code}: {body[:200]}")
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+
+class LiveAudioBody:
+    """
+    Request body that is written while the phrase is still being captured.
+    The capture loop feeds chunks as they arrive and closes the body at
+    end-of-speech; the upload iterates it concurrently.
+    """
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._captured = bytearray()
+        self._lock = threading.Lock()
+        self.closed = threading.Event()
+        self.aborted = False
+
+    def feed(self, chunk: bytes):
+        with self._lock:
+            if self.closed.is_set():
+                return
+            self._captured.extend(chunk)
+        self._queue.put(bytes(chunk))
+
+    def close(self):
+        self.closed.set()
+        self._queue.put(None)
+
+    def abort(self):
+        self.aborted = True
+        self.close()
+
+    @property
+    def audio(self) -> bytes:
+        """Everything fed so far (complete once closed)."""
+        with self._lock:
+            return bytes(self._captured)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            yield chunk
+        if self.aborted:
+            # Fail the request rather than upload a truncated phrase
+            raise IOError("live body aborted")
+
+
+class StreamingTransport:
+    """
+    Minimal speech-to-speech client that posts a multipart body from an
+    iterator, so `requests` sends it with chunked transfer encoding and
+    the upload runs while speech is still being captured.
+    """
+    def __init__(self, api_key: str, base_url: str = API_BASE_URL):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+
+    def convert(self, voice_id: str, audio, fields: Dict[str, str], params: Dict[str, str],
+                connect_timeout: float = 5.0, read_timeout: Optional[float] = None,
+                on_headers: Optional[Callable[[Dict[str, str]], None]] = None) -> Iterator[bytes]:
+        boundary = uuid.uuid4().hex
+
+        def multipart() -> Iterator[bytes]:
+            for name, value in fields.items():
+                yield (
+                    f"--{boundary}\r\n"
+                    f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                    f"{value}\r\n"
+                ).encode()
+            yield (
+                f"--{boundary}\r\n"
+                'Content-Disposition: form-data; name="audio"; filename="audio.pcm"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n"
+            ).encode()
+            for chunk in audio:
+                yield chunk
+            yield f"\r\n--{boundary}--\r\n".encode()
+
+        response = self.session.post(
+            f"{self.base_url}/v1/speech-to-speech/{voice_id}",
+            params=params,
+            data=multipart(),
+            headers={
+                "xi-api-key": self.api_key,
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+            },
+            stream=True,
+            timeout=(connect_timeout, read_timeout),
+        )
+        try:
+            if response.status_code >= 400:
+                raise TransportError(response.status_code, response.text, dict(response.headers))
+            if on_headers:
+                on_headers(response.headers)
+            for chunk in response.iter_content(chunk_size=1024):
+                if chunk:
+                    yield chunk
+        finally:
+            response.close()
@@ -8,17 +8,55 @@ import numpy as np
 from elevenlabs import ElevenLabs
 from concurrent.futures import ThreadPoolExecutor
 from core.vad import VAD
+from core.denoise import NoiseSuppressor
+from core.segmenter import PhraseSegmenter, BYTES_PER_SECOND
+from core.arena import PCMArena, PCMReader
+from core.phrase import Phrase
+from core.scheduler import PhraseScheduler
+from core.effects import VoiceEffect
+from core.streaming_upload import LiveAudioBody, StreamingTransport
+from core.resilience import (
+    HedgedStream, StreamTimeout, LatencyTracker, CircuitBreaker, backoff_delay, RETRYABLE_STATUS
+)
+from core.ratelimit import limiter_for, RateLimited
+from core.metrics import REGISTRY
+from core.profiler import PROFILER
+
+VAD_CHUNKS = REGISTRY.counter("vc_vad_chunks_total", "Capture chunks classified by the VAD")
+VAD_SPEECH = REGISTRY.counter("vc_vad_speech_chunks_total", "Capture chunks the VAD classified as speech")
+PHRASES_QUEUED = REGISTRY.counter("vc_phrases_queued_total", "Phrases put on the processing queue")
+API_REQUESTS = REGISTRY.counter("vc_api_requests_total", "Speech-to-speech requests started (retries included)")
+API_ERRORS = REGISTRY.counter("vc_api_errors_total", "Speech-to-speech requests that failed")
+API_BYTES_UP = REGISTRY.counter("vc_api_bytes_sent_total", "PCM bytes uploaded to the API")
+API_BYTES_DOWN = REGISTRY.counter("vc_api_bytes_received_total", "PCM bytes received from the API")
+API_TTFB = REGISTRY.histogram("vc_api_ttfb_seconds", "Time from request start to first audio byte")
+API_DURATION = REGISTRY.histogram("vc_api_request_seconds", "Time from request start to the end of the response")
+VAD_PHRASES = REGISTRY.counter("vc_vad_phrases_total", "Phrases the segmenter ended on a pause")
+FALSE_SPLITS = REGISTRY.counter("vc_vad_false_splits_total", "Phrases ended on a pause the speaker then broke within a moment")
+SPEECH_TO_PLAYBACK = REGISTRY.histogram("vc_speech_to_playback_seconds",
+                                        "Time from the speaker stopping to the converted phrase becoming audible")
+REGISTRY.gauge("vc_vad_speech_ratio", "Fraction of capture chunks classified as speech",
+               fn=lambda: VAD_SPEECH.value / VAD_CHUNKS.value if VAD_CHUNKS.value else 0.0)
 
 class STSProcessor:
+    MAX_WORKERS = 8
+
     def __init__(self, api_key: str):
+        self.api_key = api_key
         self.client = ElevenLabs(api_key=api_key)
+        self._transport = None
         self.current_voice_id = None
         self.is_processing = False
         self._thread = None
         self._stop_event = threading.Event()
         
-        self._executor = ThreadPoolExecutor(max_workers=1)
-        self.processing_queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+        # Deadline-aware: drops phrases that can no longer play in time
+        self.processing_queue = PhraseScheduler()
+        # Concurrency and quota of this API key, shared with batch conversion
+        self.limiter = limiter_for(api_key)
+        self._api_concurrency = 2
+        self.limiter.configure(max_concurrency=self._api_concurrency)
         
         self.on_log = None
         self.on_vad_level = None
@@ -31,10 +69,54 @@ class STSProcessor:
         self._vad_threshold = 500
         self._vad_pause = 1.0
         self._max_duration = 30.0
+        # Phrase audio lives in pooled slots sized for the longest phrase
+        self.arena = PCMArena(self._slot_bytes(self._max_duration))
         self._latency = 4
         self._stability = 0.5
         self._similarity = 0.75
-        self._remove_background_noise = True
+        self._remove_background_noise = False
+
+        # Tail-latency protection
+        self.connect_timeout = 5.0      # Socket-level: connect and each read
+        self.first_byte_timeout = 4.0
+        self.chunk_gap_timeout = 2.0
+        self.hedge_enabled = True
+        self.hedge_percentile = 90
+        self.hedge_min_delay = 0.5
+        self.max_retries = 1
+        self.fallback_mode = "effect"  # "effect" | "passthrough" | "silence"
+        self.fallback_effect = VoiceEffect("Deep")
+        self._fallback_lock = threading.Lock()  # The effect keeps STFT state; workers take turns
+        self.ttfb_tracker = LatencyTracker()
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=15.0)
+        self.stats = {"hedges": 0, "hedge_wins": 0, "timeouts": 0, "retries": 0, "fallbacks": 0}
+
+        # Speculative end-of-phrase dispatch: once silence has lasted this share of
+        # vad_pause, at most this many times per phrase (short dips don't count)
+        self.speculative = False
+        self.speculative_after = 0.4
+        self.speculative_max_sends = 2
+        self.spec_stats = {"sent": 0, "committed": 0, "cancelled": 0, "wasted": 0, "latency_saved": 0.0}
+
+        # Upload phrases while they are still being spoken
+        self.streaming_upload = False
+
+        # Extra voices every phrase is also converted into (VoiceTargets)
+        self.fanout = []
+        self._line = 0
+
+        # Speech resuming this soon after a pause ended a phrase counts as a false split
+        self.false_split_window = 0.5
+        self._pause_ended_at = None
+
+        REGISTRY.gauge("vc_processing_queue_phrases", "Phrases waiting for the API worker",
+                       fn=lambda: self.processing_queue.qsize())
+        REGISTRY.gauge("vc_queue_oldest_age_seconds", "Age since capture of the oldest queued phrase",
+                       fn=lambda: self.processing_queue.oldest_age())
+
+        # Local noise suppression on the capture path (replaces the server flag)
+        self.noise_suppression = True
+        self.suppressor = NoiseSuppressor()
 
     @property
     def vad_threshold(self):
@@ -60,6 +142,13 @@ class STSProcessor:
     @max_duration.setter
     def max_duration(self, value):
         self._max_duration = float(value)
+        self.processing_queue.max_merge = self._max_duration
+        self.arena.slot_bytes = self._slot_bytes(self._max_duration)
+
+    @staticmethod
+    def _slot_bytes(max_duration: float) -> int:
+        # The segmenter forces a send just past max_duration; leave room for that chunk
+        return int(max_duration * BYTES_PER_SECOND) + 16384
 
     @property
     def latency(self):
@@ -85,6 +174,33 @@ class STSProcessor:
     def similarity(self, value):
         self._similarity = float(value)
 
+    @property
+    def freshness_budget(self):
+        """Seconds after capture by which a phrase must start playing (0 = never drop)."""
+        return self.processing_queue.budget
+
+    @freshness_budget.setter
+    def freshness_budget(self, value):
+        self.processing_queue.budget = max(0.0, float(value))
+
+    @property
+    def api_concurrency(self):
+        """Requests converted in parallel (bounded further by what the key allows)."""
+        return self._api_concurrency
+
+    @api_concurrency.setter
+    def api_concurrency(self, value):
+        self._api_concurrency = min(max(1, int(value)), self.MAX_WORKERS)
+        self.limiter.configure(max_concurrency=self._api_concurrency)
+
+    @property
+    def requests_per_minute(self):
+        return self.limiter.requests_per_minute
+
+    @requests_per_minute.setter
+    def requests_per_minute(self, value):
+        self.limiter.configure(requests_per_minute=value)
+
     @property
     def remove_background_noise(self):
         return self._remove_background_noise
@@ -96,6 +212,10 @@ class STSProcessor:
     def set_voice(self, voice_id: str):
         self.current_voice_id = voice_id
 
+    def set_fanout(self, targets):
+        """Voices to convert every phrase into besides the main one (takes effect on start)."""
+        self.fanout = list(targets)
+
     def get_voices(self):
         """Fetch available voices from API."""
         try:
@@ -113,12 +233,29 @@ class STSProcessor:
 
         self.is_processing = True
         self._stop_event.clear()
+        self._pause_ended_at = None
+        audio_manager.set_prebuffer(5)
+        self.suppressor.reset()
+        self.processing_queue.on_log = self.on_log
+        self.processing_queue.delay_fn = lambda target: self._expected_delay(audio_manager, target)
+        # The phrase being taken needs one slot; coalesce if none is left for the next
+        self.processing_queue.slots_fn = lambda: self.limiter.available() - 1
         
         self._thread = threading.Thread(target=self._process_loop, args=(audio_manager,))
         self._thread.daemon = True
         self._thread.start()
         
-        self._executor.submit(self._worker_loop, audio_manager)
+        for target in self.fanout:
+            target.sink.start()
+        if self.fanout and self.on_log:
+            names = ", ".join(t.name for t in self.fanout)
+            self.on_log(f"[FANOUT] Also converting into {names}")
+            if self.api_concurrency <= len(self.fanout):
+                self.on_log(f"[FANOUT] {self.api_concurrency} parallel requests for "
+                            f"{len(self.fanout) + 1} voices - expect a growing delay")
+
+        for _ in range(self.api_concurrency):
+            self._executor.submit(self._worker_loop, audio_manager)
         print("STS Processing & Worker threads started.")
 
     def stop_processing(self):
@@ -126,6 +263,21 @@ class STSProcessor:
         self._stop_event.set()
         if self._thread:
             self._thread.join(timeout=1.0)
+        for target in self.fanout:
+            target.sink.stop()
+        if self.speculative and self.on_log:
+            self.on_log(self.speculative_summary())
+        if self.on_log:
+            self.on_log(self.processing_queue.summary())
+            self.on_log(self.limiter.summary())
+
+    def speculative_summary(self) -> str:
+        st = self.spec_stats
+        avg = st["latency_saved"] / st["committed"] if st["committed"] else 0.0
+        return (
+            f"[SPEC] {st['sent']} sent, {st['committed']} committed (avg {avg:.2f}s saved), "
+            f"{st['cancelled']} cancelled, {st['wasted']} wasted requests"
+        )
     
     def _process_loop(self, audio_manager):
         """
@@ -137,82 +289,185 @@ class STSProcessor:
         """
         print("Starting Smart Audio Capture Loop...")
         
-        buffer = bytearray()
-        is_speaking = False
-        silence_start_time = None
-        
-        # Config
-        MIN_DURATION = 0.5     # Min phrase length (ignore clicks)
+        segmenter = PhraseSegmenter(self.vad_pause, self.max_duration, arena=self.arena)
+        speculative = None
+        live = None
+        spec_sends = 0
+        is_speech_frame = False
         
         while self.is_processing and not self._stop_event.is_set():
-            chunk = audio_manager.get_input_chunk(timeout=0.1)
-            if not chunk:
+            frame = self._next_frame(audio_manager, is_speech_frame)
+            if frame is None:
                 continue
+            iteration = PROFILER.clock()
+            chunk, is_speech_frame, rms = frame
 
             # 1. Visualization
             if self.on_audio_data:
+                started = PROFILER.clock()
                 pts = VAD.process_for_visualization(chunk)
                 if pts: self.on_audio_data(pts)
+                PROFILER.record("visualize", started)
             
-            # 2. VAD Check
-            is_speech_frame, rms = self.vad.is_speech(chunk)
+            VAD_CHUNKS.inc()
+            if is_speech_frame: VAD_SPEECH.inc()
             
             if self.on_vad_level:
                 self.on_vad_level(min(rms / 2000.0, 1.0))
 
-            current_time = time.time()
-
             # --- State Machine ---
-            if is_speech_frame:
-                if not is_speaking:
+            segmenter.vad_pause = self.vad_pause
+            segmenter.max_duration = self.max_duration
+            for event in segmenter.feed(chunk, is_speech_frame, time.time()):
+                kind = event[0]
+                if kind == "speech_start":
+                    spec_sends = 0
+                    if self._pause_ended_at and time.time() - self._pause_ended_at < self.false_split_window:
+                        FALSE_SPLITS.inc()
                     if self.on_log: self.on_log(f"[VAD] Speech started (RMS: {int(rms)})")
-                    is_speaking = True
-                
-                silence_start_time = None # Reset silence timer
-                buffer.extend(chunk)
-            
-            else:
-                # Silence frame
-                if is_speaking:
-                    buffer.extend(chunk) # Keep trailing silence for natural fade
-                    
-                    if silence_start_time is None:
-                        silence_start_time = current_time
-                    
-                    # Check if silence exceeded threshold
-                    if (current_time - silence_start_time) > self.vad_pause:
-                        # End of Phrase
-                        duration = len(buffer) / 32000.0 # 16000Hz * 2 bytes
-                        
-                        if duration >= MIN_DURATION:
-                            if self.on_log: self.on_log(f"[VAD] Phrase complete ({duration:.1f}s) - Sending...")
-                            self.processing_queue.put(bytes(buffer))
-                        else:
-                            if self.on_log: self.on_log(f"[VAD] IPvbr ignored (too short: {duration:.1f}s)")
-                        
-                        # Reset
-                        buffer.clear()
-                        is_speaking = False
-                        silence_start_time = None
-                else:
-                    # Idle silence - do nothing (Gate Closed)
-                    pass
+                    if self.streaming_upload:
+                        # Queue now; the upload follows the capture
+                        live = Phrase(body=LiveAudioBody(), captured_at=segmenter.phrase_started_at)
+                        self.processing_queue.put(live)
+                        PHRASES_QUEUED.inc()
+                elif kind == "speech_resume":
+                    if speculative:
+                        speculative.cancel()
+                        self.spec_stats["cancelled"] += 1
+                        speculative = None
+                elif kind == "phrase":
+                    _, pcm, duration, forced = event
+                    self._line += 1
+                    if not forced:
+                        VAD_PHRASES.inc()
+                        self._pause_ended_at = time.time()
+                    fan = self._fan_out(pcm, segmenter.phrase_started_at)
+                    if speculative and speculative.cancelled:
+                        # The scheduler dropped it before it could play: send this phrase normally
+                        if self.on_log: self.on_log("[SPEC] Speculative phrase was dropped - sending normally")
+                        speculative = None
+                    if live or speculative:
+                        # Already on its way; this copy of the audio isn't needed
+                        self._enqueue(fan)
+                        pcm.release()
+                    if live:
+                        # End-of-speech: close the body so the server can finish
+                        live.body.feed(chunk)
+                        live.body.close()
+                        live.ended_at = time.time()
+                        live.speech_ended_at = segmenter.speech_ended_at
+                        live = None
+                        if self.on_log: self.on_log(f"[VAD] Phrase complete ({duration:.1f}s) - upload closed")
+                        continue
+                    if speculative:
+                        speculative.speech_ended_at = segmenter.speech_ended_at
+                        speculative.commit(audio_manager.write_output_chunk)
+                        saved = time.time() - speculative.created_at
+                        self.spec_stats["committed"] += 1
+                        self.spec_stats["latency_saved"] += saved
+                        if self.on_log: self.on_log(f"[VAD] Phrase complete ({duration:.1f}s) - sent {saved:.2f}s early")
+                        speculative = None
+                        continue
+                    if forced:
+                        if self.on_log: self.on_log("[VAD] Max duration reached - Forcing send.")
+                    else:
+                        if self.on_log: self.on_log(f"[VAD] Phrase complete ({duration:.1f}s) - Sending...")
+                    phrase = Phrase(buffer=pcm, captured_at=segmenter.phrase_started_at, line=self._line)
+                    phrase.speech_ended_at = segmenter.speech_ended_at
+                    self.processing_queue.put(phrase)
+                    PHRASES_QUEUED.inc()
+                    self._enqueue(fan)
+                elif kind == "discard":
+                    if live:
+                        live.cancel()
+                        live.body.abort()
+                        live = None
+                    if self.on_log: self.on_log(f"[VAD] Phrase ignored (too short: {event[1]:.1f}s)")
+
+            # Silence has held long enough to be worth betting on: dispatch now,
+            # the rest of the pause decides whether it stands
+            silence_start = segmenter.silence_start_time
+            if (self.speculative and not live and not speculative and silence_start is not None
+                    and spec_sends < self.speculative_max_sends
+                    and time.time() - silence_start >= self.speculative_after * self.vad_pause
+                    and len(segmenter.buffer) >= segmenter.MIN_DURATION * 32000):
+                speculative = Phrase(buffer=segmenter.buffer.retain(), speculative=True,
+                                     captured_at=segmenter.phrase_started_at)
+                spec_sends += 1
+                self.spec_stats["sent"] += 1
+                self.processing_queue.put(speculative)
+                PHRASES_QUEUED.inc()
 
-            # Safety: Force send if buffer gets too big
-            if len(buffer) > (self.max_duration * 32000):
-                 if self.on_log: self.on_log("[VAD] Max duration reached - Forcing send.")
-                 self.processing_queue.put(bytes(buffer))
-                 buffer.clear()
-                 is_speaking = False
-                 silence_start_time = None 
+            if live:
+                live.body.feed(chunk)
+            PROFILER.record("capture_loop", iteration)
+
+        if live:
+            # Stopped mid-phrase: don't leave the upload hanging
+            live.cancel()
+            live.body.abort()
+        segmenter.buffer.release()
+
+    @staticmethod
+    def _voice_tag(phrase: Phrase) -> str:
+        return f" [{phrase.target.name}]" if phrase.target else ""
+
+    def _fan_out(self, pcm, captured_at: float):
+        """The phrase for every extra voice. They all read the same slot."""
+        phrases = []
+        for target in self.fanout:
+            phrase = Phrase(buffer=pcm.retain(), captured_at=captured_at, target=target, line=self._line)
+            if target.sink.per_phrase:
+                phrase.on_played = target.sink.end_phrase
+            phrases.append(phrase)
+        return phrases
+
+    def _enqueue(self, phrases):
+        # After the main voice's phrase, which plays live
+        for phrase in phrases:
+            self.processing_queue.put(phrase)
+            PHRASES_QUEUED.inc()
+
+    def _next_frame(self, audio_manager, last_speech: bool):
+        """Next captured chunk, denoised and VAD-checked: (pcm, is_speech, rms) or None."""
+        if getattr(audio_manager, "analyses_input", False):
+            # The audio core process denoises and runs the VAD for us
+            audio_manager.configure_input(self.noise_suppression, self.vad_threshold)
+            frame = audio_manager.get_input_frame(timeout=0.1)
+            if not frame:
+                return None
+            chunk, is_speech, rms, analysed = frame
+            if analysed:
+                return chunk, is_speech, rms
+        else:
+            chunk = audio_manager.get_input_chunk(timeout=0.1)
+            if not chunk:
+                return None
+
+        # 0. Denoise before anything is judged or buffered
+        if self.noise_suppression:
+            started = PROFILER.clock()
+            chunk = self.suppressor.process(chunk, speech=last_speech)
+            PROFILER.record("denoise", started)
+        # 2. VAD Check
+        started = PROFILER.clock()
+        is_speech, rms = self.vad.is_speech(chunk)
+        PROFILER.record("vad", started)
+        return chunk, is_speech, rms
 
     def _worker_loop(self, audio_manager):
         while self.is_processing or not self.processing_queue.empty():
             try:
-                audio_data = self.processing_queue.get(timeout=1.0)
-                if not self.is_processing: break
-                
-                self._process_single_chunk(audio_data, audio_manager)
+                phrase = self.processing_queue.get(timeout=1.0)
+                try:
+                    if not self.is_processing: break
+                    if phrase.cancelled: continue
+
+                    self._process_single_chunk(phrase, audio_manager)
+                finally:
+                    # Lets the next phrase in line play
+                    phrase.finish()
+                    phrase.release()
                 
             except queue.Empty:
                 continue
@@ -230,41 +485,229 @@ class STSProcessor:
         wav_io.seek(0)
         return wav_io
 
-    def _process_single_chunk(self, audio_data: bytes, audio_manager):
-        if not self.current_voice_id:
-            if self.on_log: self.on_log("[ERROR] No voice selected!")
-            return
-
+    def _limited(self, start, wait: float = None):
+        """Run a request under the key's limiter, feeding its headers and errors back."""
+        if not self.limiter.acquire(timeout=wait):
+            raise RateLimited("no request slot free")
+        ok = False
         try:
-            # wav_file not needed for raw PCM
-            
-            if self.on_log:
-                self.on_log(f"[API] Sending {len(audio_data)} bytes...")
-
-            response_stream = self.client.speech_to_speech.convert(
-                voice_id=self.current_voice_id,
-                audio=audio_data, # Send raw bytes directly
-                output_format="pcm_16000",
-                optimize_streaming_latency=self.latency,
-                model_id="eleven_multilingual_sts_v2",
-                file_format = "pcm_s16le_16", # Raw PCM input for lowest latency
-                remove_background_noise=self.remove_background_noise,
-                voice_settings=json.dumps({
+            yield from start()
+            ok = True
+        except Exception as e:
+            self.limiter.observe_error(e)
+            raise
+        finally:
+            self.limiter.release(ok)
+
+    def convert_stream(self, audio_data: bytes, voice_id: str = None, wait: float = None):
+        """
+        Start a speech-to-speech conversion and return the PCM response
+        iterator. The request waits up to `wait` seconds (None = as long as
+        it takes) for a slot under the key's limits.
+        """
+        def start():
+            API_BYTES_UP.inc(len(audio_data))
+            with self._raw_convert(audio_data, voice_id) as response:
+                self.limiter.observe_headers(response.headers)
+                yield from response.data
+        return self._limited(start, wait)
+
+    def _raw_convert(self, audio_data, voice_id: str = None):
+        return self.client.speech_to_speech.with_raw_response.convert(
+            voice_id=voice_id or self.current_voice_id,
+            # Raw bytes directly; arena phrases are read in place from their slot
+            audio=audio_data if isinstance(audio_data, bytes) else PCMReader(audio_data),
+            output_format="pcm_16000",
+            optimize_streaming_latency=self.latency,
+            model_id="eleven_multilingual_sts_v2",
+            file_format = "pcm_s16le_16", # Raw PCM input for lowest latency
+            remove_background_noise=self.remove_background_noise,
+            voice_settings=json.dumps({
+                "stability": self.stability,
+                "similarity_boost": self.similarity
+            }),
+            request_options={"timeout_in_seconds": self.connect_timeout}
+        )
+
+    def convert_live(self, body: LiveAudioBody, voice_id: str = None, wait: float = None):
+        """Like convert_stream, but uploads the body while it is being captured."""
+        if self._transport is None:
+            self._transport = StreamingTransport(self.api_key)
+        return self._limited(lambda: self._transport.convert(
+            voice_id or self.current_voice_id,
+            self._count_upload(body),
+            fields={
+                "model_id": "eleven_multilingual_sts_v2",
+                "file_format": "pcm_s16le_16",
+                "remove_background_noise": str(self.remove_background_noise).lower(),
+                "voice_settings": json.dumps({
                     "stability": self.stability,
                     "similarity_boost": self.similarity
-                })
-            )
-            
+                }),
+            },
+            params={
+                "output_format": "pcm_16000",
+                "optimize_streaming_latency": self.latency,
+            },
+            # Same per-read limit as the SDK path: a stalled reply must give its slot back
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.connect_timeout,
+            on_headers=self.limiter.observe_headers,
+        ), wait)
+
+    @staticmethod
+    def _count_upload(body):
+        for chunk in body:
+            API_BYTES_UP.inc(len(chunk))
+            yield chunk
+
+    def _expected_delay(self, audio_manager, target=None) -> float:
+        """How long until newly converted audio would start playing on the target's output."""
+        if len(self.ttfb_tracker) >= 3:
+            ttfb = self.ttfb_tracker.percentile(50)
+        else:
+            ttfb = self.first_byte_timeout / 2.0
+        backlog = target.sink.backlog() if target is not None else audio_manager.playback_backlog()
+        return ttfb + backlog
+
+    def _hedge_delay(self):
+        """Hedge once time-to-first-byte passes the configured percentile."""
+        if not self.hedge_enabled:
+            return None
+        if len(self.ttfb_tracker) < 10:
+            return self.first_byte_timeout / 2.0
+        delay = self.ttfb_tracker.percentile(self.hedge_percentile)
+        return min(max(delay, self.hedge_min_delay), self.first_byte_timeout)
+
+    def _process_single_chunk(self, phrase: Phrase, audio_manager):
+        if not (phrase.voice_id or self.current_voice_id):
+            if self.on_log: self.on_log("[ERROR] No voice selected!")
+            return
+
+        if phrase.target:
+            write = phrase.target.sink.write
+        else:
+            write = audio_manager.write_output_chunk
+            phrase.on_first_audio = lambda p: self._observe_latency(p, audio_manager)
+        if not self.breaker.allow():
+            self._fallback(phrase, write, "circuit open")
+            return
+
+        for attempt in range(self.max_retries + 1):
+            waiting = PROFILER.clock()
+            if not self._await_slot(phrase):
+                return
+            PROFILER.record("api_wait_slot", waiting)
+            phrase.sent = True
             total_received = 0
-            for stream_chunk in response_stream:
-                if stream_chunk:
+            started = time.time()
+            API_REQUESTS.inc()
+            try:
+                if phrase.body is not None and attempt == 0:
+                    # A live body can only be read once, so it is never hedged
+                    if self.on_log: self.on_log("[API] Streaming upload started...")
+                    stream = HedgedStream(
+                        lambda: self.convert_live(phrase.body, wait=self.first_byte_timeout),
+                        first_byte_timeout=self.first_byte_timeout,
+                        chunk_gap_timeout=self.chunk_gap_timeout,
+                        ready=phrase.body.closed
+                    )
+                else:
+                    if phrase.body is not None:
+                        # Retries of live phrases resend the captured audio
+                        phrase.body.closed.wait()
+                    audio_data = phrase.audio
+                    if self.on_log:
+                        self.on_log(f"[API] Sending {len(audio_data)} bytes{self._voice_tag(phrase)}...")
+                    stream = HedgedStream(
+                        # Whichever reader calls second is the hedge; it only goes if a slot is free
+                        self._hedgeable(lambda wait: self.convert_stream(audio_data, phrase.voice_id, wait=wait)),
+                        first_byte_timeout=self.first_byte_timeout,
+                        chunk_gap_timeout=self.chunk_gap_timeout,
+                        hedge_after=self._hedge_delay()
+                    )
+                for stream_chunk in stream:
                     total_received += len(stream_chunk)
-                    audio_manager.write_output_chunk(stream_chunk)
-            
-            if self.on_log:
-                self.on_log(f"[SUCCESS] Received {total_received} bytes")
+                    API_BYTES_DOWN.inc(len(stream_chunk))
+                    delivered = PROFILER.clock()
+                    if not phrase.deliver(stream_chunk, write):
+                        break
+                    PROFILER.record("api_deliver", delivered)
 
-        except Exception as e:
-            msg = f"[API ERROR] {e}"
-            print(msg)
-            if self.on_log: self.on_log(msg)
+                self.ttfb_tracker.add(stream.ttfb or 0.0)
+                API_TTFB.observe(stream.ttfb or 0.0)
+                API_DURATION.observe(time.time() - started)
+                if stream.hedged:
+                    self.stats["hedges"] += 1
+                    if stream.winner == 1: self.stats["hedge_wins"] += 1
+                self.breaker.record_success()
+
+                if phrase.cancelled:
+                    self.spec_stats["wasted"] += 1
+                    if self.on_log: self.on_log("[API] Speculative phrase discarded (speech resumed)")
+                elif self.on_log:
+                    self.on_log(f"[SUCCESS] Received {total_received} bytes{self._voice_tag(phrase)}")
+                return
+
+            except Exception as e:
+                API_ERRORS.inc()
+                msg = f"[API ERROR] {e}"
+                print(msg)
+                if self.on_log: self.on_log(msg)
+
+                if isinstance(e, StreamTimeout):
+                    self.stats["timeouts"] += 1
+                if total_received:
+                    # Part of the phrase already played; a retry would repeat it
+                    self.breaker.record_failure()
+                    return
+                status = getattr(e, "status_code", None)
+                if status is not None and status not in RETRYABLE_STATUS:
+                    break
+                if attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    time.sleep(backoff_delay(attempt))
+
+        self.breaker.record_failure()
+        self._fallback(phrase, write, "backend failed")
+
+    @staticmethod
+    def _observe_latency(phrase: Phrase, audio_manager):
+        if phrase.speech_ended_at is not None:
+            # Audible once what is already waiting to play has played
+            audible = time.time() + audio_manager.playback_backlog()
+            SPEECH_TO_PLAYBACK.observe(audible - phrase.speech_ended_at)
+
+    def _await_slot(self, phrase: Phrase) -> bool:
+        """Hold the request back while the key is at its limits. False if it's no longer wanted."""
+        waited = False
+        while not self.limiter.wait_available(0.25):
+            if phrase.cancelled or not self.is_processing:
+                return False
+            if not waited and self.on_log:
+                self.on_log("[LIMIT] Request slots busy - throttling")
+            waited = True
+        return not phrase.cancelled
+
+    def _hedgeable(self, convert):
+        """Factory for HedgedStream: the first request may wait for a slot, a hedge may not."""
+        calls = []
+
+        def factory():
+            calls.append(None)
+            return convert(self.first_byte_timeout if len(calls) == 1 else 0)
+        return factory
+
+    def _fallback(self, phrase: Phrase, write, reason: str):
+        """Keep the output alive while the backend is degraded."""
+        if phrase.cancelled:
+            return
+        self.stats["fallbacks"] += 1
+        if self.on_log: self.on_log(f"[FALLBACK] {reason} - {self.fallback_mode}")
+        if self.fallback_mode == "effect":
+            with self._fallback_lock:
+                audio = self.fallback_effect.process_phrase(phrase.audio)
+            phrase.deliver(audio, write)
+        elif self.fallback_mode == "passthrough":
+            # Copy: the phrase's slot is reused once it is released
+            phrase.deliver(bytes(phrase.audio), write)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+VOICE_CACHE_FILE = Path("voice_cache.json")
+
+
+class CachedVoice:
+    """The parts of an API voice the app uses; restorable from disk."""
+    __slots__ = ("voice_id", "name", "category")
+
+    def __init__(self, voice_id: str, name: str, category: str = None):
+        self.voice_id = voice_id
+        self.name = name
+        self.category = category
+
+    def to_dict(self) -> dict:
+        return {"voice_id": self.voice_id, "name": self.name, "category": self.category}
+
+
+class VoiceCatalog:
+    """
+    Voice list cached on disk per API key (stored under a hash of the key,
+    never the key itself), so the dropdown fills instantly at startup.
+    The cache is revalidated in the background once older than `ttl`
+    seconds; listeners are only notified when the list actually changed.
+    """
+    def __init__(self, api_key: str, fetch: Callable[[], list],
+                 ttl: float = 6 * 3600, cache_file: Path = VOICE_CACHE_FILE):
+        self.key = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        self.fetch = fetch
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self.on_log = None
+
+        self.voices: List[CachedVoice] = []
+        self.by_id: Dict[str, CachedVoice] = {}
+        self.by_name: Dict[str, CachedVoice] = {}
+        self.fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() - self.fetched_at > self.ttl
+
+    def load(self) -> bool:
+        """Restore the cached list for this key. Returns True if there was one."""
+        entry = self._read_cache().get(self.key)
+        if not entry:
+            return False
+        try:
+            voices = [CachedVoice(v["voice_id"], v["name"], v.get("category")) for v in entry["voices"]]
+        except (KeyError, TypeError):
+            return False
+        self._set(voices, entry.get("fetched_at", 0.0))
+        return bool(voices)
+
+    def get(self, voice_id: str) -> Optional[CachedVoice]:
+        return self.by_id.get(voice_id)
+
+    def find(self, name: str) -> Optional[CachedVoice]:
+        return self.by_name.get(name)
+
+    def revalidate_async(self, on_update: Callable[["VoiceCatalog"], None], force: bool = False):
+        """Refresh from the API in the background if stale (or forced)."""
+        if not force and not self.is_stale:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._revalidate, args=(on_update,), daemon=True).start()
+
+    def _revalidate(self, on_update):
+        try:
+            fetched = self.fetch()
+            if not fetched:
+                # An error or an empty account: keep serving the cache
+                return
+            voices = [CachedVoice(v.voice_id, v.name, getattr(v, "category", None)) for v in fetched]
+            changed = self._fingerprint(voices) != self._fingerprint(self.voices)
+            self._set(voices, time.time())
+            self._save()
+            if changed:
+                if self.on_log: self.on_log(f"[VOICES] Catalog updated ({len(voices)} voices)")
+                on_update(self)
+        except Exception as e:
+            print(f"Error refreshing voices: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _set(self, voices: List[CachedVoice], fetched_at: float):
+        # Swap whole objects so readers on the UI thread never see a half-built index
+        self.by_id = {v.voice_id: v for v in voices}
+        self.by_name = {v.name: v for v in voices}
+        self.voices = voices
+        self.fetched_at = fetched_at
+
+    @staticmethod
+    def _fingerprint(voices: List[CachedVoice]):
+        return tuple((v.voice_id, v.name) for v in voices)
+
+    def _read_cache(self) -> dict:
+        if not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error reading voice cache: {e}")
+            return {}
+
+    def _save(self):
+        data = self._read_cache()
+        data[self.key] = {"fetched_at": self.fetched_at, "voices": [v.to_dict() for v in self.voices]}
+        tmp = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        try:
+            with open(tmp, "w") as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp, self.cache_file)
+        except Exception as e:
+            print(f"Error saving voice cache: {e}")
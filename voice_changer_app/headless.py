@@ -0,0 +1,131 @@
+import argparse
+import sys
+import time
+from utils.settings import Settings
+from core.audio_manager import AudioManager
+from core.audio_backends import BACKENDS, FileBackend, create_backend
+from core.effects import LocalEffectsProcessor, PRESETS
+from core.fanout import build_targets
+from core.profiler import PROFILER, SamplingProfiler
+
+def wait_for_output(processor, audio, vad_pause: float):
+    """After the input ran out: let the last phrase convert and play."""
+    time.sleep(vad_pause + 1.0)  # The segmenter closes the last phrase
+    queue = getattr(processor, "processing_queue", None)
+    while queue is not None and not queue.empty():
+        time.sleep(0.2)
+    idle = 0
+    while idle < 20:  # Nothing buffered for 2 s: the last response has played
+        idle = idle + 1 if audio.playback_backlog() == 0 else 0
+        time.sleep(0.1)
+
+def parse_fanout(spec: str) -> dict:
+    if "@" in spec:
+        voice, device = spec.split("@", 1)
+        return {"voice_id": voice, "output_device": int(device)}
+    voice, _, directory = spec.partition("=")
+    return {"voice_id": voice, "directory": directory or "fanout"}
+
+def parse_output(spec: str) -> dict:
+    device, _, gain = spec.partition(":")
+    return {"device": int(device), "gain": float(gain or 1.0), "name": f"Out:{device}"}
+
+def main():
+    settings = Settings()
+
+    parser = argparse.ArgumentParser(description="Run the live pipeline without the UI (e.g. file in, file out).")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="file")
+    parser.add_argument("--input", help="Input WAV/PCM file (file backend)")
+    parser.add_argument("--output", help="Output WAV file (file backend)")
+    parser.add_argument("--loop", action="store_true", help="Loop the input file")
+    parser.add_argument("--input-device", type=int, help="Input device index (default: first input)")
+    parser.add_argument("--output-device", type=int, help="Output device index (default: first output)")
+    parser.add_argument("--seconds", type=float, help="Stop after this long (default: end of the input file)")
+    parser.add_argument("--engine", choices=("api", "local"), default=settings.engine)
+    parser.add_argument("--effect", choices=list(PRESETS), default=settings.effect_preset)
+    parser.add_argument("--voice", default=settings.voice_id, help="Target voice_id (api engine)")
+    parser.add_argument("--fanout", action="append", default=[], metavar="VOICE=DIR|VOICE@DEVICE",
+                        help="Also convert into this voice, saved per phrase to DIR or played on DEVICE (repeatable)")
+    parser.add_argument("--also-output", action="append", default=[], metavar="DEVICE[:GAIN]",
+                        help="Also play the converted audio on this output device (repeatable)")
+    parser.add_argument("--gain", type=float, default=settings.output_gain, help="Gain of the main output")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Time the pipeline stages and sample stacks into FILE (folded, for flamegraphs)")
+    args = parser.parse_args()
+
+    if args.backend == "file":
+        backend = FileBackend(args.input, args.output, loop=args.loop)
+    else:
+        backend = create_backend(args.backend)
+    if args.seconds is None and not (args.backend == "file" and args.input and not args.loop):
+        print("Error: --seconds is required unless a file is played once")
+        return 1
+    if args.backend == "file" and args.also_output:
+        # Its only output is --output; a second writer would clobber the same file
+        print("Error: --also-output needs a device backend, the file backend has a single output")
+        return 1
+
+    devices = backend.get_devices()
+    inputs = [d["index"] for d in devices if d["type"] == "input"]
+    outputs = [d["index"] for d in devices if d["type"] == "output"]
+    in_idx = args.input_device if args.input_device is not None else (inputs[0] if inputs else None)
+    out_idx = args.output_device if args.output_device is not None else (outputs[0] if outputs else None)
+    if in_idx is None or out_idx is None:
+        print("Error: backend has no input or output device (file backend needs --input and --output)")
+        return 1
+
+    if args.engine == "local":
+        processor = LocalEffectsProcessor(args.effect)
+    else:
+        from core.sts_processor import STSProcessor
+        if not settings.api_key or not args.voice:
+            print("Error: the api engine needs an API key and a voice (--voice)")
+            return 1
+        processor = STSProcessor(settings.api_key)
+        processor.set_voice(args.voice)
+        processor.vad_pause = settings.vad_pause
+        processor.max_duration = settings.max_duration
+        processor.latency = settings.latency
+        processor.stability = settings.stability
+        processor.similarity = settings.similarity
+        processor.remove_background_noise = settings.remove_background_noise
+        processor.noise_suppression = settings.local_noise_suppression
+        processor.freshness_budget = settings.freshness_budget
+        processor.api_concurrency = max(settings.api_concurrency, len(args.fanout) + 1)
+        processor.set_fanout(build_targets([parse_fanout(spec) for spec in args.fanout], args.backend))
+    processor.on_log = print
+
+    audio = AudioManager(max_buffer_size=settings.playback_buffer_size, backend=backend)
+    audio.set_max_latency(settings.max_playback_latency)
+    audio.set_output_gain(args.gain)
+    audio.set_extra_outputs([parse_output(spec) for spec in args.also_output])
+    sampler = None
+    if args.profile:
+        PROFILER.enabled = True
+        sampler = SamplingProfiler()
+        sampler.start()
+    started = time.time()
+    try:
+        audio.start_streams(in_idx, out_idx)
+        processor.start_processing(audio)
+        while args.seconds is None or time.time() - started < args.seconds:
+            if args.seconds is None and backend.finished.is_set():
+                wait_for_output(processor, audio, settings.vad_pause)
+                break
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        print("\nInterrupted.")
+    finally:
+        processor.stop_processing()
+        for target in getattr(processor, "fanout", []):
+            target.sink.close()
+        audio.terminate()
+        if sampler:
+            sampler.stop()
+            sampler.save(args.profile)
+            print(f"Stack samples saved to {args.profile}")
+            print("\n".join(PROFILER.summary()))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import wave
+import numpy as np
+from core.batch_converter import BatchConverter
+
+
+class FakeProcessor:
+    """Echoes each segment back; fails segments longer than `fail_above` bytes."""
+    def __init__(self):
+        self.vad_threshold = 500
+        self.vad_pause = 1.0
+        self.max_duration = 30.0
+        self.current_voice_id = "voice"
+        self.latency = 3
+        self.stability = 0.5
+        self.similarity = 0.75
+        self.noise_suppression = False
+        self.remove_background_noise = False
+        self.api_concurrency = 2
+        self.fail_above = None
+        self.converted = []
+
+    def convert_stream(self, pcm):
+        if self.fail_above is not None and len(pcm) > self.fail_above:
+            raise RuntimeError("backend down")
+        self.converted.append(len(pcm))
+        yield bytes(pcm)
+
+
+def _write_input(path):
+    """Two phrases (1.5s and 3s of tone) with a 2s pause between them."""
+    t = np.arange(16000 * 3) / 16000.0
+    tone = (np.sin(2 * np.pi * 200 * t) * 8000).astype(np.int16)
+    audio = np.concatenate([tone[:24000], np.zeros(32000, np.int16), tone])
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(audio.tobytes())
+
+
+def _interrupted_run(tmp_path):
+    """A first run where the longer phrase fails, leaving one converted part behind."""
+    _write_input(tmp_path / "take.wav")
+    processor = FakeProcessor()
+    processor.fail_above = 90000  # The second phrase, with its trailing pause
+    converter = BatchConverter(processor, max_retries=0)
+    assert not converter.run([str(tmp_path / "take.wav")], str(tmp_path / "out"))
+    assert converter.segments_done == 1 and converter.segments_failed == 1
+    assert (tmp_path / "out" / "take.wav.parts" / "seg_00000.pcm").exists()
+    assert not (tmp_path / "out" / "take.wav").exists()
+    processor.fail_above = None
+    processor.converted = []
+    return processor
+
+
+def test_resume_keeps_parts_with_unchanged_manifest(tmp_path):
+    processor = _interrupted_run(tmp_path)
+
+    converter = BatchConverter(processor)
+    assert converter.run([str(tmp_path / "take.wav")], str(tmp_path / "out"))
+    assert converter.segments_skipped == 1
+    assert len(processor.converted) == 1  # Only the part that failed
+    assert (tmp_path / "out" / "take.wav").exists()
+    assert not (tmp_path / "out" / "take.wav.parts").exists()
+
+
+def test_resume_discards_parts_when_settings_changed(tmp_path):
+    processor = _interrupted_run(tmp_path)
+    processor.current_voice_id = "other-voice"
+
+    converter = BatchConverter(processor)
+    assert converter.run([str(tmp_path / "take.wav")], str(tmp_path / "out"))
+    assert converter.segments_skipped == 0
+    assert len(processor.converted) == 2
@@ -0,0 +1,29 @@
+import wave
+from core.fanout import WavFileSink
+from core.phrase import Phrase
+
+
+def _frames(path):
+    with wave.open(str(path), "rb") as wav_file:
+        return wav_file.readframes(wav_file.getnframes())
+
+
+def test_next_phrase_waits_for_on_played(tmp_path):
+    sink = WavFileSink(str(tmp_path), "alt")
+    sink.start()
+    first, second = Phrase(b"\x01\x00" * 800, line=1), Phrase(b"\x02\x00" * 800, line=2)
+    second.follow(first)
+
+    def on_played(phrase):
+        # A parallel worker delivering the next line while this one is being saved
+        second.deliver(bytes(second.audio), sink.write)
+        second.finish()
+        sink.end_phrase(phrase)
+
+    first.on_played = on_played
+    second.on_played = sink.end_phrase
+    first.deliver(bytes(first.audio), sink.write)
+    first.finish()
+
+    assert _frames(tmp_path / "0001_alt.wav") == first.audio
+    assert _frames(tmp_path / "0002_alt.wav") == second.audio
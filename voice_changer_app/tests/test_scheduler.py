@@ -0,0 +1,55 @@
+import time
+from core.fanout import DeviceSink, VoiceTarget, WavFileSink
+from core.scheduler import PhraseScheduler
+from core.sts_processor import STSProcessor
+
+
+def _queue_fan_out(processor, scheduler, lines):
+    """Queue one short fan-out phrase per capture line, as the capture loop does."""
+    for line in lines:
+        processor._line = line
+        pcm = processor.arena.acquire()
+        pcm.extend(bytes(16000))  # 0.5s: short enough to always be coalesced
+        for phrase in processor._fan_out(pcm, time.time()):
+            scheduler.put(phrase)
+        pcm.release()
+
+
+def _play_all(scheduler):
+    served = []
+    while not scheduler.empty():
+        phrase = scheduler.get(timeout=0)
+        phrase.deliver(bytes(phrase.audio), phrase.target.sink.write)
+        phrase.finish()
+        phrase.release()
+        served.append(phrase)
+    return served
+
+
+def test_wav_fan_out_writes_one_file_per_line(tmp_path):
+    sink = WavFileSink(str(tmp_path), "alt")
+    sink.start()
+    processor = STSProcessor("test-key")
+    processor.fanout = [VoiceTarget("alt-voice", sink, "alt")]
+    scheduler = PhraseScheduler(budget=0)
+
+    _queue_fan_out(processor, scheduler, [1, 2, 3])
+    served = _play_all(scheduler)
+
+    assert len(served) == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["0001_alt.wav", "0002_alt.wav", "0003_alt.wav"]
+
+
+def test_device_fan_out_is_still_coalesced():
+    processor = STSProcessor("test-key")
+    sink = DeviceSink(None, 0)
+    written = []
+    sink.write = written.append
+    processor.fanout = [VoiceTarget("alt-voice", sink, "alt")]
+    scheduler = PhraseScheduler(budget=0)
+
+    _queue_fan_out(processor, scheduler, [1, 2, 3])
+    served = _play_all(scheduler)
+
+    assert len(served) == 1
+    assert scheduler.stats["merged"] == 2
@@ -0,0 +1,66 @@
+from core.segmenter import BYTES_PER_SECOND, PhraseSegmenter
+
+CHUNK = BYTES_PER_SECOND // 10  # 0.1s
+
+
+def _run(segmenter, pattern):
+    """Feed 0.1s chunks: 'S' speech, '.' silence. Returns every event with its chunk index."""
+    events = []
+    for i, frame in enumerate(pattern):
+        for event in segmenter.feed(bytes(CHUNK), frame == "S", i * 0.1):
+            events.append((i, event))
+    return events
+
+
+def _kinds(events):
+    return [event[0] for _, event in events]
+
+
+def test_phrase_ends_after_the_pause():
+    segmenter = PhraseSegmenter(vad_pause=0.35)
+    events = _run(segmenter, "S" * 10 + "." * 6)
+
+    assert _kinds(events) == ["speech_start", "silence_start", "phrase"]
+    index, (_, pcm, duration, forced) = events[-1]
+    assert index == 14  # Silence began at 1.0s, phrase ends once it lasted over 0.35s
+    assert not forced
+    assert len(pcm) == 15 * CHUNK  # Trailing silence is kept
+    assert duration == 1.5
+    assert segmenter.speech_ended_at == 1.0
+
+
+def test_short_pause_resumes_the_phrase():
+    segmenter = PhraseSegmenter(vad_pause=0.55)
+    events = _run(segmenter, "SSSSS..SSSSS" + "." * 7)
+
+    assert _kinds(events) == ["speech_start", "silence_start", "speech_resume", "silence_start", "phrase"]
+    assert events[-1][1][2] == 1.9
+
+
+def test_click_is_discarded():
+    segmenter = PhraseSegmenter(vad_pause=0.1)
+    events = _run(segmenter, "S...")
+
+    assert _kinds(events) == ["speech_start", "silence_start", "discard"]
+    assert not segmenter.is_speaking
+    assert len(segmenter.buffer) == 0
+
+
+def test_long_speech_is_split_at_max_duration():
+    segmenter = PhraseSegmenter(vad_pause=1.0, max_duration=1.0)
+    events = _run(segmenter, "S" * 25)
+
+    phrases = [event for _, event in events if event[0] == "phrase"]
+    assert [len(p[1]) for p in phrases] == [11 * CHUNK, 11 * CHUNK]
+    assert all(p[3] for p in phrases)
+    assert segmenter.speech_ended_at is None  # Cut while still speaking
+
+
+def test_flush_ends_the_phrase_in_progress():
+    segmenter = PhraseSegmenter()
+    _run(segmenter, "..SSSSSS")
+    assert segmenter.phrase_offset == 2 * CHUNK
+
+    (event,) = segmenter.flush()
+    assert event[0] == "phrase" and len(event[1]) == 6 * CHUNK
+    assert segmenter.flush() == []
@@ -6,9 +6,20 @@ from utils.settings import Settings
 from utils.constants import APP_VERSION, APP_AUTHOR, APP_TITLE
 from utils.device_guide import get_device_guide_text
 from core.audio_manager import AudioManager
+from core.audio_process import AudioCoreProcess
+from core.audio_backends import BACKENDS
+from core.fanout import build_targets
+from core.autotune import BOUNDS, AutoTuner, profile_key
 from core.sts_processor import STSProcessor
+from core.effects import LocalEffectsProcessor, PRESETS
+from core.voice_catalog import VoiceCatalog
+from core.metrics import REGISTRY, MetricsServer
+from core.profiler import PROFILER, SamplingProfiler
 
 class AppWindow:
+    ENGINES = {"api": "ElevenLabs API", "local": "Local Effects"}
+    FALLBACKS = {"effect": "Local Effect", "passthrough": "Passthrough", "silence": "Silence"}
+
     def __init__(self, root):
         self.root = root
         self.root.title(APP_TITLE)
@@ -26,10 +37,38 @@ class AppWindow:
 
         # Init components
         self.settings = Settings()
-        self.audio_mgr = AudioManager(max_buffer_size=self.settings.playback_buffer_size)
+        # The audio core can run in its own process, away from the UI's GIL
+        audio_cls = AudioCoreProcess if self.settings.audio_process else AudioManager
+        try:
+            self.audio_mgr = audio_cls(max_buffer_size=self.settings.playback_buffer_size,
+                                       backend=self.settings.audio_backend,
+                                       backend_options=self.settings.audio_backend_options)
+        except ImportError as e:
+            # Saved backend isn't installed here; PyAudio is always a requirement
+            print(f"Audio backend '{self.settings.audio_backend}' unavailable ({e}) - using pyaudio")
+            self.audio_mgr = audio_cls(max_buffer_size=self.settings.playback_buffer_size)
+        self.audio_mgr.drift_compensation = self.settings.drift_compensation
+        self.audio_mgr.set_max_latency(self.settings.max_playback_latency)
+        self.audio_mgr.set_output_gain(self.settings.output_gain)
+        self.audio_mgr.set_extra_outputs(self.settings.extra_outputs)
+        self.audio_mgr.on_log = self._log_message
+        self.metrics_server = None
+
+        # Fan-out voices (edited in the settings file for now)
+        try:
+            self.fanout_targets = build_targets(self.settings.fanout_voices, self.settings.audio_backend,
+                                                self.settings.audio_backend_options)
+        except (ValueError, KeyError, ImportError) as e:
+            print(f"Fan-out voices ignored: {e}")
+            self.fanout_targets = []
 
         # Processor init
         self.sts_processor = None
+        self.catalog = None
+        self.local_processor = LocalEffectsProcessor(self.settings.effect_preset)
+        self.local_processor.on_log = self._log_message
+        self._running_processor = None
+        self.tuner = None
 
         if self.settings.api_key:
             try:
@@ -42,24 +81,42 @@ class AppWindow:
                 self.sts_processor.stability = self.settings.stability
                 self.sts_processor.similarity = self.settings.similarity
                 self.sts_processor.remove_background_noise = self.settings.remove_background_noise
-
-                self._bind_callbacks()
+                self.sts_processor.noise_suppression = self.settings.local_noise_suppression
+                self.sts_processor.speculative = self.settings.speculative_dispatch
+                self.sts_processor.fallback_mode = self.settings.fallback_mode
+                self.sts_processor.streaming_upload = self.settings.streaming_upload
+                self.sts_processor.freshness_budget = self.settings.freshness_budget
+                self.sts_processor.api_concurrency = self.settings.api_concurrency
+                self.sts_processor.requests_per_minute = self.settings.requests_per_minute
+                self.sts_processor.set_fanout(self.fanout_targets)
+                self.sts_processor.fallback_effect.set_preset(self.settings.effect_preset)
+                # Usable before the voice list arrives
+                self.sts_processor.set_voice(self.settings.voice_id)
+                self.catalog = VoiceCatalog(self.settings.api_key, fetch=self.sts_processor.get_voices)
+                self.catalog.load()
             except Exception as e:
                 print(e)
 
+        self._bind_callbacks()
         self._setup_ui()
         self._load_devices()
         self._load_voices_async()
+        self._start_metrics_server()
+        self._refresh_stats()
 
     def _bind_callbacks(self):
         if self.sts_processor:
             self.sts_processor.on_log = self._log_message
             self.sts_processor.on_vad_level = None
             self.sts_processor.on_audio_data = self._update_waveform
+        if self.catalog:
+            self.catalog.on_log = self._log_message
+
+        self.local_processor.on_audio_data = self._update_waveform
 
-            # Throttling for waveform (prevent UI lag)
-            self._last_waveform_update = 0
-            self._waveform_throttle = 0.066
+        # Throttling for waveform (prevent UI lag)
+        self._last_waveform_update = 0
+        self._waveform_throttle = 0.066
 
     def _setup_ui(self):
         # 1. Header / API Key (Top)
@@ -88,9 +145,11 @@ class AppWindow:
 
         self.tab_io = tk.Frame(self.notebook, bg=self.fg_color, height=280)
         self.tab_voice = tk.Frame(self.notebook, bg=self.fg_color, height=280)
+        self.tab_stats = tk.Frame(self.notebook, bg=self.fg_color, height=280)
 
         self.notebook.add(self.tab_io, text="Input / Output")
         self.notebook.add(self.tab_voice, text="Voice & Quality")
+        self.notebook.add(self.tab_stats, text="Stats")
 
         # === TAB 1: Input / Output (Grid Layout) ===
         self.tab_io.grid_columnconfigure(0, weight=1)
@@ -119,7 +178,11 @@ class AppWindow:
         # Row 3: Noise Checkbox (Spanning)
         self.noise_var = tk.BooleanVar(value=self.settings.remove_background_noise)
         self.noise_chk = tk.Checkbutton(self.tab_io, text="AI Noise Removal", font=("Arial", 10), variable=self.noise_var, command=self._on_noise_chk, bg=self.fg_color, fg=self.text_color, selectcolor=self.fg_color, activebackground=self.fg_color, activeforeground=self.text_color)
-        self.noise_chk.grid(row=3, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        self.noise_chk.grid(row=3, column=0, sticky="w", padx=5, pady=5)
+
+        self.spec_var = tk.BooleanVar(value=self.settings.speculative_dispatch)
+        self.spec_chk = tk.Checkbutton(self.tab_io, text="Speculative Send", font=("Arial", 10), variable=self.spec_var, command=self._on_spec_chk, bg=self.fg_color, fg=self.text_color, selectcolor=self.fg_color, activebackground=self.fg_color, activeforeground=self.text_color)
+        self.spec_chk.grid(row=3, column=1, sticky="w", padx=5, pady=5)
 
         # Row 4: VAD & Silence Labels
         self.vad_label = tk.Label(self.tab_io, text="VAD Threshold: 500", font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color)
@@ -145,6 +208,61 @@ class AppWindow:
         self.buf_slider.set(self.settings.playback_buffer_size)
         self.buf_slider.grid(row=7, column=0, columnspan=2, sticky="ew", padx=5, pady=(0, 5))
 
+        # Row 8-9: Playback latency cap
+        self.lag_label = tk.Label(self.tab_io, text=self._lag_text(self.settings.max_playback_latency), font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color)
+        self.lag_label.grid(row=8, column=0, columnspan=2, sticky="w", padx=5, pady=(5, 0))
+
+        self.lag_slider = tk.Scale(self.tab_io, from_=0.0, to=10.0, resolution=0.5, orient="horizontal", command=self._on_lag_slide, bg=self.fg_color, fg=self.text_color, highlightthickness=0, troughcolor="#3a3a3a", activebackground=self.accent_color)
+        self.lag_slider.set(self.settings.max_playback_latency)
+        self.lag_slider.grid(row=9, column=0, columnspan=2, sticky="ew", padx=5, pady=(0, 5))
+
+        # Row 10: Local noise suppression
+        self.denoise_var = tk.BooleanVar(value=self.settings.local_noise_suppression)
+        self.denoise_chk = tk.Checkbutton(self.tab_io, text="Local Noise Suppression", font=("Arial", 10), variable=self.denoise_var, command=self._on_denoise_chk, bg=self.fg_color, fg=self.text_color, selectcolor=self.fg_color, activebackground=self.fg_color, activeforeground=self.text_color)
+        self.denoise_chk.grid(row=10, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+
+        # Row 11-12: Freshness budget (stale phrases are dropped)
+        self.fresh_label = tk.Label(self.tab_io, text=self._fresh_text(self.settings.freshness_budget), font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color)
+        self.fresh_label.grid(row=11, column=0, columnspan=2, sticky="w", padx=5, pady=(5, 0))
+
+        self.fresh_slider = tk.Scale(self.tab_io, from_=0.0, to=30.0, resolution=0.5, orient="horizontal", command=self._on_fresh_slide, bg=self.fg_color, fg=self.text_color, highlightthickness=0, troughcolor="#3a3a3a", activebackground=self.accent_color)
+        self.fresh_slider.set(self.settings.freshness_budget)
+        self.fresh_slider.grid(row=12, column=0, columnspan=2, sticky="ew", padx=5, pady=(0, 5))
+
+        # Row 13: Audio core process (applies on restart)
+        self.core_proc_var = tk.BooleanVar(value=self.settings.audio_process)
+        self.core_proc_chk = tk.Checkbutton(self.tab_io, text="Run Audio Core in Separate Process (restart)", font=("Arial", 10), variable=self.core_proc_var, command=self._on_core_proc_chk, bg=self.fg_color, fg=self.text_color, selectcolor=self.fg_color, activebackground=self.fg_color, activeforeground=self.text_color)
+        self.core_proc_chk.grid(row=13, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+
+        # Row 14: Audio backend (applies on restart)
+        tk.Label(self.tab_io, text="Audio Backend (restart):", font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color).grid(row=14, column=0, sticky="w", padx=5)
+        self.backend_combo = ttk.Combobox(self.tab_io, state="readonly", values=list(BACKENDS))
+        self.backend_combo.set(self.settings.audio_backend)
+        self.backend_combo.bind('<<ComboboxSelected>>', lambda _: self._on_backend_change())
+        self.backend_combo.grid(row=14, column=1, sticky="ew", padx=5, pady=5)
+
+        # Row 15: Second output playing the same audio (e.g. headphones next to the cable)
+        tk.Label(self.tab_io, text="Monitor Output:", font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color).grid(row=15, column=0, sticky="w", padx=5)
+        self.monitor_combo = ttk.Combobox(self.tab_io, state="readonly", values=["None"])
+        self.monitor_combo.set("None")
+        self.monitor_combo.bind('<<ComboboxSelected>>', lambda _: self._on_monitor_change())
+        self.monitor_combo.grid(row=15, column=1, sticky="ew", padx=5, pady=5)
+
+        # Row 16-17: Per-output gain
+        monitor_gain = self.settings.extra_outputs[0].get("gain", 1.0) if self.settings.extra_outputs else 1.0
+        self.gain_label = tk.Label(self.tab_io, text=f"Output Gain: {self.settings.output_gain:.2f}", font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color)
+        self.gain_label.grid(row=16, column=0, sticky="w", padx=5)
+        self.monitor_gain_label = tk.Label(self.tab_io, text=f"Monitor Gain: {monitor_gain:.2f}", font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color)
+        self.monitor_gain_label.grid(row=16, column=1, sticky="w", padx=5)
+
+        self.gain_slider = tk.Scale(self.tab_io, from_=0.0, to=2.0, resolution=0.05, orient="horizontal", command=self._on_gain_slide, bg=self.fg_color, fg=self.text_color, highlightthickness=0, troughcolor="#3a3a3a", activebackground=self.accent_color)
+        self.gain_slider.set(self.settings.output_gain)
+        self.gain_slider.grid(row=17, column=0, sticky="ew", padx=5, pady=(0, 5))
+
+        self.monitor_gain_slider = tk.Scale(self.tab_io, from_=0.0, to=2.0, resolution=0.05, orient="horizontal", command=self._on_monitor_gain_slide, bg=self.fg_color, fg=self.text_color, highlightthickness=0, troughcolor="#3a3a3a", activebackground=self.accent_color)
+        self.monitor_gain_slider.set(monitor_gain)
+        self.monitor_gain_slider.grid(row=17, column=1, sticky="ew", padx=5, pady=(0, 5))
+
         # === TAB 2: Voice & Quality (Grid Layout) ===
         self.tab_voice.grid_columnconfigure(0, weight=1)
         self.tab_voice.grid_columnconfigure(1, weight=1)
@@ -179,6 +297,58 @@ class AppWindow:
         self.latency_slider.set(self.settings.latency)
         self.latency_slider.grid(row=5, column=0, columnspan=2, sticky="ew", padx=5, pady=(0, 5))
 
+        # Row 6-7: Engine & Local Effect
+        tk.Label(self.tab_voice, text="Engine:", font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color).grid(row=6, column=0, sticky="w", padx=5)
+        tk.Label(self.tab_voice, text="Local Effect:", font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color).grid(row=6, column=1, sticky="w", padx=5)
+
+        self.engine_combo = ttk.Combobox(self.tab_voice, state="readonly", values=list(self.ENGINES.values()))
+        self.engine_combo.set(self.ENGINES.get(self.settings.engine, self.ENGINES["api"]))
+        self.engine_combo.bind('<<ComboboxSelected>>', lambda _: self._on_engine_change())
+        self.engine_combo.grid(row=7, column=0, sticky="ew", padx=5, pady=(0, 5))
+
+        self.effect_combo = ttk.Combobox(self.tab_voice, state="readonly", values=list(PRESETS))
+        self.effect_combo.set(self.settings.effect_preset)
+        self.effect_combo.bind('<<ComboboxSelected>>', lambda _: self._on_effect_change())
+        self.effect_combo.grid(row=7, column=1, sticky="ew", padx=5, pady=(0, 5))
+
+        # Row 8-9: What to play when the API is unavailable
+        tk.Label(self.tab_voice, text="API Fallback:", font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color).grid(row=8, column=0, columnspan=2, sticky="w", padx=5)
+        self.fallback_combo = ttk.Combobox(self.tab_voice, state="readonly", values=list(self.FALLBACKS.values()))
+        self.fallback_combo.set(self.FALLBACKS.get(self.settings.fallback_mode, self.FALLBACKS["effect"]))
+        self.fallback_combo.bind('<<ComboboxSelected>>', lambda _: self._on_fallback_change())
+        self.fallback_combo.grid(row=9, column=0, columnspan=2, sticky="ew", padx=5, pady=(0, 5))
+
+        # Row 10: Upload while speaking
+        self.stream_up_var = tk.BooleanVar(value=self.settings.streaming_upload)
+        self.stream_up_chk = tk.Checkbutton(self.tab_voice, text="Stream Upload (send while speaking)", font=("Arial", 10), variable=self.stream_up_var, command=self._on_stream_up_chk, bg=self.fg_color, fg=self.text_color, selectcolor=self.fg_color, activebackground=self.fg_color, activeforeground=self.text_color)
+        self.stream_up_chk.grid(row=10, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+
+        # Row 11-12: Parallel requests (capped by the API key's concurrency limit)
+        self.conc_label = tk.Label(self.tab_voice, text=f"Parallel Requests: {self.settings.api_concurrency}", font=("Arial", 10), anchor="w", bg=self.fg_color, fg=self.text_color)
+        self.conc_label.grid(row=11, column=0, columnspan=2, sticky="w", padx=5)
+
+        self.conc_slider = tk.Scale(self.tab_voice, from_=1, to=STSProcessor.MAX_WORKERS, resolution=1, orient="horizontal", command=self._on_conc_slide, bg=self.fg_color, fg=self.text_color, highlightthickness=0, troughcolor="#3a3a3a", activebackground=self.accent_color)
+        self.conc_slider.set(self.settings.api_concurrency)
+        self.conc_slider.grid(row=12, column=0, columnspan=2, sticky="ew", padx=5, pady=(0, 5))
+
+        # Row 13: Tune pause, latency and buffering from measured glitches
+        self.auto_tune_var = tk.BooleanVar(value=self.settings.auto_tune)
+        self.auto_tune_chk = tk.Checkbutton(self.tab_voice, text="Auto-Tune Latency (per device & voice)", font=("Arial", 10), variable=self.auto_tune_var, command=self._on_auto_tune_chk, bg=self.fg_color, fg=self.text_color, selectcolor=self.fg_color, activebackground=self.fg_color, activeforeground=self.text_color)
+        self.auto_tune_chk.grid(row=13, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+
+        # === TAB 3: Stats (refreshed once a second) ===
+        # Profiling: per-stage timers and an on-demand stack sampler
+        self.profile_frame = tk.Frame(self.tab_stats, bg=self.fg_color)
+        self.profile_frame.pack(side="bottom", fill="x", padx=5, pady=(0, 5))
+        self.stage_timers_var = tk.BooleanVar(value=False)
+        self.stage_timers_chk = tk.Checkbutton(self.profile_frame, text="Stage Timers", font=("Arial", 10), variable=self.stage_timers_var, command=self._on_stage_timers_chk, bg=self.fg_color, fg=self.text_color, selectcolor=self.fg_color, activebackground=self.fg_color, activeforeground=self.text_color)
+        self.stage_timers_chk.pack(side="left")
+        self.sample_btn = tk.Button(self.profile_frame, text="Sample 10 s", font=("Arial", 10), command=self._sample_profile, bg="#3a3a3a", fg=self.text_color, relief="flat")
+        self.sample_btn.pack(side="right")
+
+        self.stats_label = tk.Label(self.tab_stats, text="", font=("Consolas", 10), justify="left", anchor="nw", bg=self.fg_color, fg=self.text_color)
+        self.stats_label.pack(fill="both", expand=True, padx=5, pady=5)
+
         # 3. Controls (Status & Actions)
         self.ctrl_frame = tk.Frame(self.root, bg=self.fg_color)
         self.ctrl_frame.pack(fill="x", padx=10, pady=5)
@@ -218,13 +388,81 @@ class AppWindow:
 
         self.console.insert("1.0", "--- System Ready ---\n")
 
+    def _start_metrics_server(self):
+        if not self.settings.metrics_port:
+            return
+        try:
+            self.metrics_server = MetricsServer(self.settings.metrics_port)
+            self.metrics_server.start()
+            self._log_message(f"[METRICS] Serving {self.metrics_server.url}")
+        except OSError as e:
+            self.metrics_server = None
+            self._log_message(f"[METRICS] Could not bind port {self.settings.metrics_port}: {e}")
+
+    def _stats_text(self):
+        def v(name):
+            metric = REGISTRY.get(name)
+            return metric.value if metric else 0
+
+        ttfb = REGISTRY.get("vc_api_ttfb_seconds")
+        total = REGISTRY.get("vc_api_request_seconds")
+        lines = [
+            f"Capture     {v('vc_input_frames_total'):>10} frames   {v('vc_input_frames_dropped_total')} dropped, {v('vc_input_overflows_total')} overflows",
+            f"VAD         {v('vc_vad_speech_ratio') * 100:>9.0f}% speech   {v('vc_vad_false_splits_total')} false splits in {v('vc_vad_phrases_total')} phrases",
+            f"Phrases     {v('vc_phrases_queued_total'):>10} queued   {v('vc_processing_queue_phrases'):.0f} waiting (oldest {v('vc_queue_oldest_age_seconds'):.1f}s)",
+            f"            {v('vc_phrases_dropped_total'):>10} dropped  {v('vc_phrases_merged_total')} merged",
+            f"API         {v('vc_api_requests_total'):>10} requests {v('vc_api_errors_total')} errors",
+            f"            {v('vc_api_bytes_sent_total') / 1024:>9.0f}K up     {v('vc_api_bytes_received_total') / 1024:.0f}K down",
+            f"            {v('vc_api_in_flight'):>10.0f} in flight {v('vc_api_rate_limited_total')} rate limited",
+        ]
+        throttle = REGISTRY.get("vc_api_throttle_wait_seconds")
+        if throttle and throttle.count:
+            lines.append(f"            throttle wait p95 {throttle.quantile(0.95):.2f}s")
+        wait = REGISTRY.get("vc_queue_wait_seconds")
+        if wait and wait.count:
+            lines.append(f"            queue wait p50 {wait.quantile(0.5):.2f}s p95 {wait.quantile(0.95):.2f}s")
+        if ttfb and ttfb.count:
+            lines.append(f"            TTFB p50 {ttfb.quantile(0.5):.2f}s p95 {ttfb.quantile(0.95):.2f}s, "
+                         f"total p50 {total.quantile(0.5):.2f}s p95 {total.quantile(0.95):.2f}s")
+        lines += [
+            f"Playback    {v('vc_jitter_buffer_seconds'):>9.2f}s buffered {v('vc_playback_underruns_total')} underruns, {v('vc_jitter_overflow_drops_total')} overflow drops",
+            f"Output      {v('vc_output_write_errors_total'):>10} write errors",
+        ]
+        if self.settings.extra_outputs:
+            lines.append(f"Bus         {v('vc_bus_underruns_total'):>10} underruns {v('vc_bus_latency_drops_total')} skipped, {v('vc_bus_write_errors_total')} write errors")
+        e2e = REGISTRY.get("vc_speech_to_playback_seconds")
+        if e2e and e2e.count:
+            lines.append(f"Latency     speech end to playback p50 {e2e.quantile(0.5):.2f}s p95 {e2e.quantile(0.95):.2f}s")
+        if self.tuner:
+            lines.append(f"Auto-tune   {self.tuner.adjustments:>10} changes  {self.tuner.describe()}")
+        jitter = REGISTRY.get("vc_capture_callback_jitter_seconds")
+        if jitter and jitter.count:
+            lines.append(f"Callback    jitter p50 {jitter.quantile(0.5) * 1000:.1f}ms p95 {jitter.quantile(0.95) * 1000:.1f}ms")
+        lines.append(f"Device      latency in {v('vc_input_device_latency_seconds') * 1000:.0f}ms "
+                     f"out {v('vc_output_device_latency_seconds') * 1000:.0f}ms")
+        stages = PROFILER.summary()
+        if stages:
+            lines += ["", "Stage               calls       p50          p99          total"] + stages
+        if self.metrics_server:
+            lines.append(f"\nPrometheus: {self.metrics_server.url}")
+        return "\n".join(lines)
+
+    def _refresh_stats(self):
+        try:
+            self.stats_label.configure(text=self._stats_text())
+        except (RuntimeError, tk.TclError):
+            return
+        self.root.after(1000, self._refresh_stats)
+
     def _log_message(self, msg):
         def _update():
+            started = PROFILER.clock()
             try:
                 self.console.insert("end", f"{msg}\n")
                 self.console.see("end")
             except (RuntimeError, AttributeError):
                 pass
+            PROFILER.record("ui_log", started)
         self.root.after(0, _update)
 
     def _update_waveform(self, samples):
@@ -239,6 +477,7 @@ class AppWindow:
             if not self.root or not self.wave_canvas.winfo_exists():
                 return
 
+            started = PROFILER.clock()
             try:
                 w = self.wave_canvas.winfo_width()
                 h = self.wave_canvas.winfo_height()
@@ -266,6 +505,7 @@ class AppWindow:
 
             except Exception:
                 pass
+            PROFILER.record("ui_waveform", started)
 
         self.root.after(0, _draw)
 
@@ -291,6 +531,58 @@ class AppWindow:
         if not self.audio_mgr.is_running:
             self.audio_mgr.set_buffer_size(val)
 
+    @staticmethod
+    def _lag_text(val):
+        return f"Max Playback Lag: {val:.1f}s" if val > 0 else "Max Playback Lag: Off"
+
+    @staticmethod
+    def _fresh_text(val):
+        return f"Drop Speech Older Than: {val:.1f}s" if val > 0 else "Drop Speech Older Than: Never"
+
+    def _on_fresh_slide(self, value):
+        val = round(float(value), 1)
+        self.fresh_label.configure(text=self._fresh_text(val))
+        self.settings.freshness_budget = val
+        self.settings.save()
+        if self.sts_processor:
+            self.sts_processor.freshness_budget = val
+
+    def _on_lag_slide(self, value):
+        val = round(float(value), 1)
+        self.lag_label.configure(text=self._lag_text(val))
+        self.settings.max_playback_latency = val
+        self.settings.save()
+        self.audio_mgr.set_max_latency(val)
+
+    def _on_gain_slide(self, value):
+        val = round(float(value), 2)
+        self.gain_label.configure(text=f"Output Gain: {val:.2f}")
+        self.settings.output_gain = val
+        self.settings.save()
+        self.audio_mgr.set_output_gain(val)
+
+    def _on_monitor_gain_slide(self, value):
+        val = round(float(value), 2)
+        self.monitor_gain_label.configure(text=f"Monitor Gain: {val:.2f}")
+        if self.settings.extra_outputs:
+            monitor = self.settings.extra_outputs[0]
+            monitor["gain"] = val
+            self.settings.save()
+            self.audio_mgr.set_output_gain(val, monitor["device"])
+
+    def _on_monitor_change(self):
+        val = self.monitor_combo.get()
+        # Further outputs can be listed in the settings file; the combo is the first
+        others = self.settings.extra_outputs[1:]
+        if val == "None":
+            self.settings.extra_outputs = others
+        else:
+            monitor = {"device": int(val.split(":")[0]), "gain": round(float(self.monitor_gain_slider.get()), 2),
+                       "name": "Monitor"}
+            self.settings.extra_outputs = [monitor] + others
+        self.settings.save()
+        self.audio_mgr.set_extra_outputs(self.settings.extra_outputs)
+
     def _on_latency_slide(self, value):
         val = int(float(value))
         self.latency_label.configure(text=f"Latency Opt: Level {val}")
@@ -306,6 +598,123 @@ class AppWindow:
         if self.sts_processor:
             self.sts_processor.remove_background_noise = val
 
+    def _on_denoise_chk(self):
+        val = self.denoise_var.get()
+        self.settings.local_noise_suppression = val
+        self.settings.save()
+        if self.sts_processor:
+            self.sts_processor.noise_suppression = val
+            if val and self.settings.remove_background_noise:
+                self._log_message("[INFO] Local suppression is on - AI Noise Removal can be disabled to save server time.")
+
+    def _on_core_proc_chk(self):
+        self.settings.audio_process = self.core_proc_var.get()
+        self.settings.save()
+        self._log_message("[INFO] Audio core mode changes on next start of the app.")
+
+    def _on_backend_change(self):
+        self.settings.audio_backend = self.backend_combo.get()
+        self.settings.save()
+        self._log_message(f"[INFO] Audio backend '{self.settings.audio_backend}' is used from the next start of the app.")
+
+    def _on_spec_chk(self):
+        val = self.spec_var.get()
+        self.settings.speculative_dispatch = val
+        self.settings.save()
+        if self.sts_processor:
+            self.sts_processor.speculative = val
+
+    def _on_stream_up_chk(self):
+        val = self.stream_up_var.get()
+        self.settings.streaming_upload = val
+        self.settings.save()
+        if self.sts_processor:
+            self.sts_processor.streaming_upload = val
+
+    def _on_auto_tune_chk(self):
+        val = self.auto_tune_var.get()
+        self.settings.auto_tune = val
+        self.settings.save()
+        if val:
+            self._log_message("[TUNE] Auto-tuning from the next start")
+            return
+        if self.tuner:
+            self.tuner.stop()
+            self.tuner = None
+        # Back to the slider values
+        if self.sts_processor:
+            self.sts_processor.vad_pause = self.settings.vad_pause
+            self.sts_processor.latency = self.settings.latency
+        if not self.audio_mgr.is_running:
+            self.audio_mgr.set_buffer_size(self.settings.playback_buffer_size)
+            if hasattr(self.audio_mgr, "chunk_size"):
+                self.audio_mgr.chunk_size = AudioManager.CHUNK_SIZE
+
+    def _on_stage_timers_chk(self):
+        val = self.stage_timers_var.get()
+        PROFILER.enabled = val
+        if hasattr(self.audio_mgr, "set_profiling"):
+            self.audio_mgr.set_profiling(val)
+
+    def _sample_profile(self, seconds: float = 10.0):
+        """Sample every thread's stack for a while; save a flamegraph-ready file."""
+        self.sample_btn.configure(state="disabled")
+        self._log_message(f"[PROFILE] Sampling for {seconds:.0f}s...")
+
+        def _run():
+            sampler = SamplingProfiler()
+            sampler.run_for(seconds)
+            path = time.strftime("profile-%Y%m%d-%H%M%S.folded")
+            try:
+                sampler.save(path)
+            except OSError as e:
+                self._log_message(f"[PROFILE] Could not save {path}: {e}")
+                path = None
+            st = sampler.summary()
+            if path:
+                self._log_message(f"[PROFILE] {st['samples']} samples, {st['stacks']} stacks -> {path} "
+                                  f"(flamegraph.pl / speedscope)")
+            self._log_message(f"[PROFILE] Sampler lateness (GIL wait) p50 {st['lateness_p50'] * 1000:.1f}ms "
+                              f"p99 {st['lateness_p99'] * 1000:.1f}ms")
+            for frame, share in sampler.top(5):
+                self._log_message(f"[PROFILE] {share * 100:5.1f}%  {frame}")
+            self.root.after(0, lambda: self.sample_btn.configure(state="normal"))
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def _make_tuner(self, processor, in_str: str, out_str: str):
+        """An AutoTuner seeded with this device and voice profile's learned values, or None."""
+        if not self.settings.auto_tune or processor is not self.sts_processor:
+            return None
+        key = profile_key(in_str.split(":", 1)[-1].strip(), out_str.split(":", 1)[-1].strip(), self.settings.voice_id)
+        values = {"vad_pause": self.settings.vad_pause, "latency": self.settings.latency, "prebuffer": 5,
+                  "playback_buffer_size": self.settings.playback_buffer_size}
+        if hasattr(self.audio_mgr, "chunk_size"):
+            values["chunk_size"] = AudioManager.CHUNK_SIZE
+        if key not in self.settings.tuned_profiles:
+            # Start a step below the most aggressive level, so latency can move either way
+            values["latency"] = min(values["latency"], BOUNDS["latency"][1] - 1)
+        values.update(self.settings.tuned_profiles.get(key, {}))
+        tuner = AutoTuner(processor, self.audio_mgr, values)
+        tuner.on_log = self._log_message
+        tuner.on_change = lambda tuned: self.root.after(0, lambda: self._store_tuned(key, tuned))
+        known = "Stored" if key in self.settings.tuned_profiles else "New"
+        self._log_message(f"[TUNE] {known} profile {key}: {tuner.describe()}")
+        return tuner
+
+    def _store_tuned(self, key: str, values):
+        self.settings.tuned_profiles[key] = values
+        self.settings.save()
+
+    def _on_conc_slide(self, value):
+        val = int(float(value))
+        self.conc_label.configure(text=f"Parallel Requests: {val}")
+        self.settings.api_concurrency = val
+        self.settings.save()
+        if self.sts_processor:
+            # Worker count follows on the next start
+            self.sts_processor.api_concurrency = val
+
     def _on_stab_slide(self, value):
         val = round(float(value), 2)
         self.stab_label.configure(text=f"Stability: {val:.2f}")
@@ -322,6 +731,37 @@ class AppWindow:
         if self.sts_processor:
             self.sts_processor.similarity = val
 
+    def _on_engine_change(self):
+        label = self.engine_combo.get()
+        for key, name in self.ENGINES.items():
+            if name == label:
+                self.settings.engine = key
+                self.settings.save()
+        if self.audio_mgr.is_running:
+            self._log_message("Engine change applies on next start.")
+
+    def _on_effect_change(self):
+        preset = self.effect_combo.get()
+        self.settings.effect_preset = preset
+        self.settings.save()
+        self.local_processor.set_preset(preset)
+        if self.sts_processor:
+            self.sts_processor.fallback_effect.set_preset(preset)
+
+    def _on_fallback_change(self):
+        label = self.fallback_combo.get()
+        for key, name in self.FALLBACKS.items():
+            if name == label:
+                self.settings.fallback_mode = key
+                self.settings.save()
+                if self.sts_processor:
+                    self.sts_processor.fallback_mode = key
+
+    def _active_processor(self):
+        if self.settings.engine == "local":
+            return self.local_processor
+        return self.sts_processor
+
     def _save_api_key(self):
         key = self.api_key_var.get().strip()
         if not key: return
@@ -335,9 +775,21 @@ class AppWindow:
             self.sts_processor.stability = self.settings.stability
             self.sts_processor.similarity = self.settings.similarity
             self.sts_processor.remove_background_noise = self.settings.remove_background_noise
+            self.sts_processor.noise_suppression = self.settings.local_noise_suppression
+            self.sts_processor.speculative = self.settings.speculative_dispatch
+            self.sts_processor.fallback_mode = self.settings.fallback_mode
+            self.sts_processor.streaming_upload = self.settings.streaming_upload
+            self.sts_processor.freshness_budget = self.settings.freshness_budget
+            self.sts_processor.api_concurrency = self.settings.api_concurrency
+            self.sts_processor.requests_per_minute = self.settings.requests_per_minute
+            self.sts_processor.set_fanout(self.fanout_targets)
+            self.sts_processor.fallback_effect.set_preset(self.settings.effect_preset)
+            self.sts_processor.set_voice(self.settings.voice_id)
+            self.catalog = VoiceCatalog(key, fetch=self.sts_processor.get_voices)
+            self.catalog.load()
 
             self._bind_callbacks()
-            self._load_voices_async()
+            self._load_voices_async(force=True)
             self._log_message("API Key saved.")
         except Exception as e:
             self._log_message(f"Error init API: {e}")
@@ -378,6 +830,7 @@ class AppWindow:
 
         self.input_combo['values'] = input_names
         self.output_combo['values'] = output_names
+        self.monitor_combo['values'] = ["None"] + output_names
 
         if input_names: self.input_combo.set(input_names[0])
         if output_names: self.output_combo.set(output_names[0])
@@ -391,6 +844,10 @@ class AppWindow:
              for s in output_names:
                  if s.startswith(f"{self.settings.output_device_index}:"):
                      self.output_combo.set(s)
+        if self.settings.extra_outputs:
+             for s in output_names:
+                 if s.startswith(f"{self.settings.extra_outputs[0]['device']}:"):
+                     self.monitor_combo.set(s)
 
     def _on_device_change(self):
         try:
@@ -404,54 +861,60 @@ class AppWindow:
         except (ValueError, IndexError, AttributeError):
             pass
 
-    def _load_voices_async(self):
-        if not self.sts_processor: return
-        def fetch():
-            voices = self.sts_processor.get_voices()
-            self.root.after(0, lambda: self._update_voice_list(voices))
-        threading.Thread(target=fetch, daemon=True).start()
-
-    def _update_voice_list(self, voices):
-        self.voices = voices
-        names = [v.name for v in voices]
+    def _load_voices_async(self, force=False):
+        if not self.catalog: return
+        # Show the cached list right away; the refresh only redraws if it changed
+        if self.catalog.voices:
+            self._update_voice_list(self.catalog)
+        self.catalog.revalidate_async(
+            lambda catalog: self.root.after(0, lambda: self._update_voice_list(catalog)),
+            force=force or not self.catalog.voices,
+        )
+
+    def _update_voice_list(self, catalog):
+        names = [v.name for v in catalog.voices]
         self.voice_combo['values'] = names
         if names: self.voice_combo.set(names[0])
 
         if self.settings.voice_id:
-            for v in voices:
-                if v.voice_id == self.settings.voice_id:
-                    self.voice_combo.set(v.name)
-                    self.sts_processor.set_voice(v.voice_id)
-                    break
+            voice = catalog.get(self.settings.voice_id)
+            if voice:
+                self.voice_combo.set(voice.name)
+                self.sts_processor.set_voice(voice.voice_id)
         else:
              self._on_voice_change(self.voice_combo.get())
 
     def _on_voice_change(self, name):
-        if not hasattr(self, 'voices'): return
-        for v in self.voices:
-            if v.name == name:
-                self.settings.voice_id = v.voice_id
-                self.settings.save()
-                if self.sts_processor:
-                    self.sts_processor.set_voice(v.voice_id)
-                break
+        if not self.catalog: return
+        voice = self.catalog.find(name)
+        if voice:
+            self.settings.voice_id = voice.voice_id
+            self.settings.save()
+            if self.sts_processor:
+                self.sts_processor.set_voice(voice.voice_id)
 
     def _toggle_streaming(self):
-        if not self.sts_processor:
-            self._log_message("Error: No API Key")
-            return
-
         if self.audio_mgr.is_running:
             self.status_label.configure(text="Stopping...", fg="orange")
             self.start_btn.configure(state="disabled")
 
             def _stop_async():
-                self.sts_processor.stop_processing()
+                if self.tuner:
+                    self.tuner.stop()
+                    self._log_message(self.tuner.summary())
+                    self.tuner = None
+                if self._running_processor:
+                    self._running_processor.stop_processing()
                 self.audio_mgr.stop_streams()
                 self.root.after(0, lambda: self._on_stop_complete())
 
             threading.Thread(target=_stop_async, daemon=True).start()
         else:
+            processor = self._active_processor()
+            if not processor:
+                self._log_message("Error: No API Key")
+                return
+
             try:
                 in_str = self.input_combo.get()
                 out_str = self.output_combo.get()
@@ -464,11 +927,16 @@ class AppWindow:
 
                 self.status_label.configure(text="Starting...", fg="orange")
                 self.start_btn.configure(state="disabled")
+                tuner = self._make_tuner(processor, in_str, out_str)
 
                 def _start_async():
                     try:
                         self.audio_mgr.start_streams(in_idx, out_idx)
-                        self.sts_processor.start_processing(self.audio_mgr)
+                        processor.start_processing(self.audio_mgr)
+                        if tuner:
+                            tuner.start()
+                            self.tuner = tuner
+                        self._running_processor = processor
                         self.root.after(0, lambda: self._on_start_complete())
                     except Exception as e:
                         self.root.after(0, lambda: self._on_start_error(str(e)))
@@ -492,12 +960,24 @@ class AppWindow:
 
     def _on_stop_complete(self):
         """Called when async stop completes"""
+        stats = self.audio_mgr.drift_stats()
+        self._log_message(f"[CLOCK] Drift {stats['drift_ppm']:+.1f} ppm, correction {stats['correction_ppm']:+.1f} ppm")
+        for ch in stats.get("bus", []):
+            self._log_message(f"[BUS] {ch['name']}: drift {ch['drift_ppm']:+.1f} ppm vs main output, "
+                              f"{ch['underruns']} underruns, {ch['dropped']} chunks skipped to stay in sync")
         self.start_btn.configure(text="START Voice Changer", bg="green", highlightbackground="green", activebackground="green", state="normal")
         self.status_label.configure(text="Ready", fg="gray")
 
     def on_closing(self):
+        if self.tuner:
+            self.tuner.stop()
         if self.audio_mgr.is_running:
             self.audio_mgr.stop_streams()
-        if self.sts_processor:
-            self.sts_processor.stop_processing()
+        if self._running_processor:
+            self._running_processor.stop_processing()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        for target in self.fanout_targets:
+            target.sink.close()
+        self.audio_mgr.terminate()
         self.root.destroy()
@@ -19,8 +19,32 @@ class Settings:
         self.latency = 4
         self.stability = 0.5
         self.similarity = 0.75
-        self.remove_background_noise = True
+        self.remove_background_noise = False
+        self.local_noise_suppression = True
         self.playback_buffer_size = 2048
+        self.speculative_dispatch = False
+        self.engine = "api"
+        self.effect_preset = "Deep"
+        self.fallback_mode = "effect"
+        self.streaming_upload = False
+        self.drift_compensation = True
+        self.max_playback_latency = 3.0
+        self.metrics_port = 9464
+        self.freshness_budget = 8.0
+        self.audio_process = False
+        self.api_concurrency = 2
+        self.requests_per_minute = 0
+        self.audio_backend = "pyaudio"
+        # e.g. {"input_path": "in.wav", "output_path": "out.wav"} for the file backend
+        self.audio_backend_options = {}
+        # Extra voices per phrase: {"voice_id", "name", "output_device" or "directory"}
+        self.fanout_voices = []
+        # Latency knobs tuned online, stored per "input | output | voice" profile
+        self.auto_tune = False
+        self.tuned_profiles = {}
+        # Output bus: main output gain, and devices that also play it {"device", "gain", "name"}
+        self.output_gain = 1.0
+        self.extra_outputs = []
         self.load()
 
     def load(self):
@@ -38,8 +62,28 @@ class Settings:
                     self.latency = data.get("latency", 4)
                     self.stability = data.get("stability", 0.5)
                     self.similarity = data.get("similarity", 0.75)
-                    self.remove_background_noise = data.get("remove_background_noise", True)
+                    self.remove_background_noise = data.get("remove_background_noise", False)
+                    self.local_noise_suppression = data.get("local_noise_suppression", True)
                     self.playback_buffer_size = data.get("playback_buffer_size", 2048)
+                    self.speculative_dispatch = data.get("speculative_dispatch", False)
+                    self.engine = data.get("engine", "api")
+                    self.effect_preset = data.get("effect_preset", "Deep")
+                    self.fallback_mode = data.get("fallback_mode", "effect")
+                    self.streaming_upload = data.get("streaming_upload", False)
+                    self.drift_compensation = data.get("drift_compensation", True)
+                    self.max_playback_latency = data.get("max_playback_latency", 3.0)
+                    self.metrics_port = data.get("metrics_port", 9464)
+                    self.freshness_budget = data.get("freshness_budget", 8.0)
+                    self.audio_process = data.get("audio_process", False)
+                    self.api_concurrency = data.get("api_concurrency", 2)
+                    self.requests_per_minute = data.get("requests_per_minute", 0)
+                    self.audio_backend = data.get("audio_backend", "pyaudio")
+                    self.audio_backend_options = data.get("audio_backend_options", {})
+                    self.fanout_voices = data.get("fanout_voices", [])
+                    self.auto_tune = data.get("auto_tune", False)
+                    self.tuned_profiles = data.get("tuned_profiles", {})
+                    self.output_gain = data.get("output_gain", 1.0)
+                    self.extra_outputs = data.get("extra_outputs", [])
             except Exception as e:
                 print(f"Error loading settings: {e}")
 
@@ -56,7 +100,27 @@ class Settings:
             "stability": self.stability,
             "similarity": self.similarity,
             "remove_background_noise": self.remove_background_noise,
-            "playback_buffer_size": self.playback_buffer_size
+            "local_noise_suppression": self.local_noise_suppression,
+            "playback_buffer_size": self.playback_buffer_size,
+            "speculative_dispatch": self.speculative_dispatch,
+            "engine": self.engine,
+            "effect_preset": self.effect_preset,
+            "fallback_mode": self.fallback_mode,
+            "streaming_upload": self.streaming_upload,
+            "drift_compensation": self.drift_compensation,
+            "max_playback_latency": self.max_playback_latency,
+            "metrics_port": self.metrics_port,
+            "freshness_budget": self.freshness_budget,
+            "audio_process": self.audio_process,
+            "api_concurrency": self.api_concurrency,
+            "requests_per_minute": self.requests_per_minute,
+            "audio_backend": self.audio_backend,
+            "audio_backend_options": self.audio_backend_options,
+            "fanout_voices": self.fanout_voices,
+            "auto_tune": self.auto_tune,
+            "tuned_profiles": self.tuned_profiles,
+            "output_gain": self.output_gain,
+            "extra_outputs": self.extra_outputs
         }
         try:
             with open(CONFIG_FILE, "w") as f: